@@ -0,0 +1,119 @@
+#
+#   Copyright 2013-2022 The Foundry Visionmongers Ltd
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+"""
+A micro-benchmark comparing managementPolicy, which looks up the
+policy index once per batch, with evaluating every trait set in turn.
+Either way, each trait set is given its own copy of its policy, as
+hosts may modify the results.
+
+Batches are drawn from a small number of distinct trait set "shapes",
+some of which have a management policy exception, as is typical of a
+host querying the policy of each of its assets.
+
+  python benchmarks/bench_management_policy.py [--trait-sets N] [--shapes N] [--repeat N]
+"""
+
+import argparse
+import os
+import tempfile
+import timeit
+
+from openassetio import Context, TraitsData
+
+import benchutils
+
+from openassetio_manager_bal import bal, traitsdata
+
+
+def make_trait_sets(num_trait_sets: int, num_shapes: int) -> list:
+    """
+    Generates a batch of trait sets, cycling through the supplied
+    number of shapes. Even shapes match a policy exception (see
+    benchutils.policy_trait_set), odd shapes use the default policy.
+    """
+    shapes = [
+        (
+            benchutils.policy_trait_set(idx // 2)
+            if idx % 2 == 0
+            else [benchutils.LOCATABLE_CONTENT, f"openassetio-mediacreation:benchmark.Other{idx}"]
+        )
+        for idx in range(num_shapes)
+    ]
+    # Each a distinct set instance, as the host's bindings supply them.
+    return [set(shapes[idx % num_shapes]) for idx in range(num_trait_sets)]
+
+
+def management_policy_per_trait_set(trait_sets, access, policy_index) -> list:
+    """
+    The original implementation of managementPolicy, evaluating each
+    trait set in turn.
+    """
+    return [
+        TraitsData(bal.management_policy(trait_set, access, policy_index))
+        for trait_set in trait_sets
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--trait-sets", type=int, default=10000, help="Trait sets per batch")
+    parser.add_argument("--shapes", type=int, default=50, help="Distinct trait sets per batch")
+    parser.add_argument("--repeat", type=int, default=5, help="Batches to time")
+    args = parser.parse_args()
+
+    trait_sets = make_trait_sets(args.trait_sets, args.shapes)
+    num_policy_exceptions = (args.shapes + 1) // 2
+    # Converted to TraitsData, as the manager does when it loads a
+    # library.
+    policy_index = bal.management_policy_index(
+        benchutils.make_synthetic_library(0, num_policy_exceptions=num_policy_exceptions),
+        traitsdata.from_dict,
+    )
+
+    host_session = benchutils.make_host_session()
+    context = benchutils.make_context(Context.Access.kRead)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        library_path = os.path.join(tmp_dir, "library.json")
+        benchutils.write_synthetic_library(
+            library_path, 0, num_policy_exceptions=num_policy_exceptions
+        )
+        interface = benchutils.make_interface({"library_path": library_path}, host_session)
+
+    candidates = {
+        "per trait set": lambda: management_policy_per_trait_set(trait_sets, "read", policy_index),
+        "batched": lambda: bal.management_policies(trait_sets, "read", policy_index, TraitsData),
+        "managementPolicy": lambda: interface.managementPolicy(trait_sets, context, host_session),
+    }
+
+    expected = candidates["per trait set"]()
+    assert candidates["batched"]() == expected
+    assert candidates["managementPolicy"]() == expected
+    assert sum(1 for policy in expected if policy.hasTrait("openassetio.Managed")) == sum(
+        1 for idx in range(args.trait_sets) if idx % args.shapes % 2
+    )
+
+    baseline = None
+    for label, func in candidates.items():
+        best = min(timeit.repeat(func, number=1, repeat=args.repeat))
+        baseline = baseline or best
+        print(
+            f"{label:>20}: {best * 1e3:8.2f} ms/batch"
+            f" {best / args.trait_sets * 1e9:8.1f} ns/trait set  x{baseline / best:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
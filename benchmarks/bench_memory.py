@@ -0,0 +1,129 @@
+#
+#   Copyright 2013-2022 The Foundry Visionmongers Ltd
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+"""
+Measures the memory used by an eagerly loaded library under each of the
+library_storage settings. Each library is loaded in a fresh process,
+and the memory retained by the loaded library (as traced by
+tracemalloc) is reported, along with the peak resident set size of the
+process.
+
+  python benchmarks/bench_memory.py [--entities N] [--versions N] [--shared-traits N]
+"""
+
+import argparse
+import gc
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+
+def peak_resident_set_size() -> int:
+    """
+    Returns the peak resident set size of this process, in bytes.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS, and kilobytes elsewhere.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def measure_load(library_path: str, storage: str) -> dict:
+    """
+    Loads the library in the current process, returning the time taken,
+    the memory retained by the loaded library, and the peak resident
+    set size of the process. Load times are inflated by tracing.
+    """
+    # pylint: disable=import-outside-toplevel
+    from openassetio_manager_bal import bal
+
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    library = bal.load_library(library_path, storage=storage)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert library["entities"]
+    return {
+        "load_s": elapsed,
+        "retained_bytes": retained,
+        "peak_rss_bytes": peak_resident_set_size(),
+    }
+
+
+def main():
+    """
+    Runs the benchmark, or a single measurement if invoked as a child
+    process.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--entities", type=int, default=1000000, help="Library size")
+    parser.add_argument("--versions", type=int, default=1, help="Versions per entity")
+    parser.add_argument(
+        "--shared-traits",
+        type=int,
+        default=0,
+        help="Additional traits per version, with the same properties for every version",
+    )
+    parser.add_argument("--child", nargs=2, metavar=("LIBRARY", "STORAGE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure_load(*args.child)))
+        return
+
+    import benchutils  # pylint: disable=import-outside-toplevel
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        library_path = os.path.join(tmp_dir, "library.json")
+        print(
+            f"Generating {args.entities} entities with {args.versions} version(s)"
+            f" and {args.shared_traits} shared trait(s)..."
+        )
+        benchutils.write_synthetic_library(
+            library_path,
+            args.entities,
+            num_versions=args.versions,
+            num_shared_traits=args.shared_traits,
+        )
+
+        results = {}
+        for storage in ("dict", "compact"):
+            output = subprocess.run(
+                [sys.executable, __file__, "--child", library_path, storage],
+                check=True,
+                stdout=subprocess.PIPE,
+                cwd=os.path.dirname(os.path.abspath(__file__)),
+            ).stdout
+            results[storage] = json.loads(output)
+            print(
+                f"library_storage={storage:>8}"
+                f" retained {results[storage]['retained_bytes'] / 2**20:8.1f}MiB"
+                f" peak RSS {results[storage]['peak_rss_bytes'] / 2**20:8.1f}MiB"
+                f" load {results[storage]['load_s']:6.2f}s"
+            )
+
+        reduction = 1 - results["compact"]["retained_bytes"] / results["dict"]["retained_bytes"]
+        print(f"Reduction: {reduction:.1%}")
+
+
+if __name__ == "__main__":
+    main()
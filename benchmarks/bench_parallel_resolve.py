@@ -0,0 +1,88 @@
+#
+#   Copyright 2013-2022 The Foundry Visionmongers Ltd
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+"""
+Measures how batch resolve throughput scales with the number of
+workers in the "threads" resolve_execution_mode, against a synthetic
+library.
+
+  python benchmarks/bench_parallel_resolve.py [--entities N] [--batch N]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from openassetio import Context
+
+import benchutils
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--entities", type=int, default=1000000, help="Library size")
+    parser.add_argument("--batch", type=int, default=100000, help="References per resolve")
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    host_session = benchutils.make_host_session()
+    context = benchutils.make_context(Context.Access.kRead)
+    step = max(1, args.entities // args.batch)
+    refs = benchutils.make_refs(
+        benchutils.entity_name(idx % args.entities) for idx in range(0, args.batch * step, step)
+    )
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        library_path = os.path.join(tmp_dir, "library.json")
+        print(f"Generating {args.entities} entities...")
+        benchutils.write_synthetic_library(library_path, args.entities)
+
+        modes = [("serial", 1)] + [("threads", workers) for workers in sorted(set(args.workers))]
+        baseline = None
+        for mode, workers in modes:
+            interface = benchutils.make_interface(
+                {
+                    "library_path": library_path,
+                    "resolve_execution_mode": mode,
+                    "resolve_workers": workers,
+                    "resolve_chunk_size": args.chunk_size,
+                    # Measure resolution, rather than cache hits.
+                    "resolve_cache_size": 0,
+                },
+                host_session,
+            )
+            errors = []
+            start = time.perf_counter()
+            interface.resolve(
+                refs,
+                {benchutils.LOCATABLE_CONTENT},
+                context,
+                host_session,
+                lambda _idx, _data: None,
+                lambda idx, err: errors.append((idx, err)),
+            )
+            elapsed = time.perf_counter() - start
+            assert not errors, errors[:5]
+            baseline = baseline or elapsed
+            print(
+                f"{mode:>8} workers={workers:<3} {len(refs) / elapsed:12.0f} refs/s"
+                f"  x{baseline / elapsed:.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#
+#   Copyright 2013-2022 The Foundry Visionmongers Ltd
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+"""
+A micro-benchmark comparing bal.parse_entity_ref with the original
+urllib based implementation, and the memoized variant.
+
+  python benchmarks/bench_parse_entity_ref.py [--refs N] [--repeat N]
+"""
+
+import argparse
+import timeit
+
+from urllib.parse import urlparse
+
+from openassetio_manager_bal import bal
+
+
+def parse_entity_ref_urllib(entity_ref: str) -> bal.EntityInfo:
+    """
+    The original implementation of bal.parse_entity_ref.
+    """
+    uri_parts = urlparse(entity_ref)
+
+    if len(uri_parts.path) <= 1:
+        raise bal.MalformedBALReference("Missing entity name in path component")
+
+    return bal.EntityInfo(name=uri_parts.path[1:])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--refs", type=int, default=100000, help="References per batch")
+    parser.add_argument("--repeat", type=int, default=5, help="Batches to time")
+    args = parser.parse_args()
+
+    # A mix of unique references, and a hot set that is seen repeatedly,
+    # as is common for shared assets.
+    refs = [
+        f"bal:///shot{idx % 100:03d}/asset{idx if idx % 2 else idx % 50}"
+        for idx in range(args.refs)
+    ]
+
+    candidates = {
+        "urllib": parse_entity_ref_urllib,
+        "parse_entity_ref": bal.parse_entity_ref,
+        "memoized": bal.entity_ref_parser(cache_size=1024),
+    }
+
+    for func in candidates.values():
+        assert [func(ref) for ref in refs[:1000]] == [
+            parse_entity_ref_urllib(ref) for ref in refs[:1000]
+        ]
+
+    baseline = None
+    for label, func in candidates.items():
+        best = min(
+            timeit.repeat(
+                lambda func=func: [func(ref) for ref in refs], number=1, repeat=args.repeat
+            )
+        )
+        baseline = baseline or best
+        print(
+            f"{label:>18}: {best * 1e3:8.2f} ms/batch"
+            f" {best / args.refs * 1e9:8.1f} ns/ref  x{baseline / best:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
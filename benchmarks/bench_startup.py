@@ -0,0 +1,122 @@
+#
+#   Copyright 2013-2022 The Foundry Visionmongers Ltd
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+"""
+Measures the startup costs of the plugin in fresh processes: importing
+the plugin package (as a plugin scan does), importing the manager
+implementation, initializing it, and the time until the first resolve
+returns. Each is measured with and without the library_preload setting.
+
+  python benchmarks/bench_startup.py [--entities N] [--repeat N]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def measure_startup(library_path: str, preload: bool) -> dict:
+    """
+    Measures the startup costs in the current process, which must not
+    have imported the plugin yet. OpenAssetIO itself is imported first,
+    as it will already have been by any host.
+    """
+    # pylint: disable=import-outside-toplevel, unused-import
+    import openassetio.pluginSystem
+    from openassetio import Context
+
+    timings = {}
+    start = time.perf_counter()
+    import openassetio_manager_bal
+
+    timings["import_plugin_s"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    from openassetio_manager_bal.BasicAssetLibraryInterface import BasicAssetLibraryInterface
+
+    timings["import_interface_s"] = time.perf_counter() - start
+
+    import benchutils
+
+    host_session = benchutils.make_host_session()
+    context = benchutils.make_context(Context.Access.kRead)
+    refs = benchutils.make_refs([benchutils.entity_name(0)])
+
+    start = time.perf_counter()
+    interface = BasicAssetLibraryInterface()
+    interface.initialize({"library_path": library_path, "library_preload": preload}, host_session)
+    timings["initialize_s"] = time.perf_counter() - start
+
+    errors = []
+    interface.resolve(
+        refs,
+        {benchutils.LOCATABLE_CONTENT},
+        context,
+        host_session,
+        lambda _idx, _data: None,
+        lambda idx, err: errors.append((idx, err.message)),
+    )
+    timings["first_resolve_s"] = time.perf_counter() - start
+    assert not errors, errors
+    return timings
+
+
+def main():
+    """
+    Runs the benchmark, or a single measurement if invoked as a child
+    process.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--entities", type=int, default=100000, help="Library size")
+    parser.add_argument("--repeat", type=int, default=5, help="Processes per measurement")
+    parser.add_argument("--child", nargs=2, metavar=("LIBRARY", "PRELOAD"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure_startup(args.child[0], args.child[1] == "1")))
+        return
+
+    # benchutils imports the plugin, so must not be imported at the top
+    # level, or the child processes would not measure it.
+    import benchutils  # pylint: disable=import-outside-toplevel
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        library_path = os.path.join(tmp_dir, "library.json")
+        print(f"Generating {args.entities} entities...")
+        benchutils.write_synthetic_library(library_path, args.entities)
+
+        for preload in (False, True):
+            samples = []
+            for _ in range(args.repeat):
+                output = subprocess.run(
+                    [sys.executable, __file__, "--child", library_path, "1" if preload else "0"],
+                    check=True,
+                    stdout=subprocess.PIPE,
+                    cwd=os.path.dirname(os.path.abspath(__file__)),
+                ).stdout
+                samples.append(json.loads(output))
+            print(f"library_preload={preload}")
+            for key in samples[0]:
+                median = statistics.median(sample[key] for sample in samples)
+                print(f"  {key:>20} {median * 1e3:10.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+#
+#   Copyright 2013-2022 The Foundry Visionmongers Ltd
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+"""
+Shared helpers for the BAL benchmarks.
+"""
+
+import json
+
+from openassetio import Context, EntityReference
+from openassetio.hostApi import HostInterface
+from openassetio.log import ConsoleLogger, LoggerInterface, SeverityFilter
+from openassetio.managerApi import Host, HostSession
+
+from openassetio_manager_bal.BasicAssetLibraryInterface import BasicAssetLibraryInterface
+
+LOCATABLE_CONTENT = "openassetio-mediacreation:content.LocatableContent"
+
+
+def entity_name(idx: int) -> str:
+    """
+    The name of the synthetic entity with the supplied index.
+    """
+    return f"shot{idx // 1000:04d}/asset{idx:07d}"
+
+
+def policy_trait_set(idx: int) -> list:
+    """
+    The trait set of the synthetic management policy exception with the
+    supplied index.
+    """
+    return [LOCATABLE_CONTENT, f"openassetio-mediacreation:benchmark.Trait{idx}"]
+
+
+def make_synthetic_library(
+    num_entities: int,
+    num_versions: int = 1,
+    num_policy_exceptions: int = 0,
+    num_shared_traits: int = 0,
+) -> dict:
+    """
+    Generates a library of entities with the supplied number of
+    versions, each with a handful of commonly used traits, along with
+    the requested number of read management policy exceptions.
+
+    Each version also has `num_shared_traits` traits with several
+    properties, whose values are the same for every version of every
+    entity.
+    """
+    return {
+        "managementPolicy": {
+            "read": {
+                "default": {"openassetio.Managed": {}},
+                "exceptions": [
+                    {"traitSet": policy_trait_set(idx), "policy": {}}
+                    for idx in range(num_policy_exceptions)
+                ],
+            }
+        },
+        "entities": {
+            entity_name(idx): {
+                "versions": [
+                    {
+                        "traits": {
+                            LOCATABLE_CONTENT: {
+                                "location": f"file:///show/{entity_name(idx)}.v{version}.exr"
+                            },
+                            "openassetio-mediacreation:usage.Entity": {},
+                            "openassetio-mediacreation:color.OCIOColorManaged": {
+                                "colorspace": "ACEScg"
+                            },
+                            **{
+                                f"openassetio-mediacreation:benchmark.Shared{trait_idx}": {
+                                    "name": f"shared{trait_idx}",
+                                    "department": "lighting",
+                                    "priority": trait_idx,
+                                    "approved": True,
+                                }
+                                for trait_idx in range(num_shared_traits)
+                            },
+                        }
+                    }
+                    for version in range(num_versions)
+                ]
+            }
+            for idx in range(num_entities)
+        },
+    }
+
+
+def write_synthetic_library(path: str, num_entities: int, **kwargs):
+    """
+    Writes a synthetic library (see make_synthetic_library) to the
+    supplied path.
+    """
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(make_synthetic_library(num_entities, **kwargs), file)
+
+
+class BenchmarkHostInterface(HostInterface):
+    """
+    A minimal host, for benchmarks that drive the manager directly.
+    """
+
+    def identifier(self):
+        return "org.openassetio.examples.manager.bal.benchmarks"
+
+    def displayName(self):
+        return "BAL Benchmarks"
+
+
+def make_host_session() -> HostSession:
+    """
+    Creates a host session suitable for calling the manager interface
+    directly. Only warnings and errors are logged.
+    """
+    logger = SeverityFilter(ConsoleLogger())
+    logger.setSeverity(LoggerInterface.Severity.kWarning)
+    return HostSession(Host(BenchmarkHostInterface()), logger)
+
+
+def make_context(access) -> Context:
+    """
+    Creates a context with the supplied access.
+    """
+    context = Context()
+    context.access = access
+    return context
+
+
+def make_interface(settings: dict, host_session: HostSession) -> BasicAssetLibraryInterface:
+    """
+    Creates and initializes a manager interface with the supplied
+    settings.
+    """
+    interface = BasicAssetLibraryInterface()
+    interface.initialize(settings, host_session)
+    return interface
+
+
+def make_refs(names) -> list:
+    """
+    Creates a list of BAL entity references for the supplied names.
+    """
+    return [EntityReference(f"bal:///{name}") for name in names]
@@ -0,0 +1,293 @@
+#
+#   Copyright 2013-2022 The Foundry Visionmongers Ltd
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+"""
+Measures the throughput and latency of the BAL manager's batch APIs
+against synthetic libraries of a range of sizes.
+
+  python benchmarks/run_benchmarks.py --output results.json
+
+Results are written as JSON, and can be compared against those of a
+previous run, to track regressions between releases:
+
+  python benchmarks/run_benchmarks.py --compare baseline.json
+
+Each benchmark reports the latency percentiles of individual calls, and
+the throughput in batch elements per second.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+from openassetio import Context, TraitsData
+
+import benchutils
+
+
+def package_version(name: str) -> str:
+    """
+    Returns the installed version of the named distribution, or None
+    if it cannot be determined (eg. importlib.metadata is unavailable
+    in Python 3.7).
+    """
+    try:
+        # pylint: disable=import-outside-toplevel
+        from importlib import metadata
+
+        return metadata.version(name)
+    except (ImportError, ValueError):
+        return None
+
+
+def percentile(sorted_samples: list, fraction: float) -> float:
+    """
+    Returns the nearest-rank percentile of the supplied sorted samples.
+    """
+    rank = max(0, min(len(sorted_samples) - 1, round(fraction * len(sorted_samples)) - 1))
+    return sorted_samples[rank]
+
+
+def summarize(samples: list, batch_size: int) -> dict:
+    """
+    Summarizes the supplied per-call timings (in seconds).
+    """
+    samples = sorted(samples)
+    total = sum(samples)
+    return {
+        "calls": len(samples),
+        "batch_size": batch_size,
+        "p50_s": percentile(samples, 0.5),
+        "p90_s": percentile(samples, 0.9),
+        "p99_s": percentile(samples, 0.99),
+        "max_s": samples[-1],
+        "elements_per_s": (batch_size * len(samples)) / total if total else None,
+    }
+
+
+def time_calls(func, repeat: int) -> list:
+    """
+    Calls func `repeat` times, returning the duration of each call.
+    """
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def run_for_library(library_path, num_entities, args, host_session) -> list:
+    """
+    Runs each benchmark against the library at the supplied path,
+    returning a list of result dicts.
+    """
+    settings = {"library_path": library_path, **args.settings}
+    results = []
+
+    def record(name, batch_size, samples):
+        result = {"benchmark": name, "entities": num_entities, **summarize(samples, batch_size)}
+        results.append(result)
+        print(
+            f"{name:>18} entities={num_entities:<9} batch={batch_size:<7}"
+            f" p50={result['p50_s'] * 1e3:9.3f}ms p99={result['p99_s'] * 1e3:9.3f}ms"
+            f" {result['elements_per_s'] or 0:12.0f} elem/s"
+        )
+
+    record(
+        "initialize",
+        1,
+        time_calls(lambda: benchutils.make_interface(settings, host_session), args.init_repeat),
+    )
+
+    interface = benchutils.make_interface(settings, host_session)
+    errors = []
+
+    def on_error(idx, error):
+        errors.append((idx, error.message))
+
+    for batch_size in args.batch_sizes:
+        benchmarks = batch_benchmarks(
+            interface, host_session, num_entities, batch_size, args.policy_exceptions, on_error
+        )
+        for name, func in benchmarks.items():
+            if args.only and name not in args.only:
+                continue
+            record(name, batch_size, time_calls(func, args.repeat))
+            if errors:
+                raise RuntimeError(f"{name} reported errors, eg: {errors[:3]}")
+
+    return results
+
+
+def batch_benchmarks(
+    interface, host_session, num_entities, batch_size, num_policy_exceptions, on_error
+) -> dict:
+    """
+    Returns a dict of benchmark name to a callable that makes a single
+    batch call of the supplied size to the supplied interface.
+
+    References are spread evenly across the library, so that no one
+    part of it is favoured.
+    """
+    # pylint: disable=too-many-arguments, too-many-locals
+    read_context = benchutils.make_context(Context.Access.kRead)
+    write_context = benchutils.make_context(Context.Access.kWrite)
+    trait_set = {benchutils.LOCATABLE_CONTENT}
+
+    step = max(1, num_entities // batch_size)
+    names = [benchutils.entity_name((idx * step) % num_entities) for idx in range(batch_size)]
+    refs = benchutils.make_refs(names)
+    missing_refs = benchutils.make_refs(f"missing/{name}" for name in names)
+    trait_sets = [
+        set(benchutils.policy_trait_set(idx % (num_policy_exceptions or 1)))
+        for idx in range(batch_size)
+    ]
+    traits_datas = []
+    for idx in range(batch_size):
+        traits_data = TraitsData()
+        traits_data.setTraitProperty(
+            benchutils.LOCATABLE_CONTENT, "location", f"file:///published/{idx}.exr"
+        )
+        traits_datas.append(traits_data)
+
+    return {
+        "entityExists": lambda: interface.entityExists(refs, read_context, host_session),
+        "entityExists_miss": lambda: interface.entityExists(
+            missing_refs, read_context, host_session
+        ),
+        "resolve": lambda: interface.resolve(
+            refs, trait_set, read_context, host_session, lambda _i, _d: None, on_error
+        ),
+        "preflight": lambda: interface.preflight(
+            refs, trait_set, write_context, host_session, lambda _i, _r: None, on_error
+        ),
+        "managementPolicy": lambda: interface.managementPolicy(
+            trait_sets, read_context, host_session
+        ),
+        "register": lambda: interface.register(
+            refs, traits_datas, write_context, host_session, lambda _i, _r: None, on_error
+        ),
+    }
+
+
+def compare(results: list, baseline_path: str, threshold: float) -> bool:
+    """
+    Compares the throughput of the supplied results with those in a
+    previous results file, printing the ratio of each.
+
+    @return False if any benchmark is slower than the baseline by more
+    than the supplied threshold fraction.
+    """
+    with open(baseline_path, "r", encoding="utf-8") as file:
+        baseline = json.load(file)
+
+    def key(result):
+        return result["benchmark"], result["entities"], result["batch_size"]
+
+    baseline_results = {key(result): result for result in baseline["results"]}
+    passed = True
+    print(f"\nComparison against {baseline_path}:")
+    for result in results:
+        previous = baseline_results.get(key(result))
+        if previous is None or not previous["elements_per_s"]:
+            continue
+        ratio = result["elements_per_s"] / previous["elements_per_s"]
+        regressed = ratio < 1.0 - threshold
+        passed = passed and not regressed
+        print(
+            f"{result['benchmark']:>18} entities={result['entities']:<9}"
+            f" batch={result['batch_size']:<7} x{ratio:.2f}{'  REGRESSION' if regressed else ''}"
+        )
+    return passed
+
+
+def main():
+    """
+    Runs the benchmarks, as configured by the command line arguments.
+    """
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().splitlines()[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="\n".join(__doc__.strip().splitlines()[1:]),
+    )
+    parser.add_argument(
+        "--entities", type=int, nargs="+", default=[1000, 100000], help="Library sizes"
+    )
+    parser.add_argument("--versions", type=int, default=1, help="Versions per entity")
+    parser.add_argument(
+        "--policy-exceptions", type=int, default=100, help="Management policy exceptions"
+    )
+    parser.add_argument(
+        "--batch-sizes", type=int, nargs="+", default=[1, 100, 10000], help="Batch sizes"
+    )
+    parser.add_argument("--repeat", type=int, default=20, help="Calls per benchmark")
+    parser.add_argument("--init-repeat", type=int, default=3, help="Calls to initialize")
+    parser.add_argument("--only", nargs="+", help="Only run the named benchmarks")
+    parser.add_argument(
+        "--setting",
+        dest="settings",
+        action="append",
+        default=[],
+        metavar="KEY=JSON",
+        help="Additional manager settings, eg. library_load_mode='\"lazy\"'",
+    )
+    parser.add_argument("--output", help="Path to write JSON results to")
+    parser.add_argument("--compare", help="Path to previous JSON results to compare with")
+    parser.add_argument(
+        "--threshold", type=float, default=0.1, help="Tolerated fractional slowdown"
+    )
+    args = parser.parse_args()
+    args.settings = dict(
+        (key, json.loads(value)) for key, value in (s.split("=", 1) for s in args.settings)
+    )
+
+    host_session = benchutils.make_host_session()
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for num_entities in args.entities:
+            library_path = os.path.join(tmp_dir, f"library_{num_entities}.json")
+            benchutils.write_synthetic_library(
+                library_path,
+                num_entities,
+                num_versions=args.versions,
+                num_policy_exceptions=args.policy_exceptions,
+            )
+            results.extend(run_for_library(library_path, num_entities, args, host_session))
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": sys.version,
+        "platform": platform.platform(),
+        "openassetio": package_version("openassetio"),
+        "openassetio-manager-bal": package_version("openassetio-manager-bal"),
+        "settings": args.settings,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+
+    if args.compare and not compare(results, args.compare, args.threshold):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -20,13 +20,21 @@
 A single-class module, providing the BasicAssetLibraryInterface class.
 """
 
+import collections
+import json
 import os
+import threading
+import time
+import weakref
 
 from openassetio import constants, BatchElementError, EntityReference, TraitsData
 from openassetio.exceptions import MalformedEntityReference, PluginError
 from openassetio.managerApi import ManagerInterface
 
-from . import bal
+from . import bal, journal, registry, traitsdata
+from .cache import LRUCache
+from .instrumentation import Instrumentation, NullInstrumentation
+from .rwlock import ReadWriteLock
 
 __all__ = [
     "BasicAssetLibraryInterface",
@@ -40,21 +48,74 @@ __all__ = [
 # Methods in C++ end up with "missing docstring"
 # pylint: disable=missing-docstring
 # pylint: disable=too-many-arguments, unused-argument
+# The manager holds a number of caches and indexes alongside the library
+# pylint: disable=too-many-instance-attributes
 
 
 class BasicAssetLibraryInterface(ManagerInterface):
     """
     This class exposes the Basic Asset Library through the OpenAssetIO
     ManagerInterface.
+
+    It is safe to call from multiple threads. Queries hold a shared
+    lock on the library, whilst updates hold it exclusively. Callbacks
+    are never called with the lock held, so may safely call back into
+    the manager. Registrations are additionally serialized by a
+    separate lock, so that any journaling to disk does not block
+    queries.
+
+    If the `library_reload_interval` setting is positive, a background
+    thread polls the library file for changes, and swaps in the new
+    content without blocking queries whilst it is parsed.
+
+    If the `library_preload` setting is enabled, `initialize` returns
+    as soon as the library has started loading on a background thread.
+    The first call that needs the library waits for it to finish.
+
+    If the `server_socket` setting is set, the library is not loaded.
+    Instead, entityExists, resolve, register and managementPolicy are
+    forwarded to the BAL server listening on that socket, which owns the
+    library (see server.py).
     """
 
     __reference_prefix = "bal:///"
+    __metrics_info_key = "org.openassetio.examples.manager.bal.metrics"
     __lib_path_envvar_name = "BAL_LIBRARY_PATH"
 
     def __init__(self):
         super().__init__()
         self.__settings = bal.make_default_settings()
         self.__library = {}
+        self.__policy_index = {}
+        # Built on first use, see __entity_name_index.
+        self.__name_index = None
+        # A bloom.BloomFilter, if the `name_filter` setting is enabled.
+        self.__name_filter = None
+        self.__parse_entity_ref = bal.parse_entity_ref
+        # (entity name, version, trait set) -> TraitsData, grouped by
+        # entity name, along with block-keyed results, see
+        # __resolve_traits_data.
+        self.__resolve_cache = LRUCache(0)
+        self.__lock = ReadWriteLock()
+        self.__register_lock = threading.Lock()
+        self.__journal = None
+        self.__resolve_executor = None
+        self.__instrumentation = NullInstrumentation()
+        # Names of the entities registered since the library was
+        # loaded, which take precedence over the library file on reload.
+        self.__registered_names = set()
+        self.__reload_thread = None
+        # Stops the reload thread, also called should this instance be
+        # deleted.
+        self.__stop_reload = None
+        # Releases this instance's reference to a library shared with
+        # other instances, also called should this instance be deleted.
+        self.__release_library = None
+        # A Future for the (library, release, policy index) being loaded
+        # in the background, if preloading.
+        self.__preload = None
+        # A client.Client, if the library is owned by a BAL server.
+        self.__client = None
 
     def identifier(self):
         return "org.openassetio.examples.manager.bal"
@@ -64,16 +125,62 @@ class BasicAssetLibraryInterface(ManagerInterface):
         return "Basic Asset Library 📖"
 
     def info(self):
-        return {constants.kField_EntityReferencesMatchPrefix: self.__reference_prefix}
+        info = {constants.kField_EntityReferencesMatchPrefix: self.__reference_prefix}
+        if self.__settings["instrumentation"]:
+            info[self.__metrics_info_key] = json.dumps(self.metrics())
+        return info
+
+    def metrics(self) -> dict:
+        """
+        Returns the metrics collected since the manager was last
+        initialized, if the `instrumentation` setting is enabled,
+        otherwise an empty dict. See instrumentation.Instrumentation.
+        """
+        return self.__instrumentation.metrics()
 
     def settings(self, hostSession):
         return self.__settings.copy()
 
     def initialize(self, managerSettings, hostSession):
         bal.validate_settings(managerSettings)
+        # The reload thread takes the locks, so must be stopped first.
+        self.__stop_reload_thread()
+        with self.__register_lock, self.__lock.write():
+            self.__initialize(managerSettings, hostSession)
+
+    def __initialize(self, managerSettings, hostSession):
         self.__settings.update(managerSettings)
 
+        self.__discard_preload()
         self.__library = {}
+        self.__policy_index = {}
+        self.__name_index = None
+        self.__name_filter = None
+        self.__registered_names = set()
+        self.__close_resources()
+
+        if self.__settings["instrumentation"]:
+            self.__instrumentation = Instrumentation(
+                self.__settings["instrumentation_log_interval"]
+            )
+        else:
+            self.__instrumentation = NullInstrumentation()
+
+        self.__parse_entity_ref = bal.entity_ref_parser(self.__settings["entity_ref_cache_size"])
+        self.__resolve_cache = LRUCache(self.__settings["resolve_cache_size"])
+
+        if self.__settings["server_socket"]:
+            # Deferred, as most hosts load the library in-process.
+            from . import client  # pylint: disable=import-outside-toplevel
+
+            # The server owns the library, so there is nothing more to
+            # set up. Connections are made on first use.
+            self.__client = client.Client(
+                self.__settings["server_socket"],
+                self.__settings["server_connections"],
+                self.__settings["resolve_chunk_size"],
+            )
+            return
 
         if self.__settings.get("library_path") is None:
             hostSession.logger().log(
@@ -89,33 +196,394 @@ class BasicAssetLibraryInterface(ManagerInterface):
             hostSession.logger().Severity.kDebug,
             f"Loading library from {self.__settings['library_path']}",
         )
-        self.__library = bal.load_library(self.__settings["library_path"])
+        reload = self.__settings["library_reload_interval"] > 0 and self.__settings["library_path"]
+        # Taken before loading, so that changes made during the load are
+        # picked up by the first poll.
+        signature = bal.library_signature(self.__settings["library_path"]) if reload else None
+        if self.__settings["library_preload"]:
+            self.__preload = self.__start_preload()
+        else:
+            library, release = self.__load_library()
+            self.__set_library(library, release, self.__build_name_filter(library))
+            self.__policy_index = self.__build_policy_index(library)
+
+        if self.__settings["resolve_execution_mode"] == "threads":
+            # Deferred, as most hosts don't need it, and it is
+            # relatively expensive to import.
+            # pylint: disable=import-outside-toplevel
+            from concurrent.futures import ThreadPoolExecutor
+
+            self.__resolve_executor = ThreadPoolExecutor(
+                max_workers=self.__settings["resolve_workers"],
+                thread_name_prefix="bal-resolve",
+            )
+
+        if self.__settings["library_journal"] and self.__settings["library_path"]:
+            self.__journal = bal.open_journal(self.__settings["library_path"])
+
+        if reload:
+            self.__start_reload_thread(signature, hostSession)
+
+    def __close_resources(self):
+        """
+        Closes any journal, resolve thread pool and server connections
+        opened by the previous initialization.
+        """
+        if self.__journal is not None:
+            self.__journal.close()
+            self.__journal = None
+        if self.__resolve_executor is not None:
+            self.__resolve_executor.shutdown(wait=False)
+            self.__resolve_executor = None
+        if self.__client is not None:
+            self.__client.close()
+            self.__client = None
+
+    def __load_library(self):
+        """
+        Loads the library as configured by the current settings.
+
+        If the `library_sharing` setting is enabled, the library is
+        shared with any other instance in the process using the same
+        library file and settings.
+
+        @return A tuple of the library and a callable to release it, or
+        None if the library is not shared.
+        """
+        path = self.__settings["library_path"]
+        options = (
+            self.__settings["library_load_mode"],
+            self.__settings["lazy_entity_cache_size"],
+            self.__settings["library_snapshot"],
+            self.__settings["max_entity_versions"],
+            self.__settings["library_storage"],
+            self.__settings["library_validation"],
+            self.__settings["shard_load_workers"],
+        )
+
+        def load():
+            return bal.load_library(
+                path,
+                load_mode=options[0],
+                entity_cache_size=options[1],
+                snapshot_mode=options[2],
+                max_versions=options[3],
+                storage=options[4],
+                validate=options[5],
+                shard_workers=options[6],
+            )
+
+        load_start = time.perf_counter()
+        release = None
+        if self.__settings["library_sharing"] and path:
+            library, release_shared = registry.acquire(path, options, load)
+            release = weakref.finalize(self, release_shared)
+        else:
+            library = load()
+        # Counting the entities of a sharded library loads every shard,
+        # so is skipped unless the count will be reported.
+        self.__instrumentation.record_library_load(
+            time.perf_counter() - load_start,
+            len(library.get("entities", {})) if self.__settings["instrumentation"] else 0,
+            bal.library_size(path),
+        )
+        return library, release
+
+    def __build_name_filter(self, library: dict):
+        """
+        Builds a name filter for the supplied library, if the
+        `name_filter` setting is enabled, otherwise returns None.
+        """
+        if not self.__settings["name_filter"]:
+            return None
+        name_filter = bal.entity_name_filter(
+            library, self.__settings["name_filter_false_positive_rate"]
+        )
+        self.__instrumentation.record_name_filter(
+            len(library.get("entities", {})),
+            name_filter.num_bytes,
+            name_filter.false_positive_rate,
+        )
+        return name_filter
+
+    def __start_preload(self):
+        """
+        Starts loading the library, and building its policy index and
+        name filter, on a background thread.
+
+        @return A Future for a tuple of the library, its release
+        callable (see __load_library), its policy index and its name
+        filter.
+        """
+        from concurrent.futures import Future  # pylint: disable=import-outside-toplevel
+
+        future = Future()
+
+        def preload():
+            try:
+                library, release = self.__load_library()
+                future.set_result(
+                    (
+                        library,
+                        release,
+                        self.__build_policy_index(library),
+                        self.__build_name_filter(library),
+                    )
+                )
+            except BaseException as exc:  # pylint: disable=broad-except
+                future.set_exception(exc)
+
+        threading.Thread(target=preload, name="bal-preload", daemon=True).start()
+        return future
+
+    def __await_library(self):
+        """
+        Waits for any library being preloaded to finish loading, and
+        makes it the current library. Any error raised whilst loading
+        is raised here, and again by each subsequent call.
+
+        Must not be called with either lock held.
+        """
+        if self.__preload is None:
+            return
+        with self.__register_lock, self.__lock.write():
+            if self.__preload is None:
+                # Another thread got here first.
+                return
+            library, release, policy_index, name_filter = self.__preload.result()
+            self.__preload = None
+            self.__set_library(library, release, name_filter)
+            self.__policy_index = policy_index
+
+    def __discard_preload(self):
+        """
+        Waits for any library being preloaded to finish loading, then
+        discards it.
+        """
+        if self.__preload is None:
+            return
+        if self.__preload.exception() is None:
+            _, release, _, _ = self.__preload.result()
+            if release is not None:
+                release()
+        self.__preload = None
+
+    def __set_library(self, library: dict, release, name_filter):
+        """
+        Replaces the current library, and its name filter, releasing the
+        library if it was shared.
+        """
+        self.__library = library
+        self.__name_filter = name_filter
+        self.__name_index = None
+        old_release, self.__release_library = self.__release_library, release
+        if old_release is not None:
+            old_release()
+
+    def __start_reload_thread(self, signature: tuple, hostSession):
+        stop = threading.Event()
+        # The thread only holds a weak reference to this instance, so
+        # that it can be deleted (releasing any shared library), at
+        # which point the thread is stopped.
+        self.__stop_reload = weakref.finalize(self, stop.set)
+        self.__reload_thread = threading.Thread(
+            target=self.__poll_library,
+            args=(
+                weakref.WeakMethod(self.__reload_library),
+                self.__settings["library_path"],
+                self.__settings["library_reload_interval"],
+                signature,
+                stop,
+                hostSession,
+            ),
+            name="bal-reload",
+            daemon=True,
+        )
+        self.__reload_thread.start()
+
+    def __stop_reload_thread(self):
+        if self.__reload_thread is not None:
+            self.__stop_reload()
+            self.__reload_thread.join()
+            self.__reload_thread = None
+
+    @staticmethod
+    def __poll_library(
+        reload_library_ref,
+        path: str,
+        interval: float,
+        signature: tuple,
+        stop: threading.Event,
+        hostSession,
+    ):
+        """
+        Reloads the library, by calling the weakly referenced
+        __reload_library, whenever the library file's signature changes,
+        until the supplied event is set, or the instance is deleted.
+        """
+        logger = hostSession.logger()
+        while not stop.wait(interval):
+            try:
+                new_signature = bal.library_signature(path)
+            except OSError:
+                # The file may be mid-replacement, try again next time.
+                continue
+            if new_signature == signature:
+                continue
+            # Updated regardless of success, so a broken file is only
+            # reported once.
+            signature = new_signature
+            reload_library = reload_library_ref()
+            if reload_library is None:
+                return
+            try:
+                num_changed = reload_library()
+            except Exception as exc:  # pylint: disable=broad-except
+                logger.log(
+                    logger.Severity.kWarning, f"Failed to reload library from {path}: {exc}"
+                )
+            else:
+                logger.log(
+                    logger.Severity.kDebug,
+                    f"Reloaded library from {path}, {num_changed} entities changed",
+                )
+            # Not held whilst waiting, so the instance can be deleted.
+            del reload_library
+
+    def __reload_library(self) -> int:
+        """
+        Loads the library file again, replacing the current library.
+
+        Entities registered since the library was initially loaded are
+        carried over, and take precedence over the file. Cached results
+        are only invalidated for entities whose content changed.
+
+        @return The number of entities that changed.
+        """
+        self.__await_library()
+        # Queries are only blocked whilst the new library is swapped in,
+        # not whilst it is loaded and compared.
+        library, release = self.__load_library()
+        library.setdefault("entities", {})
+        with self.__lock.read():
+            diff = bal.diff_libraries(self.__library, library)
+            changed = diff.entities - self.__registered_names
+
+        policy_index = self.__build_policy_index(library) if diff.management_policy else None
+        name_filter = self.__build_name_filter(library)
+
+        with self.__register_lock, self.__lock.write():
+            for name in self.__registered_names:
+                library["entities"][name] = self.__library["entities"][name]
+            if name_filter is not None:
+                name_filter.update(self.__registered_names)
+            self.__set_library(library, release, name_filter)
+            if policy_index is not None:
+                self.__policy_index = policy_index
+            for name in changed:
+                self.__resolve_cache.pop_group(name)
+
+        return len(changed)
 
     def managementPolicy(self, traitSets, context, hostSession):
 
         access = "read" if context.isForRead() else "write"
-        return [
-            self.__dict_to_traits_data(bal.management_policy(trait_set, access, self.__library))
-            for trait_set in traitSets
-        ]
+        # The index holds pre-built TraitsData, copying them is a single
+        # call, rather than one per trait and property. The host owns
+        # the results, and may modify them, so each element is given
+        # its own copy, even for identical trait sets.
+        with self.__instrumentation.measure("managementPolicy", len(traitSets), hostSession):
+            if self.__client is not None:
+                return self.__client.management_policy(traitSets, access)
+            self.__await_library()
+            with self.__lock.read():
+                return bal.management_policies(traitSets, access, self.__policy_index, TraitsData)
 
     def isEntityReferenceString(self, someString, hostSession):
         return someString.startswith(self.__reference_prefix)
 
     def entityExists(self, entityRefs, context, hostSession):
         results = []
-        for ref in entityRefs:
-            try:
-                entity_info = bal.parse_entity_ref(ref.toString())
-                result = bal.exists(entity_info, self.__library)
-            except bal.MalformedBALReference as exc:
-                result = MalformedEntityReference(str(exc))
-            results.append(result)
+        with self.__instrumentation.measure("entityExists", len(entityRefs), hostSession):
+            if self.__client is not None:
+                return self.__remote_entity_exists(entityRefs, context)
+            self.__await_library()
+            with self.__lock.read():
+                for ref in entityRefs:
+                    try:
+                        entity_info = self.__parse_entity_ref(ref.toString())
+                        result = bal.exists(entity_info, self.__library, self.__name_filter)
+                    except bal.MalformedBALReference as exc:
+                        self.__instrumentation.record_error(
+                            "entityExists", BatchElementError.ErrorCode.kMalformedEntityReference
+                        )
+                        result = MalformedEntityReference(str(exc))
+                    results.append(result)
         return results
 
+    def findEntityReferences(self, pattern, hostSession):
+        """
+        Returns a reference to each entity whose name matches the
+        supplied glob pattern, in name order. See
+        bal.entity_names_matching.
+
+        OpenAssetIO has no API for listing entities, so this is only
+        available to hosts that use this class directly.
+        """
+        with self.__instrumentation.measure("findEntityReferences", 1, hostSession):
+            if self.__client is not None:
+                return self.__client.find_entity_references(pattern)
+            self.__await_library()
+            with self.__lock.read():
+                names = bal.entity_names_matching(pattern, self.__entity_name_index())
+        return [self.__build_entity_ref(bal.EntityInfo(name=name)) for name in names]
+
+    def __entity_name_index(self):
+        """
+        Returns the name index for the current library, building it if
+        this is the first query since the library was loaded. Must be
+        called with the read lock held.
+        """
+        # Concurrent first queries may each build an index, but they
+        # will be equivalent.
+        name_index = self.__name_index
+        if name_index is None:
+            name_index = bal.entity_name_index(self.__library)
+            self.__name_index = name_index
+        return name_index
+
     def resolve(
         self, entityReferences, traitSet, context, hostSession, successCallback, errorCallback
     ):
+        errorCallback = self.__instrumentation.counting_errors("resolve", errorCallback)
+        with self.__instrumentation.measure("resolve", len(entityReferences), hostSession):
+            bal.run_steps(
+                self.__resolve(entityReferences, traitSet, context, successCallback, errorCallback)
+            )
+
+    async def resolveAsync(
+        self, entityReferences, traitSet, context, hostSession, successCallback, errorCallback
+    ):
+        """
+        An awaitable counterpart to `resolve`, for use from an asyncio
+        event loop. Control is returned to the loop after each chunk of
+        `resolve_chunk_size` references, and any blocking work runs in
+        the loop's default executor.
+        """
+        errorCallback = self.__instrumentation.counting_errors("resolve", errorCallback)
+        with self.__instrumentation.measure("resolve", len(entityReferences), hostSession):
+            await bal.run_steps_async(
+                self.__resolve(entityReferences, traitSet, context, successCallback, errorCallback)
+            )
+
+    def __resolve(self, entityReferences, traitSet, context, successCallback, errorCallback):
+        """
+        Resolves the supplied references as a generator of steps, see
+        bal.run_steps.
+
+        The read lock is only held whilst each chunk is resolved, and
+        each chunk's callbacks are called before the next is started.
+        """
         if context.isForWrite():
             result = BatchElementError(
                 BatchElementError.ErrorCode.kEntityAccessError, "BAL entities are read-only"
@@ -124,48 +592,107 @@ class BasicAssetLibraryInterface(ManagerInterface):
                 errorCallback(idx, result)
             return
 
-        for idx, ref in enumerate(entityReferences):
-            try:
-                entity_info = bal.parse_entity_ref(ref.toString())
-            except bal.MalformedBALReference as exc:
-                result = BatchElementError(
-                    BatchElementError.ErrorCode.kMalformedEntityReference, str(exc)
+        trait_set = frozenset(traitSet)
+
+        if self.__client is not None:
+            yield from self.__remote_steps(
+                lambda: self.__client.resolve(entityReferences, trait_set, "read"),
+                successCallback,
+                errorCallback,
+            )
+            return
+
+        if self.__preload is not None:
+            yield self.__await_library
+
+        chunk_size = self.__settings["resolve_chunk_size"]
+        if self.__resolve_executor is not None and len(entityReferences) > chunk_size:
+            yield from self.__resolve_parallel(
+                entityReferences, trait_set, successCallback, errorCallback
+            )
+            return
+
+        for start in range(0, len(entityReferences), chunk_size):
+            results = self.__resolve_chunk(entityReferences[start : start + chunk_size], trait_set)
+            self.__call_callbacks(start, results, successCallback, errorCallback)
+            yield None
+
+    def __resolve_parallel(
+        self, entityReferences, trait_set: frozenset, successCallback, errorCallback
+    ):
+        """
+        Resolves the supplied references in chunks of
+        `resolve_chunk_size` on the resolve thread pool, as a generator
+        of steps, see bal.run_steps.
+
+        As with serial resolution, the read lock is only held whilst
+        each chunk is resolved, and each chunk's callbacks are called,
+        in order, on the calling thread, as soon as it and the chunks
+        before it are resolved. At most two chunks per worker are in
+        flight at once, bounding the results held.
+        """
+        chunk_size = self.__settings["resolve_chunk_size"]
+        max_pending = 2 * self.__settings["resolve_workers"]
+        starts = collections.deque(range(0, len(entityReferences), chunk_size))
+        pending = collections.deque()
+        while pending or starts:
+            while starts and len(pending) < max_pending:
+                start = starts.popleft()
+                future = self.__resolve_executor.submit(
+                    self.__resolve_chunk, entityReferences[start : start + chunk_size], trait_set
                 )
+                pending.append((start, future))
+            start, future = pending.popleft()
+            results = yield future.result
+            self.__call_callbacks(start, results, successCallback, errorCallback)
+
+    @staticmethod
+    def __call_callbacks(start: int, results: list, successCallback, errorCallback):
+        """
+        Calls the appropriate callback for each of the supplied results,
+        the first of which is for the element at index `start`.
+        """
+        for idx, result in enumerate(results, start):
+            if isinstance(result, BatchElementError):
                 errorCallback(idx, result)
             else:
+                successCallback(idx, result)
+
+    def preflight(
+        self, targetEntityRefs, traitSet, context, hostSession, successCallback, errorCallback
+    ):
+        errorCallback = self.__instrumentation.counting_errors("preflight", errorCallback)
+        with self.__instrumentation.measure("preflight", len(targetEntityRefs), hostSession):
+            # Support publishing to any valid entity reference
+            for idx, ref in enumerate(targetEntityRefs):
                 try:
-                    entity = bal.entity(entity_info, self.__library)
-                except bal.UnknownBALEntity:
+                    self.__parse_entity_ref(ref.toString())
+                except bal.MalformedBALReference as exc:
                     result = BatchElementError(
-                        BatchElementError.ErrorCode.kEntityResolutionError,
-                        f"Entity '{ref.toString()}' not found",
+                        BatchElementError.ErrorCode.kMalformedEntityReference, str(exc)
                     )
                     errorCallback(idx, result)
                 else:
-                    result = TraitsData()
-                    for trait in traitSet:
-                        trait_data = entity.traits.get(trait)
-                        if trait_data is not None:
-                            self.__add_trait_to_traits_data(trait, trait_data, result)
+                    successCallback(idx, ref)
 
-                    successCallback(idx, result)
-
-    def preflight(
-        self, targetEntityRefs, traitSet, context, hostSession, successCallback, errorCallback
+    def register(
+        self,
+        targetEntityRefs,
+        entityTraitsDatas,
+        context,
+        hostSession,
+        successCallback,
+        errorCallback,
     ):
-        # Support publishing to any valid entity reference
-        for idx, ref in enumerate(targetEntityRefs):
-            try:
-                bal.parse_entity_ref(ref.toString())
-            except bal.MalformedBALReference as exc:
-                result = BatchElementError(
-                    BatchElementError.ErrorCode.kMalformedEntityReference, str(exc)
+        errorCallback = self.__instrumentation.counting_errors("register", errorCallback)
+        with self.__instrumentation.measure("register", len(targetEntityRefs), hostSession):
+            bal.run_steps(
+                self.__register(
+                    targetEntityRefs, entityTraitsDatas, successCallback, errorCallback
                 )
-                errorCallback(idx, result)
-            else:
-                successCallback(idx, ref)
+            )
 
-    def register(
+    async def registerAsync(
         self,
         targetEntityRefs,
         entityTraitsDatas,
@@ -174,47 +701,253 @@ class BasicAssetLibraryInterface(ManagerInterface):
         successCallback,
         errorCallback,
     ):
+        """
+        An awaitable counterpart to `register`, for use from an asyncio
+        event loop. Control is returned to the loop after converting
+        each chunk of `resolve_chunk_size` elements, and any journaling
+        runs in the loop's default executor.
+        """
+        errorCallback = self.__instrumentation.counting_errors("register", errorCallback)
+        with self.__instrumentation.measure("register", len(targetEntityRefs), hostSession):
+            await bal.run_steps_async(
+                self.__register(
+                    targetEntityRefs, entityTraitsDatas, successCallback, errorCallback
+                )
+            )
+
+    def __register(self, targetEntityRefs, entityTraitsDatas, successCallback, errorCallback):
+        """
+        Registers the supplied data as a generator of steps, see
+        bal.run_steps.
+        """
+        if self.__client is not None:
+            yield from self.__remote_steps(
+                lambda: self.__client.register(targetEntityRefs, entityTraitsDatas),
+                successCallback,
+                errorCallback,
+            )
+            return
+
+        if self.__preload is not None:
+            yield self.__await_library
+
+        # The batch is held as parallel lists, rather than a tuple per
+        # element, to minimise the number of objects created.
+        indices = []
+        entity_infos = []
+        traits_dicts = []
+        # id(TraitsData) -> (TraitsData, traits dict)
+        converted = {}
         for idx, ref in enumerate(targetEntityRefs):
             try:
-                entity_info = bal.parse_entity_ref(ref.toString())
+                entity_info = self.__parse_entity_ref(ref.toString())
             except bal.MalformedBALReference as exc:
-                result = BatchElementError(
-                    BatchElementError.ErrorCode.kMalformedEntityReference, str(exc)
+                errorCallback(
+                    idx,
+                    BatchElementError(
+                        BatchElementError.ErrorCode.kMalformedEntityReference, str(exc)
+                    ),
                 )
-                errorCallback(idx, result)
             else:
-                traits_dict = self.__traits_data_to_dict(entityTraitsDatas[idx])
-                updated_entity_info = bal.create_or_update_entity(
-                    entity_info, traits_dict, self.__library
+                indices.append(idx)
+                entity_infos.append(entity_info)
+                traits_dicts.append(self.__convert_traits_data(entityTraitsDatas[idx], converted))
+            if (idx + 1) % self.__settings["resolve_chunk_size"] == 0:
+                yield None
+
+        if self.__journal is not None:
+            updated, journal_error = yield lambda: self.__apply_registrations(
+                entity_infos, traits_dicts
+            )
+        else:
+            updated, journal_error = self.__apply_registrations(entity_infos, traits_dicts)
+
+        if journal_error is not None:
+            for idx in indices:
+                errorCallback(idx, journal_error)
+            return
+
+        for idx, entity_info in zip(indices, updated):
+            successCallback(idx, self.__build_entity_ref(entity_info))
+
+    def __apply_registrations(self, entity_infos: list, traits_dicts: list):
+        """
+        Journals (if enabled), then applies, the supplied registrations
+        to the library, as a single batch.
+
+        @return A tuple of a list of the updated EntityInfo for each
+        registration, and a BatchElementError if journaling failed, in
+        which case nothing was applied, and nothing journaled unless
+        the error says otherwise (see journal.RollbackError).
+        """
+        with self.__register_lock:
+            if self.__journal is not None:
+                with self.__lock.read():
+                    bal.load_entities(
+                        self.__library, {entity_info.name for entity_info in entity_infos}
+                    )
+                try:
+                    self.__journal.append(
+                        (entity_info.name, traits_dict)
+                        for entity_info, traits_dict in zip(entity_infos, traits_dicts)
+                    )
+                except journal.RollbackError as exc:
+                    return [], BatchElementError(
+                        BatchElementError.ErrorCode.kUnknown,
+                        "Failed to journal registration, which may still be restored when the"
+                        f" library is next loaded: {exc}",
+                    )
+                except OSError as exc:
+                    return [], BatchElementError(
+                        BatchElementError.ErrorCode.kUnknown,
+                        f"Failed to journal registration: {exc}",
+                    )
+
+            with self.__lock.write():
+                updated = bal.create_or_update_entities(
+                    entity_infos,
+                    traits_dicts,
+                    self.__library,
+                    self.__settings["max_entity_versions"],
+                )
+                names = {entity_info.name for entity_info in entity_infos}
+                for name in names:
+                    self.__resolve_cache.pop_group(name)
+                self.__registered_names.update(names)
+                if self.__name_index is not None:
+                    self.__name_index.add(names)
+                if self.__name_filter is not None:
+                    self.__name_filter.update(names)
+
+        return updated, None
+
+    def __remote_steps(self, call, successCallback, errorCallback):
+        """
+        Makes the supplied blocking call to the BAL server as a single
+        step (see bal.run_steps), then calls the appropriate callback
+        for each of the results it returns.
+        """
+        results = yield call
+        self.__call_callbacks(0, results, successCallback, errorCallback)
+
+    def __remote_entity_exists(self, entityRefs, context) -> list:
+        """
+        Queries the BAL server for the existence of the supplied
+        entities, see entityExists.
+        """
+        results = self.__client.entity_exists(
+            entityRefs, "read" if context.isForRead() else "write"
+        )
+        for result in results:
+            if isinstance(result, MalformedEntityReference):
+                self.__instrumentation.record_error(
+                    "entityExists", BatchElementError.ErrorCode.kMalformedEntityReference
                 )
-                successCallback(idx, self.__build_entity_ref(updated_entity_info))
+        return results
+
+    def __resolve_chunk(self, refs, trait_set: frozenset) -> list:
+        """
+        Resolves the supplied trait set for each of the supplied entity
+        references, under the read lock, returning a list of results,
+        as per __resolve_one.
+        """
+        with self.__lock.read():
+            return [self.__resolve_one(ref, trait_set) for ref in refs]
+
+    def __resolve_one(self, ref: EntityReference, trait_set: frozenset):
+        """
+        Resolves the supplied trait set for a single entity reference.
+
+        @return The resolved TraitsData, or a BatchElementError if the
+        reference could not be resolved.
+        """
+        try:
+            entity_info = self.__parse_entity_ref(ref.toString())
+        except bal.MalformedBALReference as exc:
+            return BatchElementError(
+                BatchElementError.ErrorCode.kMalformedEntityReference, str(exc)
+            )
+        try:
+            return self.__resolve_traits_data(entity_info, trait_set)
+        except bal.UnknownBALEntity:
+            return BatchElementError(
+                BatchElementError.ErrorCode.kEntityResolutionError,
+                f"Entity '{ref.toString()}' not found",
+            )
+
+    def __resolve_traits_data(
+        self, entity_info: bal.EntityInfo, trait_set: frozenset
+    ) -> TraitsData:
+        """
+        Builds a TraitsData holding the requested traits of the
+        specified entity.
+
+        The result for any given entity version and trait set is cached,
+        such that subsequent requests only need to copy it. Results for
+        compactly stored versions are cached by the blocks holding their
+        traits, so are shared by every version with the same traits.
+        """
+        entity = bal.entity(entity_info, self.__library, trait_set, self.__name_filter)
+        if not entity.traits:
+            # The entity has none of the requested traits, which is
+            # not worth caching.
+            return TraitsData()
+
+        if entity.blocks is not None:
+            # Blocks are compared by identity, so are held alongside the
+            # result, such that their ids cannot be reused by others.
+            # Block content never changes, so these entries need not be
+            # invalidated by registration.
+            cache_key = tuple(map(id, entity.blocks))
+            cached = self.__resolve_cache.get(cache_key)
+            if cached is None:
+                cached = (entity.blocks, traitsdata.from_dict(entity.traits))
+                self.__resolve_cache.put(cache_key, cached)
+            return TraitsData(cached[1])
+
+        # Grouped by name, so that registration and reload can drop
+        # every result for an entity.
+        cache_key = (entity_info.name, entity.version, trait_set)
+        traits_data = self.__resolve_cache.get(cache_key)
+        if traits_data is None:
+            traits_data = traitsdata.from_dict(entity.traits)
+            self.__resolve_cache.put(cache_key, traits_data, group=entity_info.name)
+
+        # The host owns the result, so must not be given the cached
+        # instance.
+        return TraitsData(traits_data)
 
     def __build_entity_ref(self, entity_info: bal.EntityInfo) -> EntityReference:
         """
         Builds an openassetio EntityReference from a BAL EntityInfo
         """
         ref_string = f"bal:///{entity_info.name}"
+        if entity_info.version is not None:
+            ref_string += f"?{bal.VERSION_QUERY_PARAM}={entity_info.version}"
         return self._createEntityReference(ref_string)
 
-    @classmethod
-    def __dict_to_traits_data(cls, traits_dict: dict):
-        traits_data = TraitsData()
-        for trait_id, trait_properties in traits_dict.items():
-            cls.__add_trait_to_traits_data(trait_id, trait_properties, traits_data)
-        return traits_data
-
-    @classmethod
-    def __traits_data_to_dict(cls, traits_data: TraitsData):
-        return {
-            trait_id: {
-                prop_key: traits_data.getTraitProperty(trait_id, prop_key)
-                for prop_key in traits_data.traitPropertyKeys(trait_id)
-            }
-            for trait_id in traits_data.traitSet()
-        }
+    @staticmethod
+    def __build_policy_index(library: dict) -> dict:
+        """
+        Builds a bal policy index for the supplied library, with each
+        policy converted to a TraitsData ready to be returned to the
+        host.
+        """
+        return bal.management_policy_index(library, traitsdata.from_dict)
 
     @staticmethod
-    def __add_trait_to_traits_data(trait_id: str, trait_properties: dict, traits_data: TraitsData):
-        traits_data.addTrait(trait_id)
-        for name, value in trait_properties.items():
-            traits_data.setTraitProperty(trait_id, name, value)
+    def __convert_traits_data(traits_data: TraitsData, converted: dict) -> dict:
+        """
+        Converts the supplied TraitsData to a dict, reusing any previous
+        conversion of the same instance held in `converted`.
+
+        Hosts often supply the same TraitsData for many elements of a
+        batch, so each distinct instance need only be converted once.
+        The instance is held alongside its dict, so that its id cannot
+        be reused by another.
+        """
+        cached = converted.get(id(traits_data))
+        if cached is None:
+            cached = (traits_data, traitsdata.to_dict(traits_data))
+            converted[id(traits_data)] = cached
+        return cached[1]
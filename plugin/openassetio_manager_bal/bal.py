@@ -24,14 +24,43 @@ an asset management system". Consequently, it omits a plethora of "good
 engineering practice".
 """
 
+import functools
 import json
+import os
+import re
 
 from collections import namedtuple
-from typing import Set
-from urllib.parse import urlparse
-
-EntityInfo = namedtuple("EntityInfo", ("name"), defaults=("",))
-Entity = namedtuple("Entity", ("traits"), defaults=({},))
+from typing import Any, Callable, Dict, List, Set
+
+from . import bloom, compact, entities, journal, names, shards, snapshot
+
+LIBRARY_LOAD_MODES = ("eager", "lazy")
+LIBRARY_SNAPSHOT_MODES = ("off", "use", "update")
+RESOLVE_EXECUTION_MODES = ("serial", "threads")
+LIBRARY_STORAGE_MODES = ("dict", "compact")
+
+# The query parameter used to address a specific version of an entity,
+# and the value used to explicitly request the latest version.
+VERSION_QUERY_PARAM = "v"
+LATEST_VERSION_TAG = "latest"
+
+# Matches the common case of a reference with the BAL prefix and a
+# non-empty name, optionally followed by a valid version query and/or a
+# fragment. Tabs and newlines are excluded, as urlparse strips them.
+_SIMPLE_ENTITY_REF = re.compile(
+    r"bal:///([^?#\t\r\n]+)"
+    rf"(?:\?{VERSION_QUERY_PARAM}=([1-9][0-9]*|{LATEST_VERSION_TAG}))?"
+    r"(?:#[^\t\r\n]*)?\Z",
+    re.DOTALL,
+)
+
+# A version of None addresses the latest version of the entity.
+EntityInfo = namedtuple("EntityInfo", ("name", "version"), defaults=("", None))
+# For compactly stored versions, `blocks` holds the blocks of the
+# projected traits (see compact.CompactVersion.project_blocks).
+Entity = namedtuple("Entity", ("traits", "version", "blocks"), defaults=({}, 0, None))
+PolicyIndex = namedtuple("PolicyIndex", ("default", "exceptions"))
+LibraryDiff = namedtuple("LibraryDiff", ("entities", "management_policy"))
 
 
 def make_default_settings() -> dict:
@@ -40,13 +69,37 @@ def make_default_settings() -> dict:
     Note: as a library is required, the default settings are not enough
     to initialize the manager.
     """
-    return {"library_path": ""}
+    return {
+        "library_path": "",
+        "library_load_mode": "eager",
+        "lazy_entity_cache_size": 10000,
+        "library_snapshot": "off",
+        "entity_ref_cache_size": 0,
+        "resolve_cache_size": 10000,
+        "resolve_execution_mode": "serial",
+        "resolve_workers": 4,
+        "resolve_chunk_size": 10000,
+        "library_journal": False,
+        "max_entity_versions": 0,
+        "library_reload_interval": 0.0,
+        "library_sharing": False,
+        "library_preload": False,
+        "library_storage": "dict",
+        "library_validation": False,
+        "shard_load_workers": 4,
+        "name_filter": False,
+        "name_filter_false_positive_rate": 0.01,
+        "server_socket": "",
+        "server_connections": 4,
+        "instrumentation": False,
+        "instrumentation_log_interval": 60.0,
+    }
 
 
 def validate_settings(settings: dict):
     """
     Parses the supplied settings dict, raising if there are any
-    unrecognized keys present.
+    unrecognized keys present, or values that are not supported.
     """
 
     defaults = make_default_settings()
@@ -55,15 +108,272 @@ def validate_settings(settings: dict):
         if key not in defaults:
             raise KeyError(f"Unknown setting '{key}'")
 
-
-def load_library(path: str) -> dict:
+    load_mode = settings.get("library_load_mode", defaults["library_load_mode"])
+    if load_mode not in LIBRARY_LOAD_MODES:
+        raise ValueError(
+            f"Unknown library_load_mode '{load_mode}', must be one of {LIBRARY_LOAD_MODES}"
+        )
+
+    snapshot_mode = settings.get("library_snapshot", defaults["library_snapshot"])
+    if snapshot_mode not in LIBRARY_SNAPSHOT_MODES:
+        raise ValueError(
+            f"Unknown library_snapshot '{snapshot_mode}', must be one of {LIBRARY_SNAPSHOT_MODES}"
+        )
+
+    storage = settings.get("library_storage", defaults["library_storage"])
+    if storage not in LIBRARY_STORAGE_MODES:
+        raise ValueError(
+            f"Unknown library_storage '{storage}', must be one of {LIBRARY_STORAGE_MODES}"
+        )
+
+    if settings.get("library_validation", defaults["library_validation"]):
+        from . import validation  # pylint: disable=import-outside-toplevel
+
+        if not validation.is_available():
+            raise ValueError("library_validation requires the 'jsonschema' package")
+
+    library_path = settings.get("library_path", defaults["library_path"])
+    if shards.is_sharded(library_path) and not os.path.exists(shards.manifest_path(library_path)):
+        raise ValueError(
+            f"library_path '{library_path}' is a directory, but has no {shards.MANIFEST_NAME}"
+        )
+
+    # Counts of threads, connections or elements. Batches are split
+    # into chunks of resolve_chunk_size even when resolved serially.
+    for key in (
+        "resolve_chunk_size",
+        "resolve_workers",
+        "shard_load_workers",
+        "server_connections",
+    ):
+        if settings.get(key, defaults[key]) < 1:
+            raise ValueError(f"{key} must be at least 1")
+
+    false_positive_rate = settings.get(
+        "name_filter_false_positive_rate", defaults["name_filter_false_positive_rate"]
+    )
+    if not bloom.MIN_FALSE_POSITIVE_RATE <= false_positive_rate < 1:
+        raise ValueError(
+            f"name_filter_false_positive_rate must be at least {bloom.MIN_FALSE_POSITIVE_RATE}"
+            f" and less than 1, not {false_positive_rate}"
+        )
+
+    execution_mode = settings.get("resolve_execution_mode", defaults["resolve_execution_mode"])
+    if execution_mode not in RESOLVE_EXECUTION_MODES:
+        raise ValueError(
+            f"Unknown resolve_execution_mode '{execution_mode}', must be one of"
+            f" {RESOLVE_EXECUTION_MODES}"
+        )
+
+
+def load_library(  # pylint: disable=too-many-arguments
+    path: str,
+    load_mode: str = "eager",
+    entity_cache_size: int = 10000,
+    snapshot_mode: str = "off",
+    max_versions: int = 0,
+    storage: str = "dict",
+    validate: bool = False,
+    shard_workers: int = 4,
+) -> dict:
     """
-    Loads a library from the supplied path
+    Loads a library from the supplied path.
+
+    In "eager" mode, the whole file is parsed up front. In "lazy" mode,
+    the file is memory mapped, and only the top-level structure is
+    parsed, along with an index of where each entity can be found in
+    the file. Entities are then
+    decoded on first access, and the most recently used
+    `entity_cache_size` are kept in memory.
+
+    If `snapshot_mode` is "use", then a compiled snapshot alongside the
+    library file will be memory mapped instead, as long as it is newer
+    than the library file. This only exposes the latest version of each
+    entity. In "update" mode, a missing or stale snapshot is compiled
+    from the library file first.
+
+    If `storage` is "compact", then eagerly loaded entities are held in
+    a compact, read-only, form (see compact.py), beneath a writable
+    overlay. Lazily loaded and snapshot entities are unaffected.
+
+    If `validate` is set, the library file is validated against the
+    library schema, raising a validation.InvalidLibrary listing any
+    errors. Files that passed when previously loaded are not checked
+    again (see validation.py).
+
+    Any journal of registrations alongside the library file is then
+    replayed on top of it, subject to the `max_versions` retention limit
+    (see create_or_update_entity).
+
+    If the path is a directory, it is loaded as a sharded library (see
+    shards.py), with each shard file loaded as above. In "eager" mode,
+    all shards are loaded up front, on up to `shard_workers` threads,
+    otherwise each shard is loaded on first use.
     """
     if not path:
         # Allow an empty path, meaning an empty library.
         return {}
 
+    if shards.is_sharded(path):
+        return shards.load_sharded_library(
+            path,
+            functools.partial(
+                load_library,
+                load_mode=load_mode,
+                entity_cache_size=entity_cache_size,
+                snapshot_mode=snapshot_mode,
+                max_versions=max_versions,
+                storage=storage,
+                validate=validate,
+            ),
+            eager=load_mode == "eager",
+            num_workers=shard_workers,
+        )
+
+    library = _load_library_base(path, load_mode, entity_cache_size, snapshot_mode)
+
+    if validate:
+        # Deferred, as validation is optional, and rarely enabled.
+        from . import validation  # pylint: disable=import-outside-toplevel
+
+        # An eagerly loaded library can be validated as-is, otherwise
+        # the file is parsed again, should it need validating.
+        is_parsed = not isinstance(library.get("entities"), entities.OverlayEntities)
+        validation.validate_library_file(path, library if is_parsed else None)
+
+    if storage == "compact" and isinstance(library.get("entities"), dict):
+        library["entities"] = entities.OverlayEntities(
+            compact.compact_entities(library["entities"])
+        )
+
+    entries = list(journal.read_entries(journal.journal_path(path)))
+    if entries:
+        library.setdefault("entities", {})
+        create_or_update_entities(
+            [EntityInfo(name=name) for name, _ in entries],
+            [traits_dict for _, traits_dict in entries],
+            library,
+            max_versions,
+        )
+
+    return library
+
+
+def compact_library(path: str):
+    """
+    Folds any journal of registrations alongside the library at the
+    supplied path into the library file itself, and removes the
+    journal.
+
+    For a sharded library, only the shards that have a journal are
+    rewritten.
+
+    This must not be called whilst any manager is journaling
+    registrations to the library.
+    """
+    if shards.is_sharded(path):
+        for index in range(shards.Partition(shards.read_manifest(path)["shards"]).num_shards):
+            compact_library(shards.shard_path(path, index))
+        return
+
+    journal_path = journal.journal_path(path)
+    if not os.path.exists(journal_path):
+        return
+    journal.write_library(load_library(path), path)
+    os.remove(journal_path)
+
+
+def library_signature(path: str) -> tuple:
+    """
+    Returns a value that changes whenever the library file at the
+    supplied path is modified or replaced. For a sharded library, this
+    covers its manifest and each shard.
+
+    As for a library file, journals are not covered, so that appending
+    registrations does not trigger a reload (which would load every
+    shard).
+    """
+    if shards.is_sharded(path):
+        return tuple(
+            library_signature(file_path)
+            for file_path in shards.library_files(path, journals=False)
+        )
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+def library_size(path: str) -> int:
+    """
+    Returns the size, in bytes, of the library at the supplied path,
+    summed over the files of a sharded library.
+    """
+    if not path:
+        return 0
+    if shards.is_sharded(path):
+        return sum(os.path.getsize(file_path) for file_path in shards.library_files(path))
+    return os.path.getsize(path)
+
+
+def open_journal(path: str):
+    """
+    Opens the journal of registrations to the library at the supplied
+    path, see journal.Journal. The journal of a sharded library writes
+    each registration to the journal of the shard holding its entity.
+    """
+    if shards.is_sharded(path):
+        return shards.ShardedJournal(path)
+    return journal.Journal(journal.journal_path(path))
+
+
+def diff_libraries(old: dict, new: dict) -> LibraryDiff:
+    """
+    Compares two libraries, typically successive loads of the same
+    library file.
+
+    For a sharded library, only the shards the old library has loaded
+    are compared, and only if their files changed (see
+    shards.changed_keys), so that a reload does not load every shard.
+
+    @return A LibraryDiff holding the set of names of the entities that
+    were added, removed or modified, and whether the management policy
+    changed.
+    """
+    old_entities = old.get("entities", {})
+    new_entities = new.get("entities", {})
+    if isinstance(old_entities, shards.ShardedEntities) and isinstance(
+        new_entities, shards.ShardedEntities
+    ):
+        changed = shards.changed_keys(old_entities, new_entities)
+    else:
+        changed = entities.changed_keys(old_entities, new_entities)
+    return LibraryDiff(
+        entities=changed,
+        management_policy=old.get("managementPolicy") != new.get("managementPolicy"),
+    )
+
+
+def _load_library_base(path, load_mode, entity_cache_size, snapshot_mode) -> dict:
+    """
+    Loads the library file at the supplied path, or its snapshot, as
+    per load_library, without replaying its journal.
+    """
+    if snapshot_mode != "off":
+        if snapshot.is_fresh(path):
+            return snapshot.load_snapshot(snapshot.snapshot_path(path), entity_cache_size)
+        if snapshot_mode == "update":
+            snapshot.write_snapshot(_load_library_json(path), snapshot.snapshot_path(path))
+            return snapshot.load_snapshot(snapshot.snapshot_path(path), entity_cache_size)
+
+    if load_mode == "lazy":
+        return entities.load_library_lazily(path, entity_cache_size)
+
+    return _load_library_json(path)
+
+
+def _load_library_json(path: str) -> dict:
+    """
+    Parses the whole of the library file at the supplied path.
+    """
     with open(path, "r", encoding="utf-8") as file:
         return json.load(file)
 
@@ -71,7 +381,23 @@ def load_library(path: str) -> dict:
 def parse_entity_ref(entity_ref: str) -> EntityInfo:
     """
     Decomposes an entity reference into bal fields.
+
+    A specific version of an entity can be addressed by adding a
+    `v=<version>` query parameter, where versions are numbered from 1.
+    Without one, or with `v=latest`, the reference addresses the latest
+    version.
     """
+    match = _SIMPLE_ENTITY_REF.match(entity_ref)
+    if match is not None:
+        version = match.group(2)
+        if version is None or version == LATEST_VERSION_TAG:
+            return EntityInfo(name=match.group(1))
+        return EntityInfo(name=match.group(1), version=int(version))
+
+    # Anything unusual takes the slower, but more thorough, path. This
+    # is rare enough that urllib is only imported when it is needed.
+    from urllib.parse import parse_qs, urlparse  # pylint: disable=import-outside-toplevel
+
     uri_parts = urlparse(entity_ref)
 
     if len(uri_parts.path) <= 1:
@@ -80,83 +406,356 @@ def parse_entity_ref(entity_ref: str) -> EntityInfo:
     # path will start with a /
     name = uri_parts.path[1:]
 
-    return EntityInfo(name=name)
+    versions = parse_qs(uri_parts.query).get(VERSION_QUERY_PARAM)
+    if not versions or versions[-1] == LATEST_VERSION_TAG:
+        return EntityInfo(name=name)
+
+    version = versions[-1]
+    if not (version.isascii() and version.isdigit() and int(version) > 0):
+        raise MalformedBALReference(
+            f"Invalid version '{version}', must be a positive integer or '{LATEST_VERSION_TAG}'"
+        )
+    return EntityInfo(name=name, version=int(version))
 
 
-def exists(entity_info: EntityInfo, library: dict) -> bool:
+def entity_ref_parser(cache_size: int = 0):
     """
-    Determines if the supplied entity exists in the library
+    Returns a callable with the same behaviour as parse_entity_ref.
+    If `cache_size` is greater than zero, the results for the most
+    recently used `cache_size` references are memoized.
     """
-    return entity_info.name in library["entities"]
+    if cache_size <= 0:
+        return parse_entity_ref
+    return functools.lru_cache(maxsize=cache_size)(parse_entity_ref)
 
 
-def entity(entity_info: EntityInfo, library: dict) -> Entity:
+def exists(entity_info: EntityInfo, library: dict, name_filter: bloom.BloomFilter = None) -> bool:
     """
-    Retrieves the Entity data addressed by the supplied EntityInfo
+    Determines if the supplied entity exists in the library. If the
+    EntityInfo specifies a version, then that version must also exist.
+
+    If a `name_filter` for the library is supplied (see
+    entity_name_filter), entities it rejects are not looked up.
     """
+    if name_filter is not None and entity_info.name not in name_filter:
+        return False
+    if entity_info.version is None:
+        return entity_info.name in library["entities"]
+    entity_dict = _library_entity_dict(entity_info, library)
+    return entity_dict is not None and _version_index(entity_info, entity_dict) is not None
+
+
+def entity(
+    entity_info: EntityInfo,
+    library: dict,
+    trait_set: Set[str] = None,
+    name_filter: bloom.BloomFilter = None,
+) -> Entity:
+    """
+    Retrieves the Entity data addressed by the supplied EntityInfo,
+    either a specific version, or the latest if none is specified.
+
+    If a `trait_set` is supplied, the Entity's traits are limited to
+    those in the set that the version has, see project_traits.
+
+    If a `name_filter` for the library is supplied (see
+    entity_name_filter), entities it rejects are not looked up.
+    """
+    if name_filter is not None and entity_info.name not in name_filter:
+        raise UnknownBALEntity()
     entity_dict = _library_entity_dict(entity_info, library)
     if entity_dict is None:
         raise UnknownBALEntity()
 
-    return Entity(**entity_dict["versions"][-1])
+    index = _version_index(entity_info, entity_dict)
+    if index is None:
+        raise UnknownBALEntity()
+
+    version = entity_dict.get("firstVersion", 1) + index
+    version_dict = entity_dict["versions"][index]
+    if trait_set is None:
+        return Entity(version=version, **version_dict)
+    if isinstance(version_dict, compact.CompactVersion):
+        return Entity(
+            traits=version_dict.project_traits(trait_set),
+            version=version,
+            blocks=version_dict.project_blocks(trait_set),
+        )
+    return Entity(traits=project_traits(version_dict, trait_set), version=version)
 
 
-def management_policy(trait_set: Set[str], access: str, library: dict) -> dict:
+def project_traits(version_dict: dict, trait_set: Set[str]) -> dict:
     """
-    Retrieves the management policy for the supplied trait set. The
-    default will be used unless an alternate default or trait set
-    specific exception is provided in the library.
+    Returns the traits of the supplied entity version that are in the
+    supplied trait set, so that callers interested in a few of an
+    entity's traits need not copy, or build, the rest.
     """
-    policies = library.get("managementPolicy", {}).get(access, {})
-    exceptions = policies.get("exceptions", [])
-    matching_policies = [e["policy"] for e in exceptions if set(e["traitSet"]) == trait_set]
+    if isinstance(version_dict, compact.CompactVersion):
+        return version_dict.project_traits(trait_set)
+    traits = version_dict["traits"]
+    if len(trait_set) > len(traits):
+        return {trait_id: value for trait_id, value in traits.items() if trait_id in trait_set}
+    return {trait_id: traits[trait_id] for trait_id in trait_set if trait_id in traits}
 
-    # By default, cooperatively manager all trait sets, unless the
-    # library tells us otherwise.
-    if matching_policies:
-        policy = matching_policies[0]
-    else:
-        policy = policies.get("default", {"openassetio.Managed": {}})
+
+def _version_index(entity_info: EntityInfo, entity_dict: dict):
+    """
+    Returns the index into the supplied entity's version list of the
+    version addressed by the supplied EntityInfo, or None if it does
+    not exist, or is no longer retained.
+
+    Versions are numbered from the entity's `firstVersion` (1 unless
+    older versions have been discarded), so this is a constant time
+    calculation.
+    """
+    num_versions = len(entity_dict["versions"])
+    if entity_info.version is None:
+        return num_versions - 1 if num_versions else None
+    index = entity_info.version - entity_dict.get("firstVersion", 1)
+    if 0 <= index < num_versions:
+        return index
+    return None
+
+
+def _unconverted(policy: dict) -> dict:
+    """
+    The default policy conversion for management_policy_index, which
+    stores each policy dict as-is.
+    """
     return policy
 
 
+def management_policy_index(
+    library: dict, convert: Callable[[dict], Any] = None
+) -> Dict[str, PolicyIndex]:
+    """
+    Builds a lookup table of the management policies in the supplied
+    library, so that the policy for any given trait set can be found
+    with a single hash lookup.
+
+    The table is keyed by access ("read" or "write"), and each entry
+    holds the default policy, along with a dict of exceptions keyed by
+    the frozenset of trait IDs they apply to.
+
+    If supplied, convert is called with each policy dict, and its
+    result stored in its place, so that any conversion to the host's
+    representation is done once, when the index is built.
+
+    The index is a snapshot of the library's policies at the time it is
+    built, and so must be rebuilt if the library is reloaded.
+    """
+    if convert is None:
+        convert = _unconverted
+    index = {}
+    for access in ("read", "write"):
+        policies = library.get("managementPolicy", {}).get(access, {})
+        exceptions = {}
+        for exception in policies.get("exceptions", []):
+            # The first exception for any given trait set wins.
+            trait_set = frozenset(exception["traitSet"])
+            if trait_set not in exceptions:
+                exceptions[trait_set] = convert(exception["policy"])
+        # By default, cooperatively manager all trait sets, unless the
+        # library tells us otherwise.
+        default = policies.get("default", {"openassetio.Managed": {}})
+        index[access] = PolicyIndex(default=convert(default), exceptions=exceptions)
+    return index
+
+
+def management_policy(trait_set: Set[str], access: str, policy_index: dict) -> Any:
+    """
+    Retrieves the management policy for the supplied trait set from a
+    policy index (see management_policy_index). The default will be
+    used unless a trait set specific exception is present.
+
+    The policy is returned as held in the index, which allows callers
+    to store pre-converted policies in place of the library's dicts.
+    """
+    index = policy_index[access]
+    return index.exceptions.get(frozenset(trait_set), index.default)
+
+
+def management_policies(
+    trait_sets, access: str, policy_index: dict, copy: Callable[[Any], Any] = None
+) -> list:
+    """
+    Retrieves the management policy for each of the supplied trait
+    sets, as per management_policy, looking up the policy index once
+    for the whole batch.
+
+    If supplied, `copy` is called with each element's policy, and its
+    result used in place of the policy, so that each element is given
+    its own object, even for identical trait sets.
+    """
+    index = policy_index[access]
+    exceptions = index.exceptions
+    default = index.default
+    if copy is None:
+        return [exceptions.get(frozenset(trait_set), default) for trait_set in trait_sets]
+    return [copy(exceptions.get(frozenset(trait_set), default)) for trait_set in trait_sets]
+
+
+def entity_name_index(library: dict) -> names.NameIndex:
+    """
+    Builds a sorted index of the names of the entities in the supplied
+    library, for use with entity_names_with_prefix and
+    entity_names_matching.
+
+    Names of entities subsequently added to the library must be added
+    to the index with its `add` method.
+    """
+    return names.NameIndex(library.get("entities", {}))
+
+
+def entity_name_filter(library: dict, false_positive_rate: float) -> bloom.BloomFilter:
+    """
+    Builds a Bloom filter over the names of the library's entities,
+    allowing names of entities that do not exist to be rejected by
+    `exists` and `entity` without looking them up. The filter reports
+    a non-existent entity as possibly existing with at most the supplied
+    probability.
+
+    This is most useful for libraries whose entities are costly to look
+    up, ie. those that are lazily loaded or memory mapped.
+
+    The filter must be updated with the names of any entities added to
+    the library afterwards.
+    """
+    entities_dict = library.get("entities", {})
+    return bloom.BloomFilter(entities_dict.keys(), len(entities_dict), false_positive_rate)
+
+
+def entity_names_with_prefix(prefix: str, name_index: names.NameIndex) -> List[str]:
+    """
+    Retrieves the names of the entities in a name index (see
+    entity_name_index) that start with the supplied prefix, in sorted
+    order.
+    """
+    return name_index.with_prefix(prefix)
+
+
+def entity_names_matching(pattern: str, name_index: names.NameIndex) -> List[str]:
+    """
+    Retrieves the names of the entities in a name index (see
+    entity_name_index) that match the supplied glob pattern, in sorted
+    order. Patterns are matched as per `fnmatch.fnmatchcase`, so `*`
+    also matches `/`.
+
+    Only the names starting with the literal characters that precede
+    the first wildcard are considered, so patterns such as `shot010/*`
+    do not need to scan the whole index.
+    """
+    return name_index.matching(pattern)
+
+
 def create_or_update_entity(
-    entity_info: EntityInfo, traits_dict: dict, library: dict
+    entity_info: EntityInfo, traits_dict: dict, library: dict, max_versions: int = 0
 ) -> EntityInfo:
     """
     Creates a new entity, or updates an existing one to hold the
     supplied traits data.
 
     Note: This makes no attempt to validate that trait set has not
-    changed since the last version. Presently this appends a new
-    version to the entity's version list with the updated data.
+    changed since the last version. This appends a new version to the
+    entity's version list with the updated data, regardless of any
+    version specified by the supplied EntityInfo.
+
+    If `max_versions` is greater than zero, the oldest versions beyond
+    that number are discarded, and the entity's `firstVersion` is
+    advanced to match, so that the remaining versions keep their
+    numbers.
+
+    @return An EntityInfo addressing the newly created version.
     """
-    version_dict = _next_entity_version_dict(entity_info, library)
-    version_dict["traits"] = traits_dict
-    # For now, we just keep the same reference until we properly
-    # support versioning.
-    return entity_info
+    return create_or_update_entities([entity_info], [traits_dict], library, max_versions)[0]
 
 
-def _next_entity_version_dict(entity_info: EntityInfo, library: dict) -> dict:
+def create_or_update_entities(
+    entity_infos, traits_dicts, library: dict, max_versions: int = 0
+) -> list:
     """
-    Creates and returns a new version entry for the supplied EntityInfo.
-    If this is a new entity, it will be created.
+    Applies a batch of updates to the library, with the same result as
+    calling create_or_update_entity for each EntityInfo and traits dict
+    pair in turn.
+
+    Each entity is only looked up once per batch, and only trimmed to
+    `max_versions` once all of its new versions have been added. Large
+    batches are dominated by per-element overheads, so as few objects
+    as possible are created for each.
+
+    Traits whose properties are unchanged from the entity's previous
+    version share that version's properties dict, so that long version
+    histories only hold each distinct set of properties once. Version
+    dicts must therefore never be modified in place.
+
+    @return A list of EntityInfo addressing each newly created version,
+    in the same order as the supplied EntityInfos.
+    """
+    entities_dict = library["entities"]
+    # Entity name -> entity dict, for each entity updated by the batch.
+    updated_entities = {}
+    results = []
+    for entity_info, traits_dict in zip(entity_infos, traits_dicts):
+        name = entity_info.name
+        entity_dict = updated_entities.get(name)
+        if entity_dict is None:
+            entity_dict = entities_dict.setdefault(name, {"versions": []})
+            updated_entities[name] = entity_dict
+        versions = entity_dict["versions"]
+        if versions and isinstance(versions[-1], dict):
+            traits_dict = _share_unchanged_traits(traits_dict, versions[-1]["traits"])
+        versions.append({"traits": traits_dict})
+        results.append(EntityInfo(name, entity_dict.get("firstVersion", 1) + len(versions) - 1))
+
+    if max_versions > 0:
+        for entity_dict in updated_entities.values():
+            versions = entity_dict["versions"]
+            excess = len(versions) - max_versions
+            if excess > 0:
+                del versions[:excess]
+                entity_dict["firstVersion"] = entity_dict.get("firstVersion", 1) + excess
+
+    return results
+
+
+def load_entities(library: dict, entity_names):
     """
-    entity_dict = _ensure_library_entity_dict(entity_info, library)
-    version_dict = {"traits": {}}
-    entity_dict["versions"].append(version_dict)
-    return version_dict
+    Ensures that the parts of the library that hold the named entities
+    are loaded, ie. the shards of a sharded library (see shards.py).
+
+    Loading a shard replays its journal, so the shards affected by a
+    batch of registrations must be loaded before the batch is
+    journaled, otherwise it would be applied twice.
+    """
+    entities_dict = library.get("entities", {})
+    for name in entity_names:
+        # Looking up an entity loads the shard that holds it.
+        _ = name in entities_dict
 
 
-def _ensure_library_entity_dict(entity_info: EntityInfo, library: dict) -> dict:
+def _share_unchanged_traits(traits_dict: dict, previous_traits_dict: dict) -> dict:
     """
-    Ensures there is a top-level entity dict for the supplied
-    EntityInfo, creating one if required. Newly created entities will
-    have no versions.
+    Returns the supplied traits, with the properties of any trait that
+    are identical to those in the previous traits replaced by the
+    previous properties dict. Values are compared along with their
+    types, as `1 == 1.0 == True`.
     """
-    entity_dict = library["entities"].setdefault(entity_info.name, {"versions": []})
-    return entity_dict
+    shared = None
+    for trait_id, trait_properties in traits_dict.items():
+        previous = previous_traits_dict.get(trait_id)
+        if (
+            previous is not None
+            and previous is not trait_properties
+            and previous == trait_properties
+            and all(
+                type(value) is type(previous[key])  # pylint: disable=unidiomatic-typecheck
+                for key, value in trait_properties.items()
+            )
+        ):
+            if shared is None:
+                shared = dict(traits_dict)
+            shared[trait_id] = previous
+    return traits_dict if shared is None else shared
 
 
 def _library_entity_dict(entity_info: EntityInfo, library: dict):
@@ -167,6 +766,61 @@ def _library_entity_dict(entity_info: EntityInfo, library: dict):
     return entities_dict.get(entity_info.name)
 
 
+def run_steps(steps):
+    """
+    Runs the supplied generator of steps to completion, returning its
+    return value.
+
+    Steps allow the same logic to be driven either synchronously, or
+    from an asyncio event loop (see run_steps_async). The generator
+    yields None wherever it is safe for other tasks to run, such as
+    between the chunks of a large batch. It yields a callable for any
+    blocking work, such as disk I/O, and is sent its result, or thrown
+    any exception it raises. Here, such callables are simply called.
+    """
+    send, value = steps.send, None
+    while True:
+        try:
+            step = send(value)
+        except StopIteration as exc:
+            return exc.value
+        send, value = steps.send, None
+        if step is not None:
+            try:
+                value = step()
+            except Exception as exc:  # pylint: disable=broad-except
+                send, value = steps.throw, exc
+
+
+async def run_steps_async(steps, executor=None):
+    """
+    Runs the supplied generator of steps (see run_steps) to completion
+    from the running asyncio event loop, returning its return value.
+
+    Control is returned to the event loop whenever the generator yields
+    None, and callables are run in the supplied executor (or the loop's
+    default executor), so that blocking work does not stall the loop.
+    """
+    # Deferred, as only async hosts need it.
+    import asyncio  # pylint: disable=import-outside-toplevel
+
+    loop = asyncio.get_running_loop()
+    send, value = steps.send, None
+    while True:
+        try:
+            step = send(value)
+        except StopIteration as exc:
+            return exc.value
+        send, value = steps.send, None
+        if step is None:
+            await asyncio.sleep(0)
+            continue
+        try:
+            value = await loop.run_in_executor(executor, step)
+        except Exception as exc:  # pylint: disable=broad-except
+            send, value = steps.throw, exc
+
+
 class UnknownBALEntity(Exception):
     """
     An exception raised for a reference to a non-existent entity in the
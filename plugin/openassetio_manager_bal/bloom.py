@@ -0,0 +1,181 @@
+#
+#   Copyright 2013-2022 [The Foundry Visionmongers Ltd]
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+"""
+A Bloom filter over entity names, allowing names that are definitely
+not in the library to be rejected without looking them up.
+
+This is a "blocked" Bloom filter. All the bits for a given name are in
+a single 64-bit word, chosen by the name's hash, and are set by one of
+a table of pre-computed masks, also chosen by the hash. Adding or
+testing a name is then a handful of operations, rather than one per
+bit, at the cost of needing somewhat more bits for the same false
+positive rate as a classic Bloom filter.
+
+Names are hashed with the built-in `hash`, which is randomized per
+process, so filters must not be persisted or shared between processes.
+"""
+
+import array
+import functools
+import math
+import threading
+
+from typing import Iterable
+
+_WORD_BITS = 64
+_WORD_MASK = (1 << _WORD_BITS) - 1
+
+# The number of distinct bit patterns a name may set within its word.
+_NUM_MASKS = 16384
+_MASK_SHIFT = 40
+# More bits per name than this gain little within a single word.
+_MAX_BITS_SET = 16
+
+# The lowest false positive rate a single word per name can achieve
+# with a reasonable amount of memory.
+MIN_FALSE_POSITIVE_RATE = 1e-4
+
+# Names registered after the filter is built are accommodated by sizing
+# it for a little more than its initial content.
+_MIN_CAPACITY = 1024
+
+
+class BloomFilter:
+    """
+    A set of names that may report false positives, but never false
+    negatives.
+
+    Adding and testing names is safe from multiple threads. Updates
+    are serialized, as setting a word's bits is a read-modify-write,
+    and concurrent updates to the same word could otherwise lose bits,
+    giving false negatives. Tests take no lock, and see a name once the
+    update adding it has set its word.
+    """
+
+    def __init__(self, names: Iterable[str], num_names: int, false_positive_rate: float):
+        """
+        @param names The initial content of the filter.
+        @param num_names The number of initial names, used to size the
+        filter such that, once they are added, the probability of a
+        false positive is at most `false_positive_rate`. The rate rises
+        as further names are added.
+        """
+        bits_per_name, num_bits_set = _blocked_parameters(false_positive_rate)
+        num_words = max(1, math.ceil(max(num_names, _MIN_CAPACITY) * bits_per_name / _WORD_BITS))
+        self.__words = array.array("Q", bytes(num_words * 8))
+        self.__masks = _masks(num_bits_set)
+        self.__false_positive_rate = false_positive_rate
+        self.__update_lock = threading.Lock()
+        self.update(names)
+
+    @property
+    def num_bytes(self) -> int:
+        """
+        The memory used by the filter's bits.
+        """
+        return len(self.__words) * self.__words.itemsize
+
+    @property
+    def false_positive_rate(self) -> float:
+        """
+        The false positive rate the filter was sized for.
+        """
+        return self.__false_positive_rate
+
+    def update(self, names: Iterable[str]):
+        """
+        Adds the supplied names to the filter.
+        """
+        words = self.__words
+        masks = self.__masks
+        num_words = len(words)
+        with self.__update_lock:
+            for name in names:
+                hashed = hash(name) & _WORD_MASK
+                words[hashed % num_words] |= masks[(hashed >> _MASK_SHIFT) % _NUM_MASKS]
+
+    def __contains__(self, name: str) -> bool:
+        """
+        Determines if the supplied name may have been added. False
+        positives are possible, false negatives are not.
+        """
+        hashed = hash(name) & _WORD_MASK
+        mask = self.__masks[(hashed >> _MASK_SHIFT) % _NUM_MASKS]
+        return self.__words[hashed % len(self.__words)] & mask == mask
+
+
+@functools.lru_cache(maxsize=None)
+def _blocked_parameters(false_positive_rate: float) -> tuple:
+    """
+    Returns the smallest number of bits per name, and the number of
+    bits to set per name, that achieve the supplied false positive rate.
+    """
+    if not MIN_FALSE_POSITIVE_RATE <= false_positive_rate < 1:
+        raise ValueError(
+            f"False positive rate must be at least {MIN_FALSE_POSITIVE_RATE} and less than 1,"
+            f" not {false_positive_rate}"
+        )
+    bits_per_name = 1.0
+    while True:
+        rate, num_bits_set = min(
+            (_blocked_false_positive_rate(bits_per_name, num_bits_set), num_bits_set)
+            for num_bits_set in range(1, _MAX_BITS_SET + 1)
+        )
+        if rate <= false_positive_rate:
+            return bits_per_name, num_bits_set
+        bits_per_name += 0.5
+
+
+def _blocked_false_positive_rate(bits_per_name: float, num_bits_set: int) -> float:
+    """
+    Estimates the false positive rate of a blocked Bloom filter. The
+    number of names in each word follows a Poisson distribution, and
+    the rate is that of a classic filter of one word, averaged over it.
+    """
+    mean = _WORD_BITS / bits_per_name
+    probability = math.exp(-mean)
+    rate = 0.0
+    for num_names in range(int(mean * 4) + 32):
+        if num_names:
+            probability *= mean / num_names
+        bit_unset = (1 - 1 / _WORD_BITS) ** (num_bits_set * num_names)
+        rate += probability * (1 - bit_unset) ** num_bits_set
+    # A name is also a false positive if its mask is the same as that of
+    # any of the names in its word.
+    return rate + mean / _NUM_MASKS
+
+
+@functools.lru_cache(maxsize=None)
+def _masks(num_bits_set: int) -> tuple:
+    """
+    Returns a table of words, each with the supplied number of distinct
+    bits set. A fixed seed is used, so tables are reproducible.
+    """
+    import random  # pylint: disable=import-outside-toplevel
+
+    getrandbits = random.Random(num_bits_set).getrandbits
+    bit_index_bits = _WORD_BITS.bit_length() - 1
+    masks = []
+    for _ in range(_NUM_MASKS):
+        mask = 0
+        num_set = 0
+        while num_set < num_bits_set:
+            bit = 1 << getrandbits(bit_index_bits)
+            if not mask & bit:
+                mask |= bit
+                num_set += 1
+        masks.append(mask)
+    return tuple(masks)
@@ -0,0 +1,132 @@
+#
+#   Copyright 2013-2022 [The Foundry Visionmongers Ltd]
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+"""
+Simple caching utilities used by the BAL implementation.
+"""
+
+import threading
+
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    A minimal least-recently-used cache, holding at most `maxsize`
+    items. A `maxsize` of zero disables the cache, such that nothing is
+    ever stored.
+
+    Items may be put in a group, such that every item in the group can
+    be removed at once, see pop_group.
+
+    The cache is safe to use from multiple threads.
+    """
+
+    def __init__(self, maxsize: int):
+        self.__maxsize = maxsize
+        self.__items = OrderedDict()
+        # group -> keys of the items in it, and key -> group, for the
+        # items put in a group.
+        self.__groups = {}
+        self.__key_groups = {}
+        self.__lock = threading.Lock()
+
+    @property
+    def maxsize(self) -> int:
+        """
+        The maximum number of items held by the cache.
+        """
+        return self.__maxsize
+
+    def get(self, key, default=None):
+        """
+        Retrieves the value for the supplied key, marking it as the
+        most recently used, or `default` if it is not present.
+        """
+        with self.__lock:
+            try:
+                value = self.__items[key]
+            except KeyError:
+                return default
+            self.__items.move_to_end(key)
+            return value
+
+    def put(self, key, value, group=None):
+        """
+        Stores the supplied value, evicting the least recently used
+        entry if the cache is full.
+
+        @param group If supplied, the item is added to this group (and
+        removed from any other), see pop_group.
+        """
+        if self.__maxsize <= 0:
+            return
+        with self.__lock:
+            self.__items[key] = value
+            self.__items.move_to_end(key)
+            if self.__key_groups.get(key) != group:
+                self.__ungroup(key)
+                if group is not None:
+                    self.__groups.setdefault(group, set()).add(key)
+                    self.__key_groups[key] = group
+            if len(self.__items) > self.__maxsize:
+                evicted, _ = self.__items.popitem(last=False)
+                self.__ungroup(evicted)
+
+    def pop(self, key, default=None):
+        """
+        Removes and returns the value for the supplied key, or `default`
+        if it is not present.
+        """
+        with self.__lock:
+            self.__ungroup(key)
+            return self.__items.pop(key, default)
+
+    def pop_group(self, group):
+        """
+        Removes every item in the supplied group.
+        """
+        with self.__lock:
+            for key in self.__groups.pop(group, ()):
+                del self.__key_groups[key]
+                del self.__items[key]
+
+    def clear(self):
+        """
+        Removes all items from the cache.
+        """
+        with self.__lock:
+            self.__items.clear()
+            self.__groups.clear()
+            self.__key_groups.clear()
+
+    def __contains__(self, key) -> bool:
+        return key in self.__items
+
+    def __len__(self) -> int:
+        return len(self.__items)
+
+    def __ungroup(self, key):
+        """
+        Removes the supplied key from its group, if it has one. Must be
+        called with the lock held.
+        """
+        group = self.__key_groups.pop(key, None)
+        if group is None:
+            return
+        keys = self.__groups[group]
+        keys.discard(key)
+        if not keys:
+            del self.__groups[group]
@@ -0,0 +1,439 @@
+#
+#   Copyright 2013-2022 [The Foundry Visionmongers Ltd]
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+"""
+The client side of the BAL server protocol (see server.py), along with
+the framing of the messages exchanged with a server.
+
+Each message is a frame made of a fixed size binary header, holding the
+length of the payload, a request ID and a method (requests) or status
+(responses) code, followed by a compact JSON payload. Each connection
+handles its requests in the order they are sent, so a client may send
+many requests before reading any of the responses (pipelining).
+"""
+
+import itertools
+import json
+import socket
+import struct
+import threading
+
+from typing import List
+
+from openassetio import BatchElementError, EntityReference, TraitsData
+from openassetio.exceptions import MalformedEntityReference, PluginError
+
+from . import traitsdata
+
+# Payload length, request ID, method or status code.
+_HEADER = struct.Struct("<IIB")
+
+METHODS = ("entityExists", "resolve", "register", "managementPolicy", "findEntityReferences")
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+_REQUEST_ID_LIMIT = 2**32
+
+
+class ServerError(PluginError):  # pylint: disable=too-few-public-methods
+    """
+    An exception raised by a Client when the server failed to process
+    a request as a whole, rather than any one of its elements.
+    """
+
+
+def encode_payload(payload) -> bytes:
+    """
+    Encodes the supplied JSON-compatible value as a message payload.
+    """
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def decode_payload(data: bytes):
+    """
+    Decodes a message payload, see encode_payload.
+    """
+    return json.loads(data.decode("utf-8"))
+
+
+def write_frame(stream, request_id: int, code: int, payload: bytes):
+    """
+    Writes a single message to the supplied socket or file-like object.
+    """
+    message = _HEADER.pack(len(payload), request_id, code) + payload
+    if isinstance(stream, socket.socket):
+        stream.sendall(message)
+    else:
+        stream.write(message)
+
+
+def read_frame(stream):
+    """
+    Reads a single message from the supplied buffered binary stream.
+
+    @return A tuple of the request ID, code and payload, or None if the
+    stream ended cleanly before the message started.
+    """
+    header = stream.read(_HEADER.size)
+    if not header:
+        return None
+    if len(header) < _HEADER.size:
+        raise ConnectionError("Connection closed mid-message")
+    length, request_id, code = _HEADER.unpack(header)
+    payload = stream.read(length)
+    if len(payload) < length:
+        raise ConnectionError("Connection closed mid-message")
+    return request_id, code, payload
+
+
+class Client:
+    """
+    A client of a BAL server, holding a pool of connections to it.
+
+    Batches are split into requests of at most `chunk_size` elements,
+    which are pipelined over a single connection (see call).
+
+    Each call borrows a connection from the pool, so concurrent calls
+    from different threads are made over different connections, up to
+    `max_connections`, beyond which calls wait for a connection to be
+    returned. Connections are opened on first use.
+
+    The client is safe to use from multiple threads.
+    """
+
+    def __init__(self, socket_path: str, max_connections: int, chunk_size: int):
+        self.__socket_path = socket_path
+        self.__chunk_size = chunk_size
+        self.__idle = []
+        self.__idle_lock = threading.Lock()
+        self.__available = threading.BoundedSemaphore(max_connections)
+        self.__closed = False
+
+    def entity_exists(self, entity_refs: List[EntityReference], access: str) -> list:
+        """
+        Queries the existence of the supplied entities.
+
+        @return A list of bools, or a MalformedEntityReference for any
+        reference the server could not parse.
+        """
+        responses = self.call(
+            "entityExists",
+            [
+                {"refs": [ref.toString() for ref in chunk], "access": access}
+                for chunk in self.__chunks(entity_refs)
+            ],
+        )
+        return [
+            MalformedEntityReference(response[1]) if isinstance(response, list) else response
+            for response in responses
+        ]
+
+    def resolve(self, entity_refs: List[EntityReference], trait_set, access: str) -> list:
+        """
+        Resolves the supplied trait set for each of the supplied
+        entities.
+
+        @return A list of TraitsData, or a BatchElementError for any
+        entity that could not be resolved.
+        """
+        trait_list = sorted(trait_set)
+        responses = self.call(
+            "resolve",
+            [
+                {
+                    "refs": [ref.toString() for ref in chunk],
+                    "traitSet": trait_list,
+                    "access": access,
+                }
+                for chunk in self.__chunks(entity_refs)
+            ],
+        )
+        return [
+            (
+                _batch_element_error(response)
+                if isinstance(response, list)
+                else traitsdata.from_dict(response)
+            )
+            for response in responses
+        ]
+
+    def register(self, entity_refs: List[EntityReference], traits_datas: List[TraitsData]) -> list:
+        """
+        Registers the supplied data against each of the supplied
+        entities. Each distinct TraitsData in a request is only sent
+        once.
+
+        @return A list of references to the new entity versions, or a
+        BatchElementError for any that could not be registered.
+        Should the server fail to process a request, the elements in it
+        are given an error, whilst those in the other requests are
+        registered as usual.
+        """
+        requests = []
+        for start in range(0, len(entity_refs), self.__chunk_size):
+            traits_dicts = []
+            traits_indices = []
+            # id(TraitsData) -> index in traits_dicts. The caller holds
+            # each instance, so its id cannot be reused meanwhile.
+            positions = {}
+            for traits_data in traits_datas[start : start + self.__chunk_size]:
+                position = positions.get(id(traits_data))
+                if position is None:
+                    position = len(traits_dicts)
+                    positions[id(traits_data)] = position
+                    traits_dicts.append(traitsdata.to_dict(traits_data))
+                traits_indices.append(position)
+            requests.append(
+                {
+                    "refs": [
+                        ref.toString() for ref in entity_refs[start : start + self.__chunk_size]
+                    ],
+                    "traits": traits_dicts,
+                    "traitsIndices": traits_indices,
+                }
+            )
+        results = []
+        for request, (status, responses) in zip(requests, self.call_each("register", requests)):
+            if status != STATUS_OK:
+                results.extend(
+                    BatchElementError(
+                        BatchElementError.ErrorCode.kUnknown,
+                        f"BAL server failed to process 'register': {responses}",
+                    )
+                    for _ in request["refs"]
+                )
+                continue
+            results.extend(
+                (
+                    _batch_element_error(response)
+                    if isinstance(response, list)
+                    else EntityReference(response)
+                )
+                for response in responses
+            )
+        return results
+
+    def management_policy(self, trait_sets, access: str) -> List[TraitsData]:
+        """
+        Queries the management policy for each of the supplied trait
+        sets. Only distinct trait sets are sent to the server, and each
+        distinct policy is decoded once, then copied for each element,
+        so identical trait sets are given their own TraitsData.
+        """
+        keys = [frozenset(trait_set) for trait_set in trait_sets]
+        distinct = list(dict.fromkeys(keys))
+        responses = self.call(
+            "managementPolicy",
+            [
+                {"traitSets": [sorted(trait_set) for trait_set in chunk], "access": access}
+                for chunk in self.__chunks(distinct)
+            ],
+        )
+        policies = {key: traitsdata.from_dict(policy) for key, policy in zip(distinct, responses)}
+        return [TraitsData(policies[key]) for key in keys]
+
+    def find_entity_references(self, pattern: str) -> List[EntityReference]:
+        """
+        Queries the references of the entities whose names match the
+        supplied glob pattern.
+        """
+        return [
+            EntityReference(ref_string)
+            for ref_string in self.call("findEntityReferences", [{"pattern": pattern}])
+        ]
+
+    def call(self, method: str, payloads: List) -> List:
+        """
+        Sends a request for each of the supplied payloads, returning
+        the concatenation of the per-element results in the responses.
+
+        All the requests are sent over a single connection without
+        waiting for responses, so a large batch can be split into
+        several requests for little more than the cost of one round
+        trip. Requests are written on a separate thread whilst the
+        responses are read, so that neither end blocks the other once
+        the socket buffers fill.
+
+        @exception ServerError If the server could not be reached, or
+        failed to process any of the requests.
+        """
+        responses = []
+        self.__exchange(method, payloads, responses)
+        errors = [payload for status, payload in responses if status != STATUS_OK]
+        if errors:
+            raise ServerError(f"BAL server failed to process '{method}': {errors[0]}")
+        return list(itertools.chain.from_iterable(payload for _, payload in responses))
+
+    def call_each(self, method: str, payloads: List) -> List:
+        """
+        Sends a request for each of the supplied payloads, as call, but
+        returns the status and payload of each response, rather than
+        raising if any failed.
+
+        Should the connection to the server fail, the requests whose
+        responses were not read are given an error status, as the
+        server may or may not have processed them.
+
+        @return A list of (status, payload) tuples, one per request,
+        where the payload of a failed request is its error message.
+        """
+        responses = []
+        try:
+            self.__exchange(method, payloads, responses)
+        except ServerError as exc:
+            responses.extend((STATUS_ERROR, str(exc)) for _ in payloads[len(responses) :])
+        return responses
+
+    def close(self):
+        """
+        Closes all idle connections. Connections in use are closed
+        when returned.
+        """
+        with self.__idle_lock:
+            self.__closed = True
+            idle, self.__idle = self.__idle, []
+        for connection in idle:
+            connection.close()
+
+    def __exchange(self, method: str, payloads: List, responses: List):
+        """
+        Sends the supplied requests over a pooled connection, appending
+        the (status, decoded payload) of each response to `responses`
+        as it is read.
+        """
+        if not payloads:
+            return
+        code = METHODS.index(method)
+        encoded = [encode_payload(payload) for payload in payloads]
+        with self.__available:
+            try:
+                connection = self.__take_connection()
+                try:
+                    connection.exchange(code, encoded, responses)
+                except BaseException:
+                    # The connection is in an unknown state, so is
+                    # dropped.
+                    connection.close()
+                    raise
+            except OSError as exc:
+                raise ServerError(
+                    f"Failed to reach BAL server at '{self.__socket_path}': {exc}"
+                ) from exc
+            # Every response has been read, so the connection can be
+            # reused even if a request failed.
+            self.__return_connection(connection)
+
+    def __chunks(self, elements) -> list:
+        return [
+            elements[start : start + self.__chunk_size]
+            for start in range(0, len(elements), self.__chunk_size)
+        ]
+
+    def __take_connection(self):
+        with self.__idle_lock:
+            if self.__idle:
+                return self.__idle.pop()
+        return _Connection(self.__socket_path)
+
+    def __return_connection(self, connection):
+        with self.__idle_lock:
+            if not self.__closed:
+                self.__idle.append(connection)
+                return
+        connection.close()
+
+
+def _batch_element_error(response: list) -> BatchElementError:
+    """
+    Rebuilds a BatchElementError from the [code name, message] sent by
+    the server.
+    """
+    code_name, message = response
+    return BatchElementError(BatchElementError.ErrorCode.__members__[code_name], message)
+
+
+class _Connection:
+    """
+    A single client connection to a BAL server.
+    """
+
+    def __init__(self, socket_path: str):
+        self.__socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self.__socket.connect(socket_path)
+        except OSError:
+            self.__socket.close()
+            raise
+        self.__reader = self.__socket.makefile("rb")
+        self.__request_ids = itertools.count()
+
+    def exchange(self, code: int, payloads: List[bytes], responses: List):
+        """
+        Sends the supplied request payloads and reads the responses,
+        appending a (status, decoded payload) tuple to `responses` for
+        each, so those read before any failure are kept.
+        """
+        requests = [
+            (next(self.__request_ids) % _REQUEST_ID_LIMIT, code, payload) for payload in payloads
+        ]
+        if len(requests) == 1:
+            self.__write(requests)
+            self.__read(requests, responses)
+            return
+
+        write_errors = []
+        writer = threading.Thread(
+            target=self.__write, args=(requests, write_errors), name="bal-client-write"
+        )
+        writer.start()
+        try:
+            self.__read(requests, responses)
+        except BaseException:
+            # Unblocks the writer, should it be waiting on the server.
+            self.__socket.shutdown(socket.SHUT_RDWR)
+            raise
+        finally:
+            writer.join()
+        if write_errors:
+            raise write_errors[0]
+
+    def close(self):
+        """
+        Closes the connection.
+        """
+        self.__reader.close()
+        self.__socket.close()
+
+    def __write(self, requests, errors=None):
+        try:
+            for request_id, code, payload in requests:
+                write_frame(self.__socket, request_id, code, payload)
+        except OSError as exc:
+            if errors is None:
+                raise
+            errors.append(exc)
+
+    def __read(self, requests, responses: List):
+        for request_id, _, _ in requests:
+            frame = read_frame(self.__reader)
+            if frame is None:
+                raise ConnectionError("BAL server closed the connection")
+            response_id, status, payload = frame
+            if response_id != request_id:
+                raise ConnectionError(
+                    f"BAL server responded to request {response_id}, expected {request_id}"
+                )
+            responses.append((status, decode_payload(payload)))
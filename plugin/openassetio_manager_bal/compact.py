@@ -0,0 +1,220 @@
+#
+#   Copyright 2013-2022 [The Foundry Visionmongers Ltd]
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+"""
+A compact, read-only, in-memory representation of a library's
+entities.
+
+The dicts produced by `json.load` cost several hundred bytes per
+entity version in container overhead alone. Here, each version instead
+holds a "block" of property values for each of its traits, along with
+a "layout" describing the trait IDs and property keys they belong to.
+Layouts are shared by every version with the same traits and
+properties, and their strings are interned.
+
+Blocks are content-addressed, keyed by their trait ID, property keys,
+and property values and their types, such that every version, of any
+entity, with identical properties for a trait shares the same block.
+Versions that only change a few of their traits from the previous
+version, or traits common to many entities, then cost little more than
+a reference per trait. As the same block always holds the same
+content, blocks can also serve as cache keys (see project_blocks).
+
+Entities and versions present the same read-only mapping interface as
+the dicts they replace, so the rest of BAL can use either. The traits
+of a version are rebuilt as dicts each time they are requested, so a
+subset of the traits can be requested instead (see
+CompactVersion.project_traits), using an index of where each trait's
+property values lie that is shared along with the layout.
+"""
+
+import sys
+
+from collections.abc import Mapping
+
+
+class CompactEntity(Mapping):
+    """
+    A read-only entity, equivalent to a library entity dict.
+    """
+
+    __slots__ = ("__versions", "__first_version")
+
+    def __init__(self, versions: tuple, first_version: int):
+        self.__versions = versions
+        self.__first_version = first_version
+
+    def __getitem__(self, key):
+        if key == "versions":
+            return self.__versions
+        if key == "firstVersion" and self.__first_version != 1:
+            return self.__first_version
+        raise KeyError(key)
+
+    def __iter__(self):
+        yield "versions"
+        if self.__first_version != 1:
+            yield "firstVersion"
+
+    def __len__(self) -> int:
+        return 1 if self.__first_version == 1 else 2
+
+
+class CompactVersion(Mapping):
+    """
+    A read-only entity version, equivalent to a version dict.
+    """
+
+    __slots__ = ("__layout", "__blocks")
+
+    def __init__(self, layout: "Layout", blocks: tuple):
+        self.__layout = layout
+        self.__blocks = blocks
+
+    def __getitem__(self, key):
+        if key != "traits":
+            raise KeyError(key)
+        # Slices are held in the order of the original traits.
+        return self.project_traits(self.__layout.slices)
+
+    @property
+    def trait_ids(self) -> frozenset:
+        """
+        The IDs of the traits this version has.
+        """
+        return self.__layout.trait_ids
+
+    def project_traits(self, trait_ids) -> dict:
+        """
+        Returns the traits of this version with the supplied IDs, as per
+        `self["traits"]`, without building any of the others. IDs of
+        traits this version does not have are ignored.
+        """
+        slices = self.__layout.slices
+        blocks = self.__blocks
+        traits = {}
+        for trait_id in trait_ids:
+            trait_slice = slices.get(trait_id)
+            if trait_slice is not None:
+                property_keys, index = trait_slice
+                # Blocks end with their trait ID, which zip ignores.
+                traits[trait_id] = dict(zip(property_keys, blocks[index]))
+        return traits
+
+    def project_blocks(self, trait_ids) -> tuple:
+        """
+        Returns the blocks holding the properties of the traits of this
+        version with the supplied IDs, in the order of `trait_ids`.
+
+        Blocks are shared by every version with identical properties
+        for a trait, and their identity implies the trait, so versions
+        whose projections consist of the same blocks (compared by
+        identity, as `1 == True`) have identical projected traits.
+        """
+        slices = self.__layout.slices
+        blocks = self.__blocks
+        return tuple(blocks[slices[trait_id][1]] for trait_id in trait_ids if trait_id in slices)
+
+    def __iter__(self):
+        yield "traits"
+
+    def __len__(self) -> int:
+        return 1
+
+
+class Layout:  # pylint: disable=too-few-public-methods
+    """
+    The traits and property keys of a CompactVersion, shared by every
+    version with the same traits and properties.
+    """
+
+    __slots__ = ("trait_ids", "slices")
+
+    def __init__(self, traits: tuple):
+        """
+        @param traits A tuple of (trait ID, tuple of property keys) for
+        each trait, in the order their blocks are held.
+        """
+        self.trait_ids = frozenset(trait_id for trait_id, _ in traits)
+        # Trait ID -> (property keys, index of its block).
+        self.slices = {
+            trait_id: (property_keys, index)
+            for index, (trait_id, property_keys) in enumerate(traits)
+        }
+
+
+def compact_entities(entities: dict) -> dict:
+    """
+    Replaces, in place, each entity in the supplied dict of entities
+    with a CompactEntity. Entities are replaced one at a time, so that
+    the memory used by the original dicts can be reclaimed as the
+    conversion proceeds.
+
+    Any entity or version with content other than that described by the
+    library schema is left as-is.
+
+    @return The supplied dict.
+    """
+    layouts = {}
+    blocks = {}
+    for name, entity_dict in entities.items():
+        if not entity_dict.keys() <= {"versions", "firstVersion"}:
+            continue
+        versions = tuple(
+            _compact_version(version_dict, layouts, blocks)
+            for version_dict in entity_dict["versions"]
+        )
+        entities[name] = CompactEntity(versions, entity_dict.get("firstVersion", 1))
+    return entities
+
+
+def _compact_version(version_dict: dict, layouts: dict, blocks: dict):
+    """
+    Returns a CompactVersion equivalent to the supplied version dict,
+    sharing its layout with any previous version with the same traits
+    and properties, and its blocks with any previous version with the
+    same properties for a trait. See compact_entities.
+    """
+    if version_dict.keys() != {"traits"}:
+        return version_dict
+    traits = version_dict["traits"]
+    layout_key = tuple(
+        (trait_id, tuple(trait_properties)) for trait_id, trait_properties in traits.items()
+    )
+    layout = layouts.get(layout_key)
+    if layout is None:
+        layout = Layout(
+            tuple(
+                (sys.intern(trait_id), tuple(sys.intern(key) for key in property_keys))
+                for trait_id, property_keys in layout_key
+            )
+        )
+        layouts[layout_key] = layout
+
+    # Blocks end with their trait ID, so that no two traits share a
+    # block, even if they have no properties. Values are compared along
+    # with their types, as `1 == 1.0 == True`.
+    version_blocks = []
+    for (trait_id, property_keys), trait_properties in zip(layout_key, traits.values()):
+        block = (*trait_properties.values(), trait_id)
+        try:
+            # Flat, so that the key is soon untracked by the garbage
+            # collector. Its length implies the number of properties.
+            shared_block = blocks.setdefault((*property_keys, *block, *map(type, block)), block)
+        except TypeError:
+            # Values that cannot be hashed (eg. lists) are not shared.
+            shared_block = block
+        version_blocks.append(shared_block)
+    return CompactVersion(layout, tuple(version_blocks))
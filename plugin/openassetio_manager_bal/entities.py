@@ -0,0 +1,523 @@
+#
+#   Copyright 2013-2022 [The Foundry Visionmongers Ltd]
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+"""
+Alternate containers for a library's "entities" map, for use when it
+is not practical to hold the whole library as plain dicts.
+
+These all behave as a dict of entity name to entity dict, as far as
+the functions in bal.py are concerned.
+"""
+
+import functools
+import json
+import mmap
+import os
+import re
+import threading
+import weakref
+
+from collections.abc import Mapping, MutableMapping
+
+from .cache import LRUCache
+
+
+class OverlayEntities(MutableMapping):
+    """
+    A writable layer over a read-only mapping of entities.
+
+    Any entity that is modified is first copied into the overlay, so
+    that the underlying mapping is never changed. Writers must use
+    `setdefault` or item assignment to obtain an entity they intend to
+    modify, rather than mutating the result of `get`.
+    """
+
+    def __init__(self, base: Mapping):
+        self.__base = base
+        self.__overlay = {}
+        self.__removed = set()
+
+    @property
+    def base(self) -> Mapping:
+        """
+        The read-only mapping this overlay sits on top of.
+        """
+        return self.__base
+
+    def raw(self, key):
+        """
+        Returns the encoded form of the entity with the supplied name,
+        if it is unmodified and the underlying mapping provides one,
+        otherwise None. See changed_keys.
+        """
+        if key in self.__overlay or key in self.__removed:
+            return None
+        raw = getattr(self.__base, "raw", None)
+        return raw(key) if raw is not None else None
+
+    def rewritten_keys(self) -> set:
+        """
+        Returns the names of the entities in the underlying mapping
+        whose content was lost to its file being rewritten in place.
+        See rewritten_keys.
+        """
+        return rewritten_keys(self.__base)
+
+    def setdefault(self, key, default=None):
+        if key in self.__overlay:
+            return self.__overlay[key]
+        if key not in self.__removed and key in self.__base:
+            base_entity = self.__base[key]
+            default = {**base_entity, "versions": list(base_entity["versions"])}
+        self[key] = default
+        return default
+
+    def __getitem__(self, key):
+        if key in self.__overlay:
+            return self.__overlay[key]
+        if key in self.__removed:
+            raise KeyError(key)
+        return self.__base[key]
+
+    def __setitem__(self, key, value):
+        self.__overlay[key] = value
+        self.__removed.discard(key)
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self.__overlay.pop(key, None)
+        if key in self.__base:
+            self.__removed.add(key)
+
+    def __contains__(self, key) -> bool:
+        if key in self.__overlay:
+            return True
+        return key not in self.__removed and key in self.__base
+
+    def __iter__(self):
+        yield from self.__overlay
+        for key in self.__base:
+            if key not in self.__overlay and key not in self.__removed:
+                yield key
+
+    def __len__(self) -> int:
+        added = sum(1 for key in self.__overlay if key not in self.__base)
+        return len(self.__base) + added - len(self.__removed)
+
+
+class LazyJSONEntities(Mapping):
+    """
+    A read-only view of the "entities" map of a memory mapped library
+    JSON file that only decodes an entity when it is first accessed.
+
+    Construction requires an index of the byte offsets of each entity's
+    JSON within the mapped file (see load_library_lazily). Decoded
+    entities are held in a bounded LRU cache.
+
+    Should the file be rewritten in place, rather than replaced, the
+    index no longer describes the mapped content, and reading past the
+    file's new end would fault. So the file is checked before reading,
+    and if modified, is mapped and indexed again, discarding any decoded
+    entities. The prior content is then lost, so every entity is
+    reported by rewritten_keys.
+    """
+
+    def __init__(self, mapped_file: "_MappedFile", offsets: dict, cache_size: int):
+        # Replaced as a whole, so that readers always see a mapping
+        # along with its own index.
+        self.__index = (mapped_file, offsets)
+        self.__cache = LRUCache(cache_size)
+        self.__rewritten = set()
+        self.__lock = threading.Lock()
+
+    def __getitem__(self, key):
+        entity_dict = self.__cache.get(key)
+        if entity_dict is None:
+            mapped_file, offsets = self.__current_index()
+            start, end = offsets[key]
+            entity_dict = json.loads(mapped_file.buffer[start:end].decode("utf-8"))
+            # Not cached if the file was indexed again meanwhile.
+            if self.__index[0] is mapped_file:
+                self.__cache.put(key, entity_dict)
+        return entity_dict
+
+    def raw(self, key) -> bytes:
+        """
+        Returns the undecoded JSON of the entity with the supplied
+        name, or None if it is not present.
+        """
+        mapped_file, offsets = self.__current_index()
+        span = offsets.get(key)
+        if span is None:
+            return None
+        return mapped_file.buffer[span[0] : span[1]]
+
+    def rewritten_keys(self) -> set:
+        """
+        Returns the names of the entities indexed before or after the
+        file was rewritten in place, should it have been, as their
+        prior content is unknown. See changed_keys.
+        """
+        self.__current_index()
+        return self.__rewritten
+
+    def __contains__(self, key) -> bool:
+        return key in self.__current_index()[1]
+
+    def __iter__(self):
+        return iter(self.__current_index()[1])
+
+    def __len__(self) -> int:
+        return len(self.__current_index()[1])
+
+    def __current_index(self) -> tuple:
+        """
+        Returns the mapped file and its index, first mapping and
+        indexing the file again if it was rewritten in place.
+        """
+        index = self.__index
+        if index[0].is_current():
+            return index
+        with self.__lock:
+            index = self.__index
+            if not index[0].is_current():
+                mapped_file = index[0].remap()
+                offsets = _index_entities(mapped_file.buffer)
+                self.__rewritten.update(index[1])
+                self.__rewritten.update(offsets)
+                self.__cache.clear()
+                index = (mapped_file, offsets)
+                self.__index = index
+        return index
+
+
+class _MappedFile:
+    """
+    A read-only memory mapping of a file, that can determine if the
+    file has since been rewritten in place.
+    """
+
+    def __init__(self, file):
+        # Taken before mapping, so that a change made whilst mapping is
+        # seen as a change.
+        self.__signature = _file_signature(file)
+        self.buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        # Held open, so that the file that is mapped can be checked,
+        # even if another has since been moved into place at its path.
+        self.__file = file
+        weakref.finalize(self, file.close)
+
+    @classmethod
+    def open(cls, path: str) -> "_MappedFile":
+        """
+        Maps the file at the supplied path.
+        """
+        file = open(path, "rb")  # pylint: disable=consider-using-with
+        try:
+            return cls(file)
+        except BaseException:
+            file.close()
+            raise
+
+    def is_current(self) -> bool:
+        """
+        Determines if the file is unmodified since it was mapped. A file
+        replaced by another at its path is unmodified, as the mapping is
+        of the original.
+        """
+        return _file_signature(self.__file) == self.__signature
+
+    def remap(self) -> "_MappedFile":
+        """
+        Maps the current content of the file.
+        """
+        file = os.fdopen(os.dup(self.__file.fileno()), "rb")
+        try:
+            return _MappedFile(file)
+        except BaseException:
+            file.close()
+            raise
+
+
+def _file_signature(file) -> tuple:
+    """
+    Returns a value that changes whenever the supplied open file is
+    modified.
+    """
+    stat = os.fstat(file.fileno())
+    return stat.st_size, stat.st_mtime_ns
+
+
+def changed_keys(old: Mapping, new: Mapping) -> set:
+    """
+    Returns the names of the entities that differ between the supplied
+    mappings, including any that are only present in one of them.
+
+    Where both mappings can supply the encoded form of an entity (via a
+    `raw` method), the encoded forms are compared, so that neither
+    needs to be decoded. Otherwise the decoded entities are compared.
+
+    Any entity whose content in `old` was lost to its file being
+    rewritten in place (see rewritten_keys) is reported as changed.
+    """
+    # First, as it indexes old again, should its file have been
+    # rewritten in place.
+    changed = set(rewritten_keys(old))
+    changed.update(old.keys() ^ new.keys())
+    old_raw = getattr(old, "raw", lambda _key: None)
+    new_raw = getattr(new, "raw", lambda _key: None)
+    for key in new:
+        if key in changed:
+            continue
+        old_encoded = old_raw(key)
+        new_encoded = new_raw(key) if old_encoded is not None else None
+        if new_encoded is not None:
+            if old_encoded != new_encoded:
+                changed.add(key)
+        elif old[key] != new[key]:
+            changed.add(key)
+    return changed
+
+
+def rewritten_keys(entities: Mapping) -> set:
+    """
+    Returns the names of the entities in the supplied mapping whose
+    content was lost to their file being rewritten in place, should
+    the mapping provide them (via a `rewritten_keys` method), see
+    LazyJSONEntities.
+    """
+    rewritten = getattr(entities, "rewritten_keys", None)
+    return rewritten() if rewritten is not None else set()
+
+
+def load_library_lazily(path: str, cache_size: int) -> dict:
+    """
+    Loads a library from the supplied path, decoding everything except
+    the entities themselves. The file is memory mapped, and the
+    "entities" map is indexed by byte offset, such that each entity is
+    only decoded on first use.
+
+    See LazyJSONEntities for how the file being rewritten in place,
+    whilst mapped, is handled.
+    """
+    mapped_file = _MappedFile.open(path)
+    buffer = mapped_file.buffer
+
+    library = {}
+
+    def load_member(key, start):
+        if key == "entities":
+            offsets, end = _index_object(buffer, start)
+            library[key] = OverlayEntities(LazyJSONEntities(mapped_file, offsets, cache_size))
+        else:
+            end = _value_end(buffer, start)
+            library[key] = json.loads(buffer[start:end].decode("utf-8"))
+        return end
+
+    _scan_object(buffer, 0, load_member)
+    return library
+
+
+def _index_entities(buffer) -> dict:
+    """
+    Builds an index of the start and end of each entity in the library
+    JSON in the supplied buffer, skipping its other members.
+    """
+    offsets = {}
+
+    def index_member(key, start):
+        if key == "entities":
+            entity_offsets, end = _index_object(buffer, start)
+            offsets.update(entity_offsets)
+            return end
+        return _value_end(buffer, start)
+
+    _scan_object(buffer, 0, index_member)
+    return offsets
+
+
+def _index_object(buffer, pos: int):
+    """
+    Builds an index of the start and end of each value in the JSON
+    object starting at the supplied position in the buffer.
+
+    @return A tuple of the dict of key to (start, end) and the position
+    immediately after the end of the object.
+    """
+    offsets = {}
+    # Fast path, matching a whole member per regex call.
+    member_pos = _skip_whitespace(buffer, _expect(buffer, pos, b"{"))
+    if buffer[member_pos : member_pos + 1] == b"}":
+        return offsets, member_pos + 1
+    container_member = _container_member_regex()
+    while True:
+        match = container_member.match(buffer, member_pos)
+        if match is None:
+            break
+        key = match.group(1)
+        key = json.loads(key) if b"\\" in key else key[1:-1].decode("utf-8")
+        offsets[key] = match.span(2)
+        if match.group(3) == b"}":
+            return offsets, match.end()
+        member_pos = match.end()
+
+    # Slow path, for anything the regex can't handle.
+    offsets.clear()
+
+    def index_member(key, start):
+        end = _value_end(buffer, start)
+        offsets[key] = (start, end)
+        return end
+
+    return offsets, _scan_object(buffer, pos, index_member)
+
+
+def _make_container_pattern(max_depth: int) -> bytes:
+    """
+    Builds a regex pattern that matches a JSON object or array, nested
+    at most `max_depth` deep. Each alternative starts with a distinct
+    character, so the engine never needs to backtrack far.
+    """
+    pattern = rb"(?:[^" + _CONTAINER_CHARS + rb"]|" + _STRING_PATTERN + rb")*"
+    for _ in range(max_depth - 1):
+        pattern = (
+            rb"(?:[^"
+            + _CONTAINER_CHARS
+            + rb"]|"
+            + _STRING_PATTERN
+            + rb"|[{\[]"
+            + pattern
+            + rb"[}\]])*"
+        )
+    return rb"[{\[]" + pattern + rb"[}\]]"
+
+
+# A JSON string, written such that the regex engine does not need to
+# backtrack over long strings.
+_STRING_PATTERN = rb'"[^"\\]*(?:\\.[^"\\]*)*"'
+_CONTAINER_CHARS = rb'"{}\[\]'
+_STRING = re.compile(_STRING_PATTERN, re.DOTALL)
+# Entities are nested five deep (entity, versions, version, traits,
+# properties), this leaves some headroom. Anything deeper falls back to
+# a slower scan.
+_MAX_CONTAINER_DEPTH = 8
+
+
+# The container regexes are large enough that compiling them noticeably
+# slows down importing the plugin, so they are compiled on first use.
+
+
+@functools.lru_cache(maxsize=None)
+def _container_regex():
+    """
+    Returns a compiled regex that matches a JSON object or array.
+    """
+    return re.compile(_make_container_pattern(_MAX_CONTAINER_DEPTH), re.DOTALL)
+
+
+@functools.lru_cache(maxsize=None)
+def _container_member_regex():
+    """
+    Returns a compiled regex that matches an object member whose value
+    is a container, along with the following separator.
+    """
+    return re.compile(
+        rb"("
+        + _STRING_PATTERN
+        + rb")[ \t\n\r]*:[ \t\n\r]*("
+        + _make_container_pattern(_MAX_CONTAINER_DEPTH)
+        + rb")[ \t\n\r]*([,}])[ \t\n\r]*",
+        re.DOTALL,
+    )
+
+
+# Any run of JSON that does not open or close an object or array.
+_NON_CONTAINER = re.compile(
+    rb"(?:[^" + _CONTAINER_CHARS + rb"]+|" + _STRING_PATTERN + rb")*", re.DOTALL
+)
+_WHITESPACE = re.compile(rb"[ \t\n\r]*")
+_SCALAR_END = re.compile(rb"[,}\] \t\n\r]")
+
+
+def _scan_object(buffer, pos: int, scan_member) -> int:
+    """
+    Scans the JSON object starting at the supplied position in the
+    buffer, without decoding any of its values.
+
+    `scan_member` is called with the key and start position of each
+    member's value, and must return the position the value ends at.
+
+    @return The position immediately after the end of the object.
+    """
+    pos = _skip_whitespace(buffer, _expect(buffer, pos, b"{"))
+    if buffer[pos : pos + 1] == b"}":
+        return pos + 1
+    while True:
+        key_match = _STRING.match(buffer, pos)
+        if key_match is None:
+            raise ValueError(f"Expected object key at offset {pos}")
+        key = json.loads(key_match.group().decode("utf-8"))
+        start = _skip_whitespace(buffer, _expect(buffer, key_match.end(), b":"))
+        pos = _skip_whitespace(buffer, scan_member(key, start))
+        if buffer[pos : pos + 1] == b"}":
+            return pos + 1
+        pos = _skip_whitespace(buffer, _expect(buffer, pos, b","))
+
+
+def _value_end(buffer, pos: int) -> int:
+    """
+    Finds the end of the JSON value that starts at the supplied
+    position in the buffer.
+    """
+    token = buffer[pos : pos + 1]
+    if token == b'"':
+        return _STRING.match(buffer, pos).end()
+    if token not in (b"{", b"["):
+        match = _SCALAR_END.search(buffer, pos)
+        return match.start() if match else len(buffer)
+
+    match = _container_regex().match(buffer, pos)
+    if match is not None:
+        return match.end()
+
+    depth = 0
+    while True:
+        token = buffer[pos : pos + 1]
+        if token in (b"{", b"["):
+            depth += 1
+        elif token in (b"}", b"]"):
+            depth -= 1
+        else:
+            raise ValueError(f"Unterminated JSON container at offset {pos}")
+        pos += 1
+        if depth == 0:
+            return pos
+        pos = _NON_CONTAINER.match(buffer, pos).end()
+
+
+def _expect(buffer, pos: int, token: bytes) -> int:
+    """
+    Skips whitespace, and returns the position after the supplied
+    token, raising if it is not the next character in the buffer.
+    """
+    pos = _skip_whitespace(buffer, pos)
+    if buffer[pos : pos + 1] != token:
+        raise ValueError(f"Expected '{token.decode()}' at offset {pos}")
+    return pos + 1
+
+
+def _skip_whitespace(buffer, pos: int) -> int:
+    return _WHITESPACE.match(buffer, pos).end()
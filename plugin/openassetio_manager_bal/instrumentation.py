@@ -0,0 +1,207 @@
+#
+#   Copyright 2013-2022 [The Foundry Visionmongers Ltd]
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+"""
+Optional instrumentation of the BAL manager, recording how often each
+method is called, with how large a batch, how long it takes and how
+many of its elements fail.
+
+When instrumentation is disabled, the manager uses a
+NullInstrumentation, whose methods do nothing, so that the cost is a
+single no-op call per method.
+"""
+
+import bisect
+import contextlib
+import json
+import threading
+import time
+
+# Upper bounds (inclusive) of the histogram buckets. Anything larger
+# falls into a final, unbounded, bucket.
+DURATION_BUCKETS_S = (1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1.0, 10.0)
+BATCH_SIZE_BUCKETS = (1, 10, 100, 1000, 10000, 100000)
+
+
+class Instrumentation:
+    """
+    Collects metrics for each manager method. Safe to use from multiple
+    threads.
+
+    Metrics are periodically logged to the host at debug severity, at
+    most once per `log_interval_s` seconds. Logging is triggered by
+    method calls, so nothing is logged whilst the manager is idle.
+    """
+
+    def __init__(self, log_interval_s: float):
+        self.__lock = threading.Lock()
+        self.__log_interval_s = log_interval_s
+        self.__last_logged = time.monotonic()
+        self.__methods = {}
+        self.__library = {}
+        self.__name_filter = {}
+
+    @contextlib.contextmanager
+    def measure(self, method: str, batch_size: int, host_session):
+        """
+        A context manager that records a single call to the named
+        method, with the supplied batch size, timing its body.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            with self.__lock:
+                metrics = self.__method_metrics(method)
+                metrics["calls"] += 1
+                metrics["elements"] += batch_size
+                metrics["total_s"] += duration
+                metrics["max_s"] = max(metrics["max_s"], duration)
+                metrics["duration_histogram"][
+                    bisect.bisect_left(DURATION_BUCKETS_S, duration)
+                ] += 1
+                metrics["batch_size_histogram"][
+                    bisect.bisect_left(BATCH_SIZE_BUCKETS, batch_size)
+                ] += 1
+                now = time.monotonic()
+                should_log = now - self.__last_logged >= self.__log_interval_s
+                if should_log:
+                    self.__last_logged = now
+            if should_log:
+                self.log(host_session)
+
+    def record_error(self, method: str, error_code):
+        """
+        Records that an element of a batch passed to the named method
+        failed with the supplied BatchElementError.ErrorCode.
+        """
+        with self.__lock:
+            errors = self.__method_metrics(method)["errors"]
+            errors[error_code.name] = errors.get(error_code.name, 0) + 1
+
+    def counting_errors(self, method: str, error_callback):
+        """
+        Wraps the supplied batch error callback such that each error it
+        is called with is recorded against the named method.
+        """
+
+        def callback(idx, error):
+            self.record_error(method, error.code)
+            error_callback(idx, error)
+
+        return callback
+
+    def record_library_load(self, duration_s: float, num_entities: int, num_bytes: int):
+        """
+        Records the time taken to load the library, and its size.
+        """
+        with self.__lock:
+            self.__library = {
+                "load_s": duration_s,
+                "entities": num_entities,
+                "bytes": num_bytes,
+            }
+
+    def record_name_filter(self, num_names: int, num_bytes: int, false_positive_rate: float):
+        """
+        Records the size of the library's name filter, see
+        bloom.BloomFilter.
+        """
+        with self.__lock:
+            self.__name_filter = {
+                "names": num_names,
+                "bytes": num_bytes,
+                "false_positive_rate": false_positive_rate,
+            }
+
+    def metrics(self) -> dict:
+        """
+        Returns a copy of the metrics collected so far.
+
+        Histograms are lists of counts, one per bucket of
+        DURATION_BUCKETS_S or BATCH_SIZE_BUCKETS, plus one for values
+        larger than the last bucket.
+        """
+        with self.__lock:
+            return {
+                "library": dict(self.__library),
+                "name_filter": dict(self.__name_filter),
+                "methods": {
+                    method: {
+                        **metrics,
+                        "errors": dict(metrics["errors"]),
+                        "duration_histogram": list(metrics["duration_histogram"]),
+                        "batch_size_histogram": list(metrics["batch_size_histogram"]),
+                    }
+                    for method, metrics in self.__methods.items()
+                },
+            }
+
+    def log(self, host_session):
+        """
+        Logs the metrics collected so far to the supplied host session
+        at debug severity.
+        """
+        logger = host_session.logger()
+        logger.log(logger.Severity.kDebug, f"BAL metrics: {json.dumps(self.metrics())}")
+
+    def __method_metrics(self, method: str) -> dict:
+        metrics = self.__methods.get(method)
+        if metrics is None:
+            metrics = {
+                "calls": 0,
+                "elements": 0,
+                "total_s": 0.0,
+                "max_s": 0.0,
+                "errors": {},
+                "duration_histogram": [0] * (len(DURATION_BUCKETS_S) + 1),
+                "batch_size_histogram": [0] * (len(BATCH_SIZE_BUCKETS) + 1),
+            }
+            self.__methods[method] = metrics
+        return metrics
+
+
+# The null implementation intentionally ignores its arguments.
+# pylint: disable=missing-function-docstring, unused-argument
+
+
+class NullInstrumentation:
+    """
+    An Instrumentation that records nothing.
+    """
+
+    __null_context = contextlib.nullcontext()
+
+    def measure(self, method: str, batch_size: int, host_session):
+        return self.__null_context
+
+    def record_error(self, method: str, error_code):
+        pass
+
+    def counting_errors(self, method: str, error_callback):
+        return error_callback
+
+    def record_library_load(self, duration_s: float, num_entities: int, num_bytes: int):
+        pass
+
+    def record_name_filter(self, num_names: int, num_bytes: int, false_positive_rate: float):
+        pass
+
+    def metrics(self) -> dict:
+        return {}
+
+    def log(self, host_session):
+        pass
@@ -0,0 +1,231 @@
+#
+#   Copyright 2013-2022 [The Foundry Visionmongers Ltd]
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+"""
+An append-only journal of the entity versions registered with BAL,
+that allows registrations to persist without rewriting the library.
+
+The journal lives alongside the library file, and holds one JSON
+object per line, each recording a new version of an entity:
+
+  {"name": "<entity name>", "traits": {<trait id>: {<property>: <value>}}}
+
+The journal is replayed on top of the library when it is loaded. It
+can be folded back into the library file by compacting it:
+
+  python -m openassetio_manager_bal.journal path/to/library.json
+
+Compaction must not be run whilst any manager is writing to the
+journal.
+"""
+
+import json
+import os
+import sys
+
+
+def journal_path(library_path: str) -> str:
+    """
+    Returns the path of the journal for the supplied library file.
+    """
+    return f"{library_path}.journal"
+
+
+def read_entries(path: str):
+    """
+    Yields the (entity name, traits dict) of each entry in the journal
+    at the supplied path, in the order they were written. A missing
+    journal has no entries.
+
+    A truncated final entry, as left by an interrupted write, is
+    ignored.
+    """
+    try:
+        file = open(path, "r", encoding="utf-8")  # pylint: disable=consider-using-with
+    except FileNotFoundError:
+        return
+
+    with file:
+        for line in file:
+            if not line.endswith("\n"):
+                # Only the last line can be missing its newline.
+                break
+            entry = json.loads(line)
+            yield entry["name"], entry["traits"]
+
+
+class RollbackError(OSError):
+    """
+    Raised when appending to a journal failed, and the entries written
+    before the failure could not be removed. They may be replayed when
+    the library is next loaded.
+    """
+
+
+class Journal:
+    """
+    Appends entries to a journal file. Each call to `append` is synced
+    to disk before it returns.
+
+    Any truncated final entry left by an interrupted write is removed
+    when the journal is opened, so that new entries start on a new
+    line.
+    """
+
+    def __init__(self, path: str):
+        _remove_truncated_entry(path)
+        # Unbuffered, so that a failed append leaves nothing behind to
+        # be written by a later one.
+        # pylint: disable=consider-using-with
+        self.__file = open(path, "ab", buffering=0)
+        self.__size = self.__file.seek(0, os.SEEK_END)
+
+    @property
+    def size(self) -> int:
+        """
+        The length of the journal file, ie. the offset at which the
+        next entries will be appended.
+        """
+        return self.__size
+
+    def append(self, entries):
+        """
+        Appends the supplied (entity name, traits dict) entries to the
+        journal, syncing them to disk once all have been written.
+
+        Should writing or syncing fail, the journal is truncated back
+        to its previous length, so that none of the entries are
+        replayed, and the error raised.
+
+        @exception RollbackError If the journal could not be truncated.
+        """
+        data = "".join(
+            json.dumps({"name": name, "traits": traits}) + "\n" for name, traits in entries
+        ).encode("utf-8")
+        if not data:
+            return
+        offset = self.__size
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[self.__file.write(view) :]
+            os.fsync(self.__file.fileno())
+        except OSError as exc:
+            try:
+                self.truncate(offset)
+            except OSError as truncate_exc:
+                raise RollbackError(
+                    f"{exc}, and the entries written could not be removed:" f" {truncate_exc}",
+                ) from exc
+            raise
+        self.__size = offset + len(data)
+
+    def truncate(self, offset: int):
+        """
+        Removes any entries appended at or after the supplied offset
+        (see size), syncing the journal to disk.
+        """
+        self.__file.truncate(offset)
+        os.fsync(self.__file.fileno())
+        self.__size = offset
+
+    def close(self):
+        """
+        Closes the journal file.
+        """
+        self.__file.close()
+
+
+def _remove_truncated_entry(path: str, block_size: int = 4096):
+    """
+    Truncates the journal at the supplied path to the end of its last
+    complete line, if it does not already end with a newline.
+    """
+    try:
+        file = open(path, "rb+")  # pylint: disable=consider-using-with
+    except FileNotFoundError:
+        return
+
+    with file:
+        end = file.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            start = max(0, position - block_size)
+            file.seek(start)
+            block = file.read(position - start)
+            newline = block.rfind(b"\n")
+            if newline != -1:
+                position = start + newline + 1
+                break
+            position = start
+        if position != end:
+            file.truncate(position)
+
+
+def write_library(library: dict, path: str):
+    """
+    Writes the supplied library to the supplied path as JSON. The file
+    is written to a temporary location first, and moved into place, so
+    that readers never see a partial library.
+
+    Entities may be any mapping, such as a lazily loaded library's
+    (see entities.py). A library without entities (eg. the manifest of
+    a sharded library) is written without them.
+    """
+    # Compaction is rare, so avoid the cost of these imports when the
+    # plugin is loaded.
+    # pylint: disable=import-outside-toplevel
+    import shutil
+    import tempfile
+
+    directory = os.path.dirname(os.path.abspath(path))
+    handle, tmp_path = tempfile.mkstemp(dir=directory, prefix=".bal-library-", suffix=".json")
+    try:
+        with os.fdopen(handle, "w", encoding="utf-8") as file:
+            if "entities" in library:
+                library = {**library, "entities": dict(library["entities"])}
+            json.dump(
+                library,
+                file,
+                indent=2,
+                ensure_ascii=False,
+            )
+            file.flush()
+            os.fsync(file.fileno())
+        if os.path.exists(path):
+            shutil.copymode(path, tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def main(argv):
+    """
+    Compacts the journal of each library path in argv.
+    """
+    # pylint: disable=import-outside-toplevel, cyclic-import
+    from . import bal
+
+    if not argv:
+        print("Usage: python -m openassetio_manager_bal.journal <library.json>...")
+        return 1
+    for library_path in argv:
+        bal.compact_library(library_path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,128 @@
+#
+#   Copyright 2013-2022 [The Foundry Visionmongers Ltd]
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+"""
+A sorted index of entity names, allowing entities to be found by name
+prefix or glob pattern without scanning the whole library.
+"""
+
+import bisect
+import fnmatch
+import functools
+import re
+import sys
+import threading
+
+from typing import Iterable, List
+
+# The characters that are special in an fnmatch pattern.
+_GLOB_CHARS = "*?["
+
+
+class NameIndex:
+    """
+    A sorted list of entity names.
+
+    Names can be added at any time, but are only merged into the sorted
+    list by the next query, so that adding names one at a time does not
+    cost a re-sort of the whole list each time.
+
+    The index is safe to use from multiple threads.
+    """
+
+    def __init__(self, names: Iterable[str]):
+        self.__names = sorted(names)
+        self.__pending = set()
+        self.__lock = threading.Lock()
+
+    def add(self, names: Iterable[str]):
+        """
+        Adds the supplied names to the index. Names that are already
+        present are ignored.
+        """
+        with self.__lock:
+            self.__pending.update(names)
+
+    def with_prefix(self, prefix: str) -> List[str]:
+        """
+        Returns the names in the index that start with the supplied
+        prefix, in sorted order.
+        """
+        names = self.__sorted_names()
+        if not prefix:
+            return list(names)
+        start = bisect.bisect_left(names, prefix)
+        if ord(prefix[-1]) < sys.maxunicode:
+            # Every name with the prefix sorts before the prefix with its
+            # last character incremented, and every other name after it.
+            end = bisect.bisect_left(names, prefix[:-1] + chr(ord(prefix[-1]) + 1), start)
+        else:
+            end = start
+            while end < len(names) and names[end].startswith(prefix):
+                end += 1
+        return names[start:end]
+
+    def matching(self, pattern: str) -> List[str]:
+        """
+        Returns the names in the index that match the supplied glob
+        pattern, in sorted order. See `fnmatch.fnmatchcase`.
+
+        Only names that start with the literal prefix of the pattern,
+        ie. the characters before the first wildcard, are considered.
+        """
+        prefix_end = min(
+            (pattern.find(char) for char in _GLOB_CHARS if char in pattern), default=len(pattern)
+        )
+        candidates = self.with_prefix(pattern[:prefix_end])
+        if prefix_end == len(pattern):
+            return candidates[:1] if candidates and candidates[0] == pattern else []
+        match = _pattern_regex(pattern).match
+        return [name for name in candidates if match(name)]
+
+    def __len__(self) -> int:
+        return len(self.__sorted_names())
+
+    def __sorted_names(self) -> List[str]:
+        """
+        Merges any pending names into the sorted list, and returns it.
+        The returned list is never modified, so may safely be read
+        whilst names are added by other threads.
+        """
+        with self.__lock:
+            if self.__pending:
+                new_names = [name for name in self.__pending if not _contains(self.__names, name)]
+                # Sorting a list made of two sorted runs is linear.
+                merged = self.__names + sorted(new_names)
+                merged.sort()
+                self.__names = merged
+                self.__pending = set()
+            return self.__names
+
+
+@functools.lru_cache(maxsize=256)
+def _pattern_regex(pattern: str):
+    """
+    Returns a compiled regex equivalent to the supplied glob pattern,
+    as per `fnmatch.fnmatchcase`.
+    """
+    return re.compile(fnmatch.translate(pattern))
+
+
+def _contains(names: List[str], name: str) -> bool:
+    """
+    Determines if the supplied sorted list contains the supplied name.
+    """
+    idx = bisect.bisect_left(names, name)
+    return idx < len(names) and names[idx] == name
@@ -0,0 +1,143 @@
+#
+#   Copyright 2013-2022 [The Foundry Visionmongers Ltd]
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+"""
+A process-wide registry of loaded libraries, allowing manager
+instances that use the same library file to share a single parsed copy
+of it.
+
+Libraries are keyed by the resolved path and modification signature of
+the library file and its journal, along with the options used to load
+them, so an edited file is never confused with the copy that was
+loaded before the edit. Shared libraries are reference counted, and
+dropped from the registry once the last user releases them.
+"""
+
+import os
+import threading
+
+from . import entities, journal, shards
+
+_lock = threading.Lock()
+# key -> _Entry
+_libraries = {}
+
+
+class _Entry:  # pylint: disable=too-few-public-methods
+    """
+    A shared library, and the number of references to it. The library
+    is loaded by the first user to acquire it, under the entry's own
+    lock, so loading one library does not block acquiring others.
+    """
+
+    __slots__ = ("library", "count", "lock")
+
+    def __init__(self):
+        self.library = None
+        self.count = 0
+        self.lock = threading.Lock()
+
+
+def acquire(path: str, options: tuple, load):
+    """
+    Acquires a reference to the shared copy of the library at the
+    supplied path, loading it with `load()` if there isn't one.
+
+    The shared copy must never be modified, so callers are given their
+    own library dict, whose entities are a copy-on-write overlay of
+    the shared entities (see entities.OverlayEntities).
+
+    @param options Any options that affect how the library is loaded.
+    They form part of the key, so libraries loaded with different
+    options are not shared.
+
+    @return A tuple of the caller's library dict and a callable that
+    releases the reference. The callable may safely be called more than
+    once.
+    """
+    key = (*_library_key(path), options)
+    with _lock:
+        entry = _libraries.get(key)
+        if entry is None:
+            entry = _Entry()
+            _libraries[key] = entry
+        entry.count += 1
+
+    try:
+        # Should loading fail, the next user to acquire the entry
+        # tries again.
+        with entry.lock:
+            if entry.library is None:
+                entry.library = load()
+            shared = entry.library
+    except BaseException:
+        _release(key, entry)
+        raise
+
+    released = []
+
+    def release():
+        with _lock:
+            if released:
+                return
+            released.append(True)
+        _release(key, entry)
+
+    library = {**shared, "entities": entities.OverlayEntities(shared.get("entities", {}))}
+    return library, release
+
+
+def _release(key: tuple, entry: _Entry):
+    """
+    Releases a reference to the supplied entry, dropping it from the
+    registry if it was the last.
+    """
+    with _lock:
+        entry.count -= 1
+        if entry.count == 0 and _libraries.get(key) is entry:
+            del _libraries[key]
+
+
+def num_shared_libraries() -> int:
+    """
+    Returns the number of libraries currently held in the registry.
+    """
+    with _lock:
+        return len(_libraries)
+
+
+def _library_key(path: str) -> tuple:
+    """
+    Returns values that identify the library at the supplied path, and
+    change whenever it, or its journal, is modified. For a sharded
+    library, this covers the files of every shard.
+    """
+    if shards.is_sharded(path):
+        return tuple(_file_key(file_path) for file_path in shards.library_files(path))
+    return (*_file_key(path), *_file_key(journal.journal_path(path)))
+
+
+def _file_key(path: str) -> tuple:
+    """
+    Returns the resolved path of the supplied file, along with values
+    that change whenever it is modified. Missing files have no
+    modification signature.
+    """
+    real_path = os.path.realpath(path)
+    try:
+        stat = os.stat(real_path)
+    except FileNotFoundError:
+        return real_path, None, None
+    return real_path, stat.st_mtime_ns, stat.st_size
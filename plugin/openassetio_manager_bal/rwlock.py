@@ -0,0 +1,76 @@
+#
+#   Copyright 2013-2022 [The Foundry Visionmongers Ltd]
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+"""
+A single-class module, providing the ReadWriteLock class.
+"""
+
+import threading
+
+from contextlib import contextmanager
+
+
+class ReadWriteLock:
+    """
+    A lock that allows any number of concurrent readers, or a single
+    writer.
+
+    Waiting writers take priority over new readers, so that a steady
+    stream of readers can not starve them. The lock is not re-entrant,
+    a thread holding the lock must not attempt to acquire it again.
+    """
+
+    def __init__(self):
+        self.__condition = threading.Condition(threading.Lock())
+        self.__readers = 0
+        self.__writers_waiting = 0
+        self.__writing = False
+
+    @contextmanager
+    def read(self):
+        """
+        A context manager that holds the lock for reading.
+        """
+        with self.__condition:
+            while self.__writing or self.__writers_waiting:
+                self.__condition.wait()
+            self.__readers += 1
+        try:
+            yield
+        finally:
+            with self.__condition:
+                self.__readers -= 1
+                if self.__readers == 0:
+                    self.__condition.notify_all()
+
+    @contextmanager
+    def write(self):
+        """
+        A context manager that holds the lock exclusively.
+        """
+        with self.__condition:
+            self.__writers_waiting += 1
+            try:
+                while self.__writing or self.__readers:
+                    self.__condition.wait()
+            finally:
+                self.__writers_waiting -= 1
+            self.__writing = True
+        try:
+            yield
+        finally:
+            with self.__condition:
+                self.__writing = False
+                self.__condition.notify_all()
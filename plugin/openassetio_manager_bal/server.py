@@ -0,0 +1,294 @@
+#
+#   Copyright 2013-2022 [The Foundry Visionmongers Ltd]
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+"""
+An out-of-process BAL server, allowing many host processes to share a
+single loaded copy of a library, and see each other's registrations.
+
+The server owns a BasicAssetLibraryInterface, and serves batched
+entityExists, resolve, register and managementPolicy requests, along
+with findEntityReferences queries, to it over a Unix domain socket.
+Managers become clients of a server when their `server_socket` setting
+is set. See client.py for the protocol.
+
+  python -m openassetio_manager_bal.server path/to/bal.sock path/to/library.json
+"""
+
+import argparse
+import errno
+import json
+import operator
+import os
+import socket
+import socketserver
+import stat
+import threading
+
+from typing import List
+
+from openassetio import Context, EntityReference
+from openassetio.hostApi import HostInterface
+from openassetio.log import ConsoleLogger
+from openassetio.managerApi import Host, HostSession
+
+from . import traitsdata
+from .BasicAssetLibraryInterface import BasicAssetLibraryInterface
+from .client import (
+    METHODS,
+    STATUS_ERROR,
+    STATUS_OK,
+    decode_payload,
+    encode_payload,
+    read_frame,
+    write_frame,
+)
+
+
+class Server:
+    """
+    Serves requests to a BasicAssetLibraryInterface, initialized with
+    the supplied settings, on a Unix domain socket at the supplied path.
+
+    Each connection is served by its own thread, so the interface is
+    shared by all connected clients.
+
+    A socket left behind at the path by a server that is no longer
+    running is replaced, but an OSError (EADDRINUSE) is raised if a
+    server is still accepting connections on it.
+    """
+
+    def __init__(self, socket_path: str, settings: dict, host_session=None):
+        if settings.get("server_socket"):
+            raise ValueError("A BAL server cannot itself be a client of a server")
+        if os.path.exists(socket_path) and stat.S_ISSOCK(os.stat(socket_path).st_mode):
+            if _is_served(socket_path):
+                raise OSError(
+                    errno.EADDRINUSE, "A BAL server is already serving this socket", socket_path
+                )
+            # Left behind by a server that was not shut down cleanly.
+            os.unlink(socket_path)
+
+        if host_session is None:
+            host_session = HostSession(Host(_ServerHost()), ConsoleLogger())
+        self.__host_session = host_session
+        self.__interface = BasicAssetLibraryInterface()
+        self.__interface.initialize(settings, host_session)
+
+        self.__socket_path = socket_path
+        self.__server = socketserver.ThreadingUnixStreamServer(socket_path, _RequestHandler)
+        self.__server.daemon_threads = True
+        self.__server.dispatch = self.dispatch
+
+    def serve_forever(self):
+        """
+        Serves requests until shutdown is called from another thread.
+        """
+        self.__server.serve_forever()
+
+    def start(self) -> threading.Thread:
+        """
+        Serves requests on a background thread, until shutdown is
+        called.
+        """
+        thread = threading.Thread(target=self.serve_forever, name="bal-server", daemon=True)
+        thread.start()
+        return thread
+
+    def shutdown(self):
+        """
+        Stops serving requests, and removes the socket.
+        """
+        self.__server.shutdown()
+        self.__server.server_close()
+        if os.path.exists(self.__socket_path):
+            os.unlink(self.__socket_path)
+
+    def dispatch(self, method: str, request: dict):
+        """
+        Processes a single decoded request, returning the response
+        payload. Per-element errors are returned as a list of the
+        BatchElementError code name and message.
+        """
+        if method == "entityExists":
+            return self.__entity_exists(request)
+        if method == "resolve":
+            return self.__resolve(request)
+        if method == "register":
+            return self.__register(request)
+        if method == "managementPolicy":
+            return self.__management_policy(request)
+        if method == "findEntityReferences":
+            return self.__find_entity_references(request)
+        raise ValueError(f"Unknown method '{method}'")
+
+    def __entity_exists(self, request: dict) -> list:
+        results = self.__interface.entityExists(
+            _entity_refs(request["refs"]), _context(request["access"]), self.__host_session
+        )
+        return [
+            ["kMalformedEntityReference", str(result)] if isinstance(result, Exception) else result
+            for result in results
+        ]
+
+    def __resolve(self, request: dict) -> list:
+        results = [None] * len(request["refs"])
+        self.__interface.resolve(
+            _entity_refs(request["refs"]),
+            set(request["traitSet"]),
+            _context(request["access"]),
+            self.__host_session,
+            lambda idx, traits_data: operator.setitem(
+                results, idx, traitsdata.to_dict(traits_data)
+            ),
+            lambda idx, error: operator.setitem(results, idx, _error(error)),
+        )
+        return results
+
+    def __register(self, request: dict) -> list:
+        traits_datas = [traitsdata.from_dict(traits_dict) for traits_dict in request["traits"]]
+        results = [None] * len(request["refs"])
+        self.__interface.register(
+            _entity_refs(request["refs"]),
+            [traits_datas[idx] for idx in request["traitsIndices"]],
+            _context("write"),
+            self.__host_session,
+            lambda idx, entity_ref: operator.setitem(results, idx, entity_ref.toString()),
+            lambda idx, error: operator.setitem(results, idx, _error(error)),
+        )
+        return results
+
+    def __management_policy(self, request: dict) -> list:
+        policies = self.__interface.managementPolicy(
+            [set(trait_set) for trait_set in request["traitSets"]],
+            _context(request["access"]),
+            self.__host_session,
+        )
+        return [traitsdata.to_dict(policy) for policy in policies]
+
+    def __find_entity_references(self, request: dict) -> list:
+        return [
+            ref.toString()
+            for ref in self.__interface.findEntityReferences(
+                request["pattern"], self.__host_session
+            )
+        ]
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """
+    Serves the requests made over a single connection, in order.
+    """
+
+    def handle(self):
+        """
+        Reads, processes and responds to each request in turn, until
+        the client disconnects.
+        """
+        while True:
+            try:
+                frame = read_frame(self.rfile)
+            except OSError:
+                return
+            if frame is None:
+                return
+            request_id, code, payload = frame
+            try:
+                if code >= len(METHODS):
+                    raise ValueError(f"Unknown method code {code}")
+                response = self.server.dispatch(METHODS[code], decode_payload(payload))
+                status = STATUS_OK
+            except Exception as exc:  # pylint: disable=broad-except
+                response = str(exc)
+                status = STATUS_ERROR
+            try:
+                write_frame(self.wfile, request_id, status, encode_payload(response))
+            except OSError:
+                return
+
+
+class _ServerHost(HostInterface):
+    """
+    The host the server's manager interface is used by.
+    """
+
+    # pylint: disable=invalid-name, missing-function-docstring
+
+    def identifier(self):
+        return "org.openassetio.examples.manager.bal.server"
+
+    def displayName(self):
+        return "BAL Server"
+
+
+def _is_served(socket_path: str) -> bool:
+    """
+    Determines if a server is accepting connections on the supplied
+    socket, rather than it having been left behind.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(socket_path)
+        except OSError:
+            return False
+    return True
+
+
+def _context(access: str) -> Context:
+    context = Context()
+    context.access = Context.Access.kRead if access == "read" else Context.Access.kWrite
+    return context
+
+
+def _entity_refs(ref_strings: List[str]) -> List[EntityReference]:
+    return [EntityReference(ref_string) for ref_string in ref_strings]
+
+
+def _error(error) -> list:
+    return [error.code.name, error.message]
+
+
+def main():
+    """
+    Runs a server until interrupted.
+    """
+    parser = argparse.ArgumentParser(description="Serves a BAL library to other processes.")
+    parser.add_argument("socket", help="Path of the Unix domain socket to listen on")
+    parser.add_argument("library", help="Path of the library file")
+    parser.add_argument(
+        "--setting",
+        dest="settings",
+        action="append",
+        default=[],
+        metavar="KEY=JSON",
+        help="Additional manager settings, eg. library_journal=true",
+    )
+    args = parser.parse_args()
+    settings = dict(
+        (key, json.loads(value)) for key, value in (s.split("=", 1) for s in args.settings)
+    )
+    settings["library_path"] = args.library
+
+    server = Server(args.socket, settings)
+    print(f"Serving {args.library} on {args.socket}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,517 @@
+#
+#   Copyright 2013-2022 [The Foundry Visionmongers Ltd]
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+"""
+Support for libraries split across a directory of shard files.
+
+A sharded library is a directory holding a manifest, and one file per
+shard:
+
+  library/
+    manifest.json
+    shard-0000.json
+    shard-0001.json
+    ...
+
+The manifest holds the library's `managementPolicy`, along with how
+entities are partitioned between shards:
+
+  {"shards": {"partition": "hash", "count": 16}, "managementPolicy": {...}}
+
+In "hash" partitioning, an entity's shard is chosen by the CRC-32 of
+its (UTF-8) name. In "prefix" partitioning, eg.
+
+  {"shards": {"partition": "prefix", "prefixes": ["shot010/", "shot020/"]}}
+
+each entity is held by the shard of the longest prefix its name starts
+with, in the order listed, with a final shard for any other entities.
+
+Each shard file is an ordinary library file, holding just the
+"entities" of its shard, and has its own journal. Shards are loaded on
+first use, so a host that only touches a few entities only loads the
+shards that hold them, and registrations only journal to, and
+compaction only rewrites, the shards they affect.
+
+A library file can be split into shards by running this module:
+
+  python -m openassetio_manager_bal.shards library.json library/ --count 16
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import zlib
+
+from collections.abc import MutableMapping
+from typing import Callable, List
+
+from . import entities, journal
+
+MANIFEST_NAME = "manifest.json"
+PARTITIONS = ("hash", "prefix")
+
+
+def is_sharded(path: str) -> bool:
+    """
+    Determines if the supplied library path is a sharded library
+    directory, rather than a library file.
+    """
+    return bool(path) and os.path.isdir(path)
+
+
+def manifest_path(library_path: str) -> str:
+    """
+    Returns the path of the manifest of the sharded library in the
+    supplied directory.
+    """
+    return os.path.join(library_path, MANIFEST_NAME)
+
+
+def shard_path(library_path: str, index: int) -> str:
+    """
+    Returns the path of the shard file with the supplied index.
+    """
+    return os.path.join(library_path, f"shard-{index:04d}.json")
+
+
+def read_manifest(library_path: str) -> dict:
+    """
+    Reads the manifest of the sharded library in the supplied
+    directory.
+    """
+    with open(manifest_path(library_path), "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def library_files(library_path: str, journals: bool = True) -> List[str]:
+    """
+    Returns the paths of the files that make up the sharded library in
+    the supplied directory, ie. its manifest, and each shard along with
+    its journal, should it have one and `journals` is set.
+    """
+    partition = Partition(read_manifest(library_path)["shards"])
+    paths = [manifest_path(library_path)]
+    for index in range(partition.num_shards):
+        path = shard_path(library_path, index)
+        paths.append(path)
+        if journals and os.path.exists(journal.journal_path(path)):
+            paths.append(journal.journal_path(path))
+    return paths
+
+
+def shard_signature(library_path: str, index: int) -> tuple:
+    """
+    Returns a value that changes whenever the shard file with the
+    supplied index, or its journal, is modified or replaced.
+    """
+    path = shard_path(library_path, index)
+    signature = []
+    for file_path in (path, journal.journal_path(path)):
+        try:
+            stat = os.stat(file_path)
+        except FileNotFoundError:
+            signature.append(None)
+        else:
+            signature.append((stat.st_mtime_ns, stat.st_size, stat.st_ino))
+    return tuple(signature)
+
+
+class Partition:
+    """
+    Maps entity names to the index of the shard that holds them, as
+    described by the "shards" object of a manifest.
+    """
+
+    def __init__(self, spec: dict):
+        kind = spec.get("partition", "hash")
+        if kind == "hash":
+            self.__count = spec["count"]
+            if self.__count < 1:
+                raise ValueError("A hash partitioned library must have at least one shard")
+            self.__prefixes = None
+        elif kind == "prefix":
+            # Longest first, so that the first match is the longest.
+            self.__prefixes = sorted(
+                ((prefix, index) for index, prefix in enumerate(spec["prefixes"])),
+                key=lambda item: -len(item[0]),
+            )
+            self.__count = len(self.__prefixes) + 1
+        else:
+            raise ValueError(f"Unknown partition '{kind}', must be one of {PARTITIONS}")
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Partition):
+            return NotImplemented
+        return self.num_shards == other.num_shards and self.prefixes == other.prefixes
+
+    def __hash__(self) -> int:
+        return hash((self.num_shards, self.prefixes))
+
+    @property
+    def num_shards(self) -> int:
+        """
+        The number of shards entities are partitioned between.
+        """
+        return self.__count
+
+    @property
+    def prefixes(self) -> tuple:
+        """
+        The prefix of each shard, in shard order, for "prefix"
+        partitioning, otherwise None.
+        """
+        if self.__prefixes is None:
+            return None
+        return tuple(prefix for prefix, _ in sorted(self.__prefixes, key=lambda item: item[1]))
+
+    def shard_index(self, name: str) -> int:
+        """
+        Returns the index of the shard that holds the named entity.
+        """
+        if self.__prefixes is None:
+            return zlib.crc32(name.encode("utf-8")) % self.__count
+        for prefix, index in self.__prefixes:
+            if name.startswith(prefix):
+                return index
+        return self.__count - 1
+
+
+class ShardedEntities(MutableMapping):
+    """
+    The entities of a sharded library, behaving as a single dict of
+    entity name to entity dict.
+
+    Each shard is loaded on first use, by the supplied `load_shard`,
+    which is given the shard's path and returns a library dict. Any
+    operation that needs every entity, such as iteration, loads all the
+    remaining shards, on up to `num_workers` threads.
+
+    The signature of each shard's files is recorded as it is loaded,
+    so that successive loads of the library can be compared shard by
+    shard (see changed_keys).
+
+    Loading shards is safe from multiple threads. Otherwise, the usual
+    rules for the library's entities apply.
+    """
+
+    def __init__(
+        self,
+        library_path: str,
+        partition: Partition,
+        load_shard: Callable[[str], dict],
+        num_workers: int,
+    ):
+        self.__library_path = library_path
+        self.__partition = partition
+        self.__load_shard = load_shard
+        self.__num_workers = num_workers
+        self.__shards = [None] * partition.num_shards
+        self.__signatures = [None] * partition.num_shards
+        self.__locks = [threading.Lock() for _ in range(partition.num_shards)]
+
+    @property
+    def partition(self) -> Partition:
+        """
+        The partitioning of entities between shards.
+        """
+        return self.__partition
+
+    @property
+    def num_loaded_shards(self) -> int:
+        """
+        The number of shards loaded so far.
+        """
+        return sum(1 for shard in self.__shards if shard is not None)
+
+    def is_loaded(self, index: int) -> bool:
+        """
+        Determines if the shard with the supplied index has been loaded.
+        """
+        return self.__shards[index] is not None
+
+    def signature(self, index: int) -> tuple:
+        """
+        Returns the signature (see shard_signature) of the files of the
+        shard with the supplied index, as of when it was loaded, or if
+        it is not yet loaded, as of now.
+        """
+        signature = self.__signatures[index]
+        if signature is None:
+            signature = shard_signature(self.__library_path, index)
+        return signature
+
+    def shard(self, index: int) -> MutableMapping:
+        """
+        Returns the entities of the shard with the supplied index,
+        loading it if this is its first use.
+        """
+        shard = self.__shards[index]
+        if shard is None:
+            with self.__locks[index]:
+                shard = self.__shards[index]
+                if shard is None:
+                    # Taken first, so that a change made whilst loading
+                    # is seen as a change by the next comparison.
+                    signature = shard_signature(self.__library_path, index)
+                    library = self.__load_shard(shard_path(self.__library_path, index))
+                    shard = library.setdefault("entities", {})
+                    self.__signatures[index] = signature
+                    self.__shards[index] = shard
+        return shard
+
+    def load_all(self):
+        """
+        Loads every shard that is not yet loaded, in parallel.
+        """
+        missing = [index for index, shard in enumerate(self.__shards) if shard is None]
+        if len(missing) > 1 and self.__num_workers > 1:
+            # Deferred, as most libraries are not sharded.
+            # pylint: disable=import-outside-toplevel
+            from concurrent.futures import ThreadPoolExecutor
+
+            with ThreadPoolExecutor(
+                max_workers=min(self.__num_workers, len(missing)), thread_name_prefix="bal-shard"
+            ) as executor:
+                # Consumed, so that any error is raised.
+                list(executor.map(self.shard, missing))
+        else:
+            for index in missing:
+                self.shard(index)
+
+    def raw(self, key):
+        """
+        Returns the encoded form of the named entity, if its shard
+        provides one, otherwise None. See entities.changed_keys.
+        """
+        shard = self.__shard_for(key)
+        raw = getattr(shard, "raw", None)
+        return raw(key) if raw is not None else None
+
+    def setdefault(self, key, default=None):
+        # Delegated, so that shards that are themselves overlays can
+        # copy the entity before it is modified.
+        return self.__shard_for(key).setdefault(key, default)
+
+    def __getitem__(self, key):
+        return self.__shard_for(key)[key]
+
+    def __setitem__(self, key, value):
+        self.__shard_for(key)[key] = value
+
+    def __delitem__(self, key):
+        del self.__shard_for(key)[key]
+
+    def __contains__(self, key) -> bool:
+        return key in self.__shard_for(key)
+
+    def __iter__(self):
+        self.load_all()
+        for shard in self.__shards:
+            yield from shard
+
+    def __len__(self) -> int:
+        self.load_all()
+        return sum(len(shard) for shard in self.__shards)
+
+    def __shard_for(self, key: str) -> MutableMapping:
+        return self.shard(self.__partition.shard_index(key))
+
+
+def changed_keys(old: ShardedEntities, new: ShardedEntities) -> set:
+    """
+    Returns the names of the entities that differ between the supplied
+    loads of a sharded library, as entities.changed_keys, but without
+    loading every shard.
+
+    Only the shards that `old` has loaded, and whose files have changed
+    since, are compared. Entities in shards `old` never loaded cannot
+    have been used, and so are not reported, even if they changed.
+
+    Should the partitioning of entities between shards have changed,
+    the shards `old` has loaded are compared with the whole of `new`,
+    as the files of the others may no longer exist.
+    """
+    if old.partition != new.partition:
+        return _changed_keys_repartitioned(old, new)
+    changed = set()
+    for index in range(old.partition.num_shards):
+        if not old.is_loaded(index) or old.signature(index) == new.signature(index):
+            continue
+        changed |= entities.changed_keys(old.shard(index), new.shard(index))
+    return changed
+
+
+def _changed_keys_repartitioned(old: ShardedEntities, new: ShardedEntities) -> set:
+    """
+    Returns the names of the entities that differ between the shards
+    the supplied `old` has loaded and `new`, loading all of `new`.
+    """
+    changed = set()
+    for index in range(old.partition.num_shards):
+        if old.is_loaded(index):
+            changed.update(entities.rewritten_keys(old.shard(index)))
+            changed.update(key for key in old.shard(index) if key not in new)
+    for key in new:
+        index = old.partition.shard_index(key)
+        if not old.is_loaded(index):
+            continue
+        old_shard = old.shard(index)
+        if key not in old_shard or old_shard[key] != new[key]:
+            changed.add(key)
+    return changed
+
+
+def load_sharded_library(
+    library_path: str, load_shard: Callable[[str], dict], eager: bool, num_workers: int
+) -> dict:
+    """
+    Loads the sharded library in the supplied directory. The returned
+    library holds everything in the manifest other than the shard
+    layout, and a ShardedEntities.
+
+    @param load_shard Called with the path of a shard file to load it,
+    returning a library dict.
+    @param eager If set, every shard is loaded before returning,
+    otherwise each is loaded on first use.
+    """
+    manifest = read_manifest(library_path)
+    sharded_entities = ShardedEntities(
+        library_path, Partition(manifest["shards"]), load_shard, num_workers
+    )
+    if eager:
+        sharded_entities.load_all()
+    library = {key: value for key, value in manifest.items() if key != "shards"}
+    library["entities"] = sharded_entities
+    return library
+
+
+class ShardedJournal:
+    """
+    A journal of the registrations made to a sharded library, with the
+    same interface as journal.Journal. Each entry is appended to the
+    journal of the shard holding its entity, and the journal of each
+    shard is opened on first use.
+
+    A failure to append to one shard's journal removes the entries
+    appended to the shards before it, so the batch is journaled to all
+    of its shards or none.
+    """
+
+    def __init__(self, library_path: str):
+        self.__library_path = library_path
+        self.__partition = Partition(read_manifest(library_path)["shards"])
+        self.__journals = {}
+
+    def append(self, entries):
+        """
+        Appends the supplied (entity name, traits dict) entries to the
+        journals of their shards, syncing each journal once.
+
+        @exception RollbackError If appending failed, and the entries
+        already appended could not be removed.
+        """
+        entries_by_shard = {}
+        for name, traits in entries:
+            entries_by_shard.setdefault(self.__partition.shard_index(name), []).append(
+                (name, traits)
+            )
+        # (journal, size before appending) for each shard appended to.
+        appended = []
+        try:
+            for index, shard_entries in entries_by_shard.items():
+                shard_journal = self.__journals.get(index)
+                if shard_journal is None:
+                    shard_journal = journal.Journal(
+                        journal.journal_path(shard_path(self.__library_path, index))
+                    )
+                    self.__journals[index] = shard_journal
+                size = shard_journal.size
+                shard_journal.append(shard_entries)
+                appended.append((shard_journal, size))
+        except OSError as exc:
+            try:
+                for shard_journal, size in appended:
+                    shard_journal.truncate(size)
+            except OSError as truncate_exc:
+                raise journal.RollbackError(
+                    f"{exc}, and the entries written to other shards could"
+                    f" not be removed: {truncate_exc}",
+                ) from exc
+            raise
+
+    def close(self):
+        """
+        Closes the journal of each shard.
+        """
+        for shard_journal in self.__journals.values():
+            shard_journal.close()
+        self.__journals = {}
+
+
+def write_sharded_library(library: dict, library_path: str, shards: dict):
+    """
+    Writes the supplied library as a sharded library in the supplied
+    directory, which is created if need be, partitioning its entities
+    as described by `shards` (the "shards" object of the manifest).
+    Every shard file is written, even if it has no entities.
+    """
+    partition = Partition(shards)
+    entities_by_shard = [{} for _ in range(partition.num_shards)]
+    for name, entity_dict in library.get("entities", {}).items():
+        entities_by_shard[partition.shard_index(name)][name] = entity_dict
+
+    os.makedirs(library_path, exist_ok=True)
+    for index, shard_entities in enumerate(entities_by_shard):
+        journal.write_library({"entities": shard_entities}, shard_path(library_path, index))
+    manifest = {key: value for key, value in library.items() if key not in ("entities", "$schema")}
+    manifest["shards"] = shards
+    journal.write_library(manifest, manifest_path(library_path))
+
+
+def main(argv):
+    """
+    Splits a library file into a sharded library directory.
+    """
+    # pylint: disable=import-outside-toplevel, cyclic-import
+    from . import bal
+
+    parser = argparse.ArgumentParser(
+        prog="python -m openassetio_manager_bal.shards",
+        description="Splits a library file into a sharded library directory.",
+    )
+    parser.add_argument("library", help="Path of the library file to split")
+    parser.add_argument("directory", help="Path of the directory to write the shards to")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--count", type=int, help="Partition by name hash into this many shards")
+    group.add_argument(
+        "--prefix",
+        dest="prefixes",
+        action="append",
+        help="Partition by name prefix, one shard per prefix, plus one for other names",
+    )
+    args = parser.parse_args(argv)
+
+    if args.prefixes:
+        shards = {"partition": "prefix", "prefixes": args.prefixes}
+    else:
+        shards = {"partition": "hash", "count": args.count}
+    write_sharded_library(bal.load_library(args.library), args.directory, shards)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
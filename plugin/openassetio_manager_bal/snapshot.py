@@ -0,0 +1,254 @@
+#
+#   Copyright 2013-2022 [The Foundry Visionmongers Ltd]
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+"""
+A compiled, read-only, binary snapshot of a BAL library, that can be
+memory mapped rather than parsed. This allows many processes on the
+same host to share the same pages.
+
+The snapshot holds only the latest version of each entity. Its
+`firstVersion` is set such that it keeps its version number.
+
+The file layout (all integers are little-endian) is:
+
+  - A header (see _HEADER).
+  - The library's top-level data, excluding entities (eg. the
+    managementPolicy), as UTF-8 JSON.
+  - A table of fixed-size entity records (see _RECORD), sorted by
+    UTF-8 encoded entity name, allowing a binary search by name.
+  - The entity names and UTF-8 JSON blobs the records point to.
+
+Snapshots can be compiled on demand by running this module:
+
+  python -m openassetio_manager_bal.snapshot path/to/library.json
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+
+from collections.abc import Mapping
+
+from .cache import LRUCache
+from .entities import OverlayEntities
+
+_MAGIC = b"BALSNAP\0"
+_FORMAT_VERSION = 2
+# magic, format version, entity count, top-level data offset and
+# length, entity table offset.
+_HEADER = struct.Struct("<8sIQQQQ")
+# name offset, name length, blob offset, blob length.
+_RECORD = struct.Struct("<QIQI")
+
+
+def snapshot_path(library_path: str) -> str:
+    """
+    Returns the path of the snapshot for the supplied library file,
+    which lives alongside it.
+    """
+    return f"{library_path}.snapshot"
+
+
+def is_fresh(library_path: str) -> bool:
+    """
+    Determines if there is a snapshot for the supplied library that is
+    at least as new as the library file itself, and was written in the
+    current format.
+    """
+    path = snapshot_path(library_path)
+    try:
+        snapshot_mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return False
+    if snapshot_mtime < os.stat(library_path).st_mtime_ns:
+        return False
+    with open(path, "rb") as file:
+        header = file.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        return False
+    magic, version = _HEADER.unpack(header)[:2]
+    return magic == _MAGIC and version == _FORMAT_VERSION
+
+
+def write_snapshot(library: dict, path: str):
+    """
+    Compiles the supplied library into a snapshot at the supplied path.
+    The file is written to a temporary location first, and moved into
+    place, so that readers never see a partial snapshot.
+    """
+    top_level = {key: value for key, value in library.items() if key != "entities"}
+    top_level_blob = json.dumps(top_level).encode("utf-8")
+
+    entries = []
+    for name, entity_dict in library.get("entities", {}).items():
+        versions = entity_dict["versions"]
+        latest = {
+            **entity_dict,
+            "versions": versions[-1:],
+            "firstVersion": entity_dict.get("firstVersion", 1) + len(versions) - 1,
+        }
+        entries.append((name.encode("utf-8"), json.dumps(latest).encode("utf-8")))
+    entries.sort(key=lambda entry: entry[0])
+
+    table_offset = _HEADER.size + len(top_level_blob)
+    data_offset = table_offset + _RECORD.size * len(entries)
+
+    records = []
+    data = []
+    for name, blob in entries:
+        records.append(_RECORD.pack(data_offset, len(name), data_offset + len(name), len(blob)))
+        data.extend((name, blob))
+        data_offset += len(name) + len(blob)
+
+    header = _HEADER.pack(
+        _MAGIC, _FORMAT_VERSION, len(entries), _HEADER.size, len(top_level_blob), table_offset
+    )
+    _write_atomically(path, [header, top_level_blob, *records, *data])
+
+
+def _write_atomically(path: str, chunks):
+    """
+    Writes the supplied chunks of bytes to a temporary file alongside
+    the target path, then moves it into place.
+    """
+    # Only needed when compiling, so not imported with the plugin.
+    import tempfile  # pylint: disable=import-outside-toplevel
+
+    directory = os.path.dirname(os.path.abspath(path))
+    handle, tmp_path = tempfile.mkstemp(dir=directory, prefix=".bal-snapshot-")
+    try:
+        with os.fdopen(handle, "wb") as file:
+            file.writelines(chunks)
+        # mkstemp creates files only readable by their owner, but
+        # snapshots are intended to be shared.
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def load_snapshot(path: str, cache_size: int) -> dict:
+    """
+    Memory maps the snapshot at the supplied path, returning a library
+    dict whose entities are decoded from the snapshot on first use.
+    The most recently used `cache_size` entities are kept decoded.
+    """
+    with open(path, "rb") as file:
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, version, count, top_level_offset, top_level_length, table_offset = _HEADER.unpack_from(
+        buffer, 0
+    )
+    if magic != _MAGIC or version != _FORMAT_VERSION:
+        raise ValueError(f"'{path}' is not a compatible BAL library snapshot")
+
+    top_level_blob = buffer[top_level_offset : top_level_offset + top_level_length]
+    library = json.loads(top_level_blob.decode("utf-8"))
+    library["entities"] = OverlayEntities(
+        SnapshotEntities(buffer, count, table_offset, cache_size)
+    )
+    return library
+
+
+class SnapshotEntities(Mapping):
+    """
+    A read-only view of the entities in a memory mapped snapshot.
+    Entities are found by binary search of the snapshot's entity table.
+    """
+
+    def __init__(self, buffer, count: int, table_offset: int, cache_size: int):
+        self.__buffer = buffer
+        self.__count = count
+        self.__table_offset = table_offset
+        self.__cache = LRUCache(cache_size)
+
+    def __getitem__(self, key):
+        entity_dict = self.__cache.get(key)
+        if entity_dict is None:
+            record = self.__find(key)
+            if record is None:
+                raise KeyError(key)
+            _, _, blob_offset, blob_length = record
+            blob = self.__buffer[blob_offset : blob_offset + blob_length]
+            entity_dict = json.loads(blob.decode("utf-8"))
+            self.__cache.put(key, entity_dict)
+        return entity_dict
+
+    def raw(self, key) -> bytes:
+        """
+        Returns the undecoded JSON of the entity with the supplied
+        name, or None if it is not present.
+        """
+        record = self.__find(key)
+        if record is None:
+            return None
+        _, _, blob_offset, blob_length = record
+        return self.__buffer[blob_offset : blob_offset + blob_length]
+
+    def __contains__(self, key) -> bool:
+        return key in self.__cache or self.__find(key) is not None
+
+    def __iter__(self):
+        for idx in range(self.__count):
+            name_offset, name_length, _, _ = self.__record(idx)
+            yield self.__buffer[name_offset : name_offset + name_length].decode("utf-8")
+
+    def __len__(self) -> int:
+        return self.__count
+
+    def __find(self, key: str):
+        """
+        Binary searches the entity table for the supplied name,
+        returning its record, or None if it is not present.
+        """
+        if not isinstance(key, str):
+            return None
+        name = key.encode("utf-8")
+        low, high = 0, self.__count
+        while low < high:
+            mid = (low + high) // 2
+            record = self.__record(mid)
+            mid_name = self.__buffer[record[0] : record[0] + record[1]]
+            if mid_name == name:
+                return record
+            if mid_name < name:
+                low = mid + 1
+            else:
+                high = mid
+        return None
+
+    def __record(self, idx: int) -> tuple:
+        return _RECORD.unpack_from(self.__buffer, self.__table_offset + idx * _RECORD.size)
+
+
+def main(argv):
+    """
+    Compiles a snapshot for each library path in argv.
+    """
+    if not argv:
+        print("Usage: python -m openassetio_manager_bal.snapshot <library.json>...")
+        return 1
+    for library_path in argv:
+        with open(library_path, "r", encoding="utf-8") as file:
+            library = json.load(file)
+        write_snapshot(library, snapshot_path(library_path))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
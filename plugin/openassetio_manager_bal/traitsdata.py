@@ -0,0 +1,53 @@
+#
+#   Copyright 2013-2022 [The Foundry Visionmongers Ltd]
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+"""
+Conversions between OpenAssetIO TraitsData and the dicts of trait
+properties, keyed by trait ID then property key, that BAL stores.
+"""
+
+from openassetio import TraitsData
+
+
+def to_dict(traits_data: TraitsData) -> dict:
+    """
+    Converts the supplied TraitsData to a dict of trait properties.
+    """
+    return {
+        trait_id: {
+            prop_key: traits_data.getTraitProperty(trait_id, prop_key)
+            for prop_key in traits_data.traitPropertyKeys(trait_id)
+        }
+        for trait_id in traits_data.traitSet()
+    }
+
+
+def from_dict(traits_dict: dict) -> TraitsData:
+    """
+    Converts the supplied dict of trait properties to a TraitsData.
+    """
+    traits_data = TraitsData()
+    for trait_id, trait_properties in traits_dict.items():
+        add_trait(trait_id, trait_properties, traits_data)
+    return traits_data
+
+
+def add_trait(trait_id: str, trait_properties: dict, traits_data: TraitsData):
+    """
+    Adds the supplied trait, and its properties, to a TraitsData.
+    """
+    traits_data.addTrait(trait_id)
+    for name, value in trait_properties.items():
+        traits_data.setTraitProperty(trait_id, name, value)
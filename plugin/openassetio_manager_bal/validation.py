@@ -0,0 +1,196 @@
+#
+#   Copyright 2013-2022 [The Foundry Visionmongers Ltd]
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+"""
+Validation of library files against the library JSON Schema
+(schema.json, alongside this module).
+
+Validation requires the optional `jsonschema` package. Checking a large
+library is slow, so once a library file has passed, a digest of it
+(and of the schema) is recorded in a stamp file alongside it. Later
+validations of the same, unchanged, file are then skipped.
+
+Libraries can be validated on demand by running this module:
+
+  python -m openassetio_manager_bal.validation path/to/library.json
+"""
+
+import functools
+import hashlib
+import importlib.util
+import json
+import os
+import sys
+
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "schema.json")
+
+_DIGEST_CHUNK_SIZE = 1024 * 1024
+
+
+class InvalidLibrary(Exception):
+    """
+    An exception raised for a library file that does not conform to
+    the library schema.
+
+    The `errors` attribute holds a (JSON path, message) tuple for each
+    problem found.
+    """
+
+    def __init__(self, path: str, errors: list):
+        self.errors = errors
+        details = "\n".join(f"  {json_path}: {message}" for json_path, message in errors)
+        super().__init__(f"Library '{path}' is invalid, {len(errors)} error(s):\n{details}")
+
+
+def is_available() -> bool:
+    """
+    Determines if the packages required for validation are installed.
+    """
+    return importlib.util.find_spec("jsonschema") is not None
+
+
+def stamp_path(library_path: str) -> str:
+    """
+    Returns the path of the stamp file recording that the supplied
+    library file has been validated, which lives alongside it.
+    """
+    return f"{library_path}.validated"
+
+
+def validate_library_file(path: str, library: dict = None):
+    """
+    Validates the library file at the supplied path, raising an
+    InvalidLibrary exception listing every error found.
+
+    Validation is skipped if the file is unchanged since it last passed.
+
+    @param library The parsed content of the file, if the caller already
+    has it, otherwise the file is parsed if validation is needed.
+    """
+    digest = _digest(path)
+    if _read_stamp(stamp_path(path)) == digest:
+        return
+
+    if library is None:
+        with open(path, "r", encoding="utf-8") as file:
+            library = json.load(file)
+
+    errors = library_errors(library)
+    if errors:
+        raise InvalidLibrary(path, errors)
+
+    try:
+        with open(stamp_path(path), "w", encoding="utf-8") as file:
+            file.write(digest)
+    except OSError:
+        # The library may be on a read-only share, in which case it is
+        # simply validated each time.
+        pass
+
+
+def library_errors(library: dict) -> list:
+    """
+    Validates the supplied library against the schema, returning a
+    (JSON path, message) tuple for each error found, in path order.
+    """
+    errors = [
+        (_json_path(error.absolute_path), error.message)
+        for error in _validator().iter_errors(library)
+    ]
+    errors.sort()
+    return errors
+
+
+@functools.lru_cache(maxsize=None)
+def _validator():
+    """
+    Returns a validator for the library schema. The schema is checked
+    and compiled once, on first use.
+    """
+    # Optional, and slow to import, so only imported when needed.
+    import jsonschema  # pylint: disable=import-outside-toplevel
+
+    with open(SCHEMA_PATH, "r", encoding="utf-8") as file:
+        schema = json.load(file)
+    validator_class = jsonschema.validators.validator_for(schema)
+    validator_class.check_schema(schema)
+    return validator_class(schema)
+
+
+@functools.lru_cache(maxsize=None)
+def _schema_digest() -> str:
+    with open(SCHEMA_PATH, "rb") as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+def _digest(path: str) -> str:
+    """
+    Returns a digest of the supplied library file, combined with that of
+    the schema, so that a change to either invalidates a stamp.
+    """
+    library_hash = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(functools.partial(file.read, _DIGEST_CHUNK_SIZE), b""):
+            library_hash.update(chunk)
+    return f"{_schema_digest()}:{library_hash.hexdigest()}"
+
+
+def _read_stamp(path: str):
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            return file.read()
+    except OSError:
+        return None
+
+
+def _json_path(path) -> str:
+    """
+    Formats the supplied sequence of keys and indices as a JSON path,
+    eg. `$.entities["an entity"].versions[0]`.
+    """
+    parts = ["$"]
+    for key in path:
+        if isinstance(key, int):
+            parts.append(f"[{key}]")
+        elif key.isidentifier():
+            parts.append(f".{key}")
+        else:
+            parts.append(f"[{json.dumps(key, ensure_ascii=False)}]")
+    return "".join(parts)
+
+
+def main(argv):
+    """
+    Validates each library path in argv, printing any errors.
+
+    @return The number of invalid libraries.
+    """
+    if not argv:
+        print("Usage: python -m openassetio_manager_bal.validation <library.json>...")
+        return 1
+    num_invalid = 0
+    for path in argv:
+        try:
+            validate_library_file(path)
+        except InvalidLibrary as exc:
+            print(exc)
+            num_invalid += 1
+        else:
+            print(f"Library '{path}' is valid")
+    return num_invalid
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
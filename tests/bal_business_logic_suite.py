@@ -16,20 +16,48 @@
 """
 A manager test harness test case suite that validates that the
 BasicAssetLibrary manager behaves with the correct business logic.
+
+Tests of the library loading and storage options, and of concurrent
+and out-of-process use, are in the neighbouring bal_*_suite.py
+modules.
 """
 
 # pylint: disable=invalid-name, missing-function-docstring, missing-class-docstring
+# The suites make the same harness calls, with the same callbacks.
+# pylint: disable=duplicate-code
 
+import json
 import operator
 import os
+import random
+
+from urllib.parse import parse_qs, urlparse
 
 from openassetio import Context, TraitsData
+from openassetio.hostApi import HostInterface
+from openassetio.log import ConsoleLogger
+from openassetio.managerApi import Host, HostSession
 from openassetio.traits.managementPolicy import ManagedTrait
 from openassetio.test.manager.harness import FixtureAugmentedTestCase
 
+from openassetio_manager_bal import bal, cache
+from openassetio_manager_bal.BasicAssetLibraryInterface import BasicAssetLibraryInterface
+
 __all__ = []
 
 
+class _TestHost(HostInterface):
+    """
+    A minimal host, for tests that drive a manager interface directly.
+    """
+
+    def identifier(self):
+        return "org.openassetio.examples.manager.bal.test"
+
+    def displayName(self):
+        return "BAL Test Host"
+
+
 class Test_managementPolicy_default_behavior(FixtureAugmentedTestCase):
     """
     Tests that by default, the BAL manages all entities, for read, but
@@ -110,6 +138,212 @@ class Test_managementPolicy_library_specified_behavior(FixtureAugmentedTestCase)
 
         self.assertListEqual(actual, expected)
 
+    def test_when_trait_set_only_overlaps_exception_then_default_returned(self):
+        context = self.createTestContext(access=Context.Access.kRead)
+        expected = TraitsData({ManagedTrait.kId})
+        ManagedTrait(expected).setExclusive(True)
+
+        actual = self._manager.managementPolicy(
+            [{"an", "ignored", "trait"}, {"an", "ignored", "trait", "set", "and", "more"}],
+            context,
+        )
+
+        self.assertListEqual(actual, [expected, expected])
+
+    def test_when_trait_sets_repeated_then_each_has_its_policy(self):
+        context = self.createTestContext(access=Context.Access.kRead)
+        trait_sets = [set(trait_set) for trait_set in self.__read_trait_sets * 3]
+        trait_sets.reverse()
+
+        actual = self._manager.managementPolicy(trait_sets, context)
+
+        self.assertListEqual(
+            actual,
+            [self._manager.managementPolicy([trait_set], context)[0] for trait_set in trait_sets],
+        )
+
+    def test_when_trait_sets_repeated_then_each_given_own_policy(self):
+        context = self.createTestContext(access=Context.Access.kRead)
+        trait_set = self.__read_trait_sets[0]
+
+        first, second = self._manager.managementPolicy([trait_set, set(trait_set)], context)
+        first.setTraitProperty("aTestTrait", "aProperty", "modified")
+
+        self.assertFalse(second.hasTrait("aTestTrait"))
+
+
+class Test_management_policy_index(FixtureAugmentedTestCase):
+    """
+    Tests the index management policies are looked up in, which matches
+    exceptions by the exact set of traits they apply to.
+    """
+
+    __library = {
+        "managementPolicy": {
+            "read": {
+                "default": {"aDefault": {}},
+                "exceptions": [
+                    {"traitSet": ["a", "b"], "policy": {"first": {}}},
+                    {"traitSet": ["b", "a", "b"], "policy": {"second": {}}},
+                    {"traitSet": ["c"], "policy": {"third": {}}},
+                ],
+            }
+        }
+    }
+
+    def test_when_exceptions_repeat_trait_set_then_first_used(self):
+        index = bal.management_policy_index(self.__library)
+
+        self.assertEqual(bal.management_policy({"a", "b"}, "read", index), {"first": {}})
+        self.assertEqual(bal.management_policy({"c"}, "read", index), {"third": {}})
+
+    def test_when_trait_set_in_any_order_or_form_then_exception_matched(self):
+        index = bal.management_policy_index(self.__library)
+
+        for trait_set in ({"b", "a"}, frozenset(("a", "b")), ["b", "a", "a"], ("a", "b")):
+            with self.subTest(trait_set=trait_set):
+                self.assertEqual(bal.management_policy(trait_set, "read", index), {"first": {}})
+
+    def test_when_trait_set_not_excepted_then_default_used(self):
+        index = bal.management_policy_index(self.__library)
+
+        for trait_set in (set(), {"a"}, {"a", "b", "c"}):
+            with self.subTest(trait_set=trait_set):
+                self.assertEqual(bal.management_policy(trait_set, "read", index), {"aDefault": {}})
+
+    def test_when_access_has_no_policy_then_managed_by_default(self):
+        index = bal.management_policy_index(self.__library)
+
+        self.assertEqual(
+            bal.management_policies([{"a", "b"}, {"c"}], "write", index),
+            [{"openassetio.Managed": {}}, {"openassetio.Managed": {}}],
+        )
+
+    def test_when_convert_supplied_then_each_indexed_policy_converted_once(self):
+        converted = []
+
+        def convert(policy):
+            converted.append(policy)
+            return sorted(policy)
+
+        index = bal.management_policy_index(self.__library, convert)
+
+        self.assertEqual(bal.management_policy({"a", "b"}, "read", index), ["first"])
+        self.assertEqual(bal.management_policy({"c"}, "read", index), ["third"])
+        self.assertEqual(bal.management_policy({"a"}, "read", index), ["aDefault"])
+        self.assertEqual(bal.management_policy({"a"}, "write", index), ["openassetio.Managed"])
+        # The repeated trait set's policy is never used, so isn't converted.
+        self.assertCountEqual(
+            converted,
+            [{"aDefault": {}}, {"first": {}}, {"third": {}}, {"openassetio.Managed": {}}],
+        )
+
+
+class Test_parse_entity_ref(FixtureAugmentedTestCase):
+    """
+    Tests that bal.parse_entity_ref, which only uses urllib for unusual
+    references, parses every reference as urllib does.
+    """
+
+    __prefixes = ("bal:///", "bal://", "bal:/", "bal:////", "BAL:///", "other:///", "")
+    __names = (
+        "anAsset⭐︎",
+        "a",
+        "shot010/asset 1",
+        "a%20b",
+        "a;b",
+        "a/",
+        "/a",
+        "a\tb",
+        "a\nb",
+        "",
+    )
+    __suffixes = (
+        "",
+        "?v=1",
+        "?v=12",
+        "?v=latest",
+        "?v=0",
+        "?v=01",
+        "?v=-1",
+        "?v=",
+        "?v=1 ",
+        "?V=1",
+        "?v=١",
+        "?v=1&v=2",
+        "?x=1&v=2",
+        "?v=2#a#b",
+        "#a fragment",
+        "?",
+        "#",
+    )
+
+    def test_when_references_parsed_then_results_match_urllib(self):
+        for prefix in self.__prefixes:
+            for name in self.__names:
+                for suffix in self.__suffixes:
+                    ref = prefix + name + suffix
+                    with self.subTest(ref=ref):
+                        self.assertEqual(
+                            _parse_outcome(bal.parse_entity_ref, ref),
+                            _parse_outcome(_parse_entity_ref_urllib, ref),
+                        )
+
+    def test_when_random_references_parsed_then_results_match_urllib(self):
+        rng = random.Random(0)
+        alphabet = ("a", "⭐", "/", "?", "#", "=", "&", "v", "1", "0", "latest", "%", " ", "\t")
+
+        for _ in range(5000):
+            ref = rng.choice(("bal:///", "bal:///", "bal:/", "")) + "".join(
+                rng.choices(alphabet, k=rng.randrange(8))
+            )
+            with self.subTest(ref=ref):
+                self.assertEqual(
+                    _parse_outcome(bal.parse_entity_ref, ref),
+                    _parse_outcome(_parse_entity_ref_urllib, ref),
+                )
+
+    def test_when_parser_memoized_then_results_match_unmemoized(self):
+        parse = bal.entity_ref_parser(cache_size=2)
+        refs = ("bal:///anAsset⭐︎", "bal:///anAsset⭐︎?v=2", "bal:///", "bal:///a?v=0") * 2
+
+        self.assertEqual(
+            [_parse_outcome(parse, ref) for ref in refs],
+            [_parse_outcome(bal.parse_entity_ref, ref) for ref in refs],
+        )
+
+
+def _parse_entity_ref_urllib(entity_ref: str) -> bal.EntityInfo:
+    """
+    Parses an entity reference entirely with urllib, as
+    bal.parse_entity_ref does for references it has no fast path for.
+    """
+    uri_parts = urlparse(entity_ref)
+    if len(uri_parts.path) <= 1:
+        raise bal.MalformedBALReference("Missing entity name in path component")
+    name = uri_parts.path[1:]
+    versions = parse_qs(uri_parts.query).get(bal.VERSION_QUERY_PARAM)
+    if not versions or versions[-1] == bal.LATEST_VERSION_TAG:
+        return bal.EntityInfo(name=name)
+    version = versions[-1]
+    if not (version.isascii() and version.isdigit() and int(version) > 0):
+        raise bal.MalformedBALReference(
+            f"Invalid version '{version}', must be a positive integer or"
+            f" '{bal.LATEST_VERSION_TAG}'"
+        )
+    return bal.EntityInfo(name=name, version=int(version))
+
+
+def _parse_outcome(parse, entity_ref: str):
+    """
+    Returns the EntityInfo parsed from the supplied reference, or the
+    message of the MalformedBALReference raised for it.
+    """
+    try:
+        return parse(entity_ref)
+    except bal.MalformedBALReference as exc:
+        return str(exc)
+
 
 class Test_resolve(FixtureAugmentedTestCase):
     """
@@ -157,6 +391,195 @@ class Test_resolve(FixtureAugmentedTestCase):
                 for property_, value in self.__entities[ref.toString()][trait].items():
                     self.assertEqual(result.getTraitProperty(trait, property_), value)
 
+    def test_when_result_modified_then_subsequent_results_unaffected(self):
+        entity_reference = self._manager.createEntityReference("bal:///anAsset⭐︎")
+        context = self.createTestContext(access=Context.Access.kRead)
+        results = []
+
+        for _ in range(2):
+            self._manager.resolve(
+                [entity_reference],
+                {"string"},
+                context,
+                lambda _idx, data: results.append(data),
+                lambda _, err: self.fail(f"Resolve should not error: {err.code} {err.message}"),
+            )
+            results[-1].setTraitProperty("string", "value", "modified by host")
+
+        self.assertIsNot(results[0], results[1])
+        self.assertEqual(results[1].getTraitProperty("string", "value"), "modified by host")
+
+        self._manager.resolve(
+            [entity_reference],
+            {"string"},
+            context,
+            lambda _idx, data: results.append(data),
+            lambda _, err: self.fail(f"Resolve should not error: {err.code} {err.message}"),
+        )
+
+        self.assertEqual(
+            results[-1].getTraitProperty("string", "value"), "resolved from 'anAsset⭐︎' using 📠"
+        )
+
+
+class Test_resolve_cache(FixtureAugmentedTestCase):
+    """
+    Tests the cache resolve results are held in, which is bounded by
+    result, rather than by entity, but can drop every result for an
+    entity at once.
+    """
+
+    def test_when_full_then_results_for_same_entity_evicted(self):
+        resolve_cache = cache.LRUCache(2)
+
+        for version in range(3):
+            resolve_cache.put(("anAsset⭐︎", version, frozenset()), version, group="anAsset⭐︎")
+
+        self.assertEqual(len(resolve_cache), 2)
+        self.assertNotIn(("anAsset⭐︎", 0, frozenset()), resolve_cache)
+
+    def test_when_group_popped_then_only_its_results_removed(self):
+        resolve_cache = cache.LRUCache(10)
+        resolve_cache.put(("anAsset⭐︎", 0, frozenset()), 0, group="anAsset⭐︎")
+        resolve_cache.put(("anAsset⭐︎", 1, frozenset()), 1, group="anAsset⭐︎")
+        resolve_cache.put(("another", 0, frozenset()), 2, group="another")
+
+        resolve_cache.pop_group("anAsset⭐︎")
+        resolve_cache.pop_group("missing")
+
+        self.assertEqual(len(resolve_cache), 1)
+        self.assertEqual(resolve_cache.get(("another", 0, frozenset())), 2)
+
+
+class Test_resolve_trait_projection(FixtureAugmentedTestCase):
+    """
+    Tests that only the requested traits an entity has are resolved,
+    regardless of how the library is stored.
+    """
+
+    def setUp(self):
+        self.__old_settings = self._manager.settings()
+
+    def tearDown(self):
+        self._manager.initialize(self.__old_settings)
+
+    def test_when_some_requested_traits_missing_then_only_present_traits_resolved(self):
+        expected = TraitsData()
+        expected.setTraitProperty("number", "value", 42)
+        expected.addTrait("test-data")
+
+        for storage in bal.LIBRARY_STORAGE_MODES:
+            with self.subTest(storage=storage):
+                self.__initialize(storage)
+                self.assertEqual(self.__resolve({"number", "test-data", "missing"}), expected)
+
+    def test_when_no_requested_traits_present_then_empty_result(self):
+        for storage in bal.LIBRARY_STORAGE_MODES:
+            with self.subTest(storage=storage):
+                self.__initialize(storage)
+                self.assertEqual(self.__resolve({"missing", "also missing"}), TraitsData())
+
+    def __initialize(self, storage):
+        settings = self.__old_settings.copy()
+        settings["library_storage"] = storage
+        self._manager.initialize(settings)
+
+    def __resolve(self, trait_set):
+        results = []
+        self._manager.resolve(
+            [self._manager.createEntityReference("bal:///anAsset⭐︎")],
+            trait_set,
+            self.createTestContext(access=Context.Access.kRead),
+            lambda _idx, data: results.append(data),
+            lambda _, err: self.fail(f"Resolve should not error: {err.code} {err.message}"),
+        )
+        return results[0]
+
+
+class Test_instrumentation(FixtureAugmentedTestCase):
+    """
+    Tests that metrics are collected, and exposed, only when
+    instrumentation is enabled.
+    """
+
+    __metrics_info_key = "org.openassetio.examples.manager.bal.metrics"
+
+    def setUp(self):
+        self.__old_settings = self._manager.settings()
+        new_settings = self.__old_settings.copy()
+        new_settings["instrumentation"] = True
+        self._manager.initialize(new_settings)
+
+    def tearDown(self):
+        self._manager.initialize(self.__old_settings)
+
+    def test_when_resolve_called_then_calls_elements_and_errors_recorded(self):
+        entity_references = [
+            self._manager.createEntityReference(s)
+            for s in ("bal:///anAsset⭐︎", "bal:///missing", "bal:///missing")
+        ]
+        context = self.createTestContext(access=Context.Access.kRead)
+
+        self._manager.resolve(
+            entity_references, {"string"}, context, lambda _i, _d: None, lambda _i, _e: None
+        )
+
+        metrics = json.loads(self._manager.info()[self.__metrics_info_key])
+        resolve_metrics = metrics["methods"]["resolve"]
+        self.assertEqual(resolve_metrics["calls"], 1)
+        self.assertEqual(resolve_metrics["elements"], 3)
+        self.assertEqual(resolve_metrics["errors"], {"kEntityResolutionError": 2})
+        self.assertEqual(sum(resolve_metrics["duration_histogram"]), 1)
+        self.assertGreater(metrics["library"]["entities"], 0)
+
+    def test_when_disabled_then_metrics_not_in_info(self):
+        self._manager.initialize({"instrumentation": False})
+
+        self.assertNotIn(self.__metrics_info_key, self._manager.info())
+
+
+class Test_findEntityReferences(FixtureAugmentedTestCase):
+    """
+    Tests that entities can be found by glob patterns over their names.
+    """
+
+    def setUp(self):
+        self.__host_session = HostSession(Host(_TestHost()), ConsoleLogger())
+        self.__interface = BasicAssetLibraryInterface()
+        self.__interface.initialize(self._manager.settings(), self.__host_session)
+
+    def test_when_pattern_matches_then_matching_refs_returned_in_name_order(self):
+        self.assertEqual(self.__find("an*"), ["bal:///anAsset⭐︎", "bal:///another 𝓐𝓼𝓼𝓼𝓮𝔱"])
+        self.assertEqual(self.__find("*⭐︎"), ["bal:///anAsset⭐︎"])
+        self.assertEqual(self.__find("another 𝓐𝓼𝓼𝓼𝓮𝔱"), ["bal:///another 𝓐𝓼𝓼𝓼𝓮𝔱"])
+        self.assertEqual(self.__find("anAsset"), [])
+
+    def test_when_entities_registered_then_found_by_later_queries(self):
+        self.assertEqual(self.__find("shot010/*"), [])
+
+        data = TraitsData()
+        data.setTraitProperty("string", "value", "registered")
+        self.__interface.register(
+            [
+                self._manager.createEntityReference(ref_str)
+                for ref_str in ("bal:///shot010/b", "bal:///shot010/a", "bal:///shot011/a")
+            ],
+            [data] * 3,
+            self.createTestContext(access=Context.Access.kWrite),
+            self.__host_session,
+            lambda _idx, _ref: None,
+            lambda _, err: self.fail(f"Register should not error: {err.code} {err.message}"),
+        )
+
+        self.assertEqual(self.__find("shot010/*"), ["bal:///shot010/a", "bal:///shot010/b"])
+        self.assertEqual(self.__find("shot01?/a"), ["bal:///shot010/a", "bal:///shot011/a"])
+
+    def __find(self, pattern):
+        return [
+            ref.toString()
+            for ref in self.__interface.findEntityReferences(pattern, self.__host_session)
+        ]
+
 
 class Test_preflight(FixtureAugmentedTestCase):
     def test_when_refs_valid_then_are_passed_through_unchanged(self):
@@ -181,26 +604,26 @@ class Test_preflight(FixtureAugmentedTestCase):
 
 
 class Test_register(FixtureAugmentedTestCase):
-    def test_when_ref_is_new_then_entity_created_with_same_reference(self):
+    def test_when_ref_is_new_then_entity_created_with_first_version_reference(self):
         context = self.createTestContext()
         data = TraitsData()
         data.setTraitProperty("a_trait", "a_property", 1)
         new_entity_ref = self._manager.createEntityReference(
-            "bal:///test_when_ref_is_new_then_entity_created_with_same_reference"
+            "bal:///test_when_ref_is_new_then_entity_created_with_first_version_reference"
         )
         published_entity_ref = self.__create_test_entity(new_entity_ref, data, context)
 
         context.access = Context.Access.kRead
         self.assertTrue(self._manager.entityExists([published_entity_ref], context)[0])
-        self.assertEqual(published_entity_ref, new_entity_ref)
+        self.assertEqual(published_entity_ref.toString(), f"{new_entity_ref.toString()}?v=1")
 
-    def test_when_ref_exists_then_entity_updated_with_same_reference(self):
+    def test_when_ref_exists_then_entity_updated_with_next_version_reference(self):
         context = self.createTestContext()
         data = TraitsData()
         data.setTraitProperty("a_trait", "a_property", 1)
 
         test_entity_ref = self._manager.createEntityReference(
-            "bal:///test_when_ref_exsits_then_entity_updated_with_same_reference"
+            "bal:///test_when_ref_exists_then_entity_updated_with_next_version_reference"
         )
         existing_entity_ref = self.__create_test_entity(test_entity_ref, data, context)
 
@@ -229,9 +652,94 @@ class Test_register(FixtureAugmentedTestCase):
             lambda _, err: self.fail(f"Resolve should not error: {err.code} {err.message}"),
         )
 
+        self.assertEqual(updated_refs[0].toString(), f"{test_entity_ref.toString()}?v=2")
         self.assertEqual(resolved_data[0], data)
         self.assertNotEqual(resolved_data[0], original_data)
 
+    def test_when_resolved_entity_updated_then_update_is_resolved(self):
+        context = self.createTestContext()
+        data = TraitsData()
+        data.setTraitProperty("a_trait", "a_property", 1)
+        test_entity_ref = self._manager.createEntityReference(
+            "bal:///test_when_resolved_entity_updated_then_update_is_resolved"
+        )
+        self.__create_test_entity(test_entity_ref, data, context)
+
+        resolved_data = []
+        context.access = Context.Access.kRead
+        self._manager.resolve(
+            [test_entity_ref],
+            {"a_trait"},
+            context,
+            lambda _idx, data: resolved_data.append(data),
+            lambda _, err: self.fail(f"Resolve should not error: {err.code} {err.message}"),
+        )
+
+        data.setTraitProperty("a_trait", "a_property", 2)
+        context.access = Context.Access.kWrite
+        self._manager.register(
+            [test_entity_ref],
+            [data],
+            context,
+            lambda _idx, _ref: None,
+            lambda _, err: self.fail(f"Register should not error: {err.code} {err.message}"),
+        )
+
+        context.access = Context.Access.kRead
+        self._manager.resolve(
+            [test_entity_ref],
+            {"a_trait"},
+            context,
+            lambda _idx, data: resolved_data.append(data),
+            lambda _, err: self.fail(f"Resolve should not error: {err.code} {err.message}"),
+        )
+
+        self.assertEqual(resolved_data[0].getTraitProperty("a_trait", "a_property"), 1)
+        self.assertEqual(resolved_data[1], data)
+
+    def test_when_batch_updates_entity_repeatedly_then_each_gets_successive_version(self):
+        context = self.createTestContext(access=Context.Access.kWrite)
+        entity_refs = [
+            self._manager.createEntityReference(f"bal:///test_batch_register_{name}")
+            for name in ("a", "b", "a", "a")
+        ]
+        datas = []
+        for idx in range(len(entity_refs)):
+            data = TraitsData()
+            data.setTraitProperty("a_trait", "a_property", idx)
+            datas.append(data)
+        updated_refs = [None] * len(entity_refs)
+
+        self._manager.register(
+            entity_refs,
+            datas,
+            context,
+            lambda idx, ref: operator.setitem(updated_refs, idx, ref),
+            lambda _, err: self.fail(f"Register should not error: {err.code} {err.message}"),
+        )
+
+        self.assertEqual(
+            [ref.toString() for ref in updated_refs],
+            [
+                "bal:///test_batch_register_a?v=1",
+                "bal:///test_batch_register_b?v=1",
+                "bal:///test_batch_register_a?v=2",
+                "bal:///test_batch_register_a?v=3",
+            ],
+        )
+
+        resolved_data = [None] * len(updated_refs)
+        context.access = Context.Access.kRead
+        self._manager.resolve(
+            updated_refs,
+            {"a_trait"},
+            context,
+            lambda idx, data: operator.setitem(resolved_data, idx, data),
+            lambda _, err: self.fail(f"Resolve should not error: {err.code} {err.message}"),
+        )
+
+        self.assertEqual(resolved_data, datas)
+
     def __create_test_entity(self, ref, data, context):
         """
         Creates a new entity in the library for testing.
@@ -259,3 +767,105 @@ class Test_register(FixtureAugmentedTestCase):
 
         context.access = old_access
         return published_refs[0]
+
+
+class Test_versioned_references(FixtureAugmentedTestCase):
+    """
+    Tests that specific versions of an entity can be addressed with a
+    `v` query parameter, and that old versions are discarded once the
+    retention limit is reached.
+    """
+
+    __entity_ref_str = "bal:///test_versioned_references"
+
+    def setUp(self):
+        self.__old_settings = self._manager.settings()
+        new_settings = self.__old_settings.copy()
+        new_settings["max_entity_versions"] = 2
+        self._manager.initialize(new_settings)
+
+    def tearDown(self):
+        self._manager.initialize(self.__old_settings)
+
+    def test_when_versions_registered_then_each_version_resolvable(self):
+        published_refs = [self.__register(value) for value in ("one", "two")]
+
+        self.assertEqual(
+            [ref.toString() for ref in published_refs],
+            [f"{self.__entity_ref_str}?v=1", f"{self.__entity_ref_str}?v=2"],
+        )
+        self.assertEqual(
+            self.__resolve(
+                [
+                    f"{self.__entity_ref_str}?v=1",
+                    f"{self.__entity_ref_str}?v=2",
+                    f"{self.__entity_ref_str}?v=latest",
+                    self.__entity_ref_str,
+                ]
+            ),
+            ["one", "two", "two", "two"],
+        )
+
+    def test_when_versions_exceed_retention_limit_then_oldest_discarded(self):
+        for value in ("one", "two", "three"):
+            self.__register(value)
+
+        context = self.createTestContext(access=Context.Access.kRead)
+        refs = [
+            self._manager.createEntityReference(f"{self.__entity_ref_str}?v={version}")
+            for version in (1, 2, 3, 4)
+        ]
+
+        self.assertEqual(self._manager.entityExists(refs, context), [False, True, True, False])
+        self.assertEqual(
+            self.__resolve([ref.toString() for ref in refs]),
+            [
+                f"Entity '{self.__entity_ref_str}?v=1' not found",
+                "two",
+                "three",
+                f"Entity '{self.__entity_ref_str}?v=4' not found",
+            ],
+        )
+
+    def test_when_version_invalid_then_malformed_reference_error(self):
+        self.__register("one")
+
+        self.assertEqual(
+            self.__resolve([f"{self.__entity_ref_str}?v=0", f"{self.__entity_ref_str}?v=one"]),
+            [
+                "Invalid version '0', must be a positive integer or 'latest'",
+                "Invalid version 'one', must be a positive integer or 'latest'",
+            ],
+        )
+
+    def __register(self, value):
+        context = self.createTestContext(access=Context.Access.kWrite)
+        data = TraitsData()
+        data.setTraitProperty("string", "value", value)
+        published_refs = [None]
+        self._manager.register(
+            [self._manager.createEntityReference(self.__entity_ref_str)],
+            [data],
+            context,
+            lambda idx, ref: operator.setitem(published_refs, idx, ref),
+            lambda _, err: self.fail(f"Register should not error: {err.code} {err.message}"),
+        )
+        return published_refs[0]
+
+    def __resolve(self, ref_strs):
+        """
+        Resolves the supplied references, returning the string trait's
+        value for each, or the error message if it failed.
+        """
+        context = self.createTestContext(access=Context.Access.kRead)
+        results = [None] * len(ref_strs)
+        self._manager.resolve(
+            [self._manager.createEntityReference(ref_str) for ref_str in ref_strs],
+            {"string"},
+            context,
+            lambda idx, data: operator.setitem(
+                results, idx, data.getTraitProperty("string", "value")
+            ),
+            lambda idx, err: operator.setitem(results, idx, err.message),
+        )
+        return results
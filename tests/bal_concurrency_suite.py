@@ -0,0 +1,477 @@
+#
+#   Copyright 2013-2022 The Foundry Visionmongers Ltd
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+"""
+A manager test harness test case suite that validates that the
+BasicAssetLibrary manager behaves correctly when used concurrently,
+from threads, coroutines or other processes via a BAL server.
+"""
+
+# pylint: disable=invalid-name, missing-function-docstring, missing-class-docstring
+# The suites make the same harness calls, with the same callbacks.
+# pylint: disable=duplicate-code
+
+import asyncio
+import errno
+import operator
+import os
+import shutil
+import socket
+import tempfile
+import unittest
+
+from concurrent.futures import ThreadPoolExecutor
+
+from openassetio import BatchElementError, Context, TraitsData
+from openassetio.hostApi import HostInterface
+from openassetio.log import ConsoleLogger
+from openassetio.managerApi import Host, HostSession
+from openassetio.test.manager.harness import FixtureAugmentedTestCase
+
+from openassetio_manager_bal import server
+from openassetio_manager_bal.BasicAssetLibraryInterface import BasicAssetLibraryInterface
+
+__all__ = []
+
+
+class _TestHost(HostInterface):
+    """
+    A minimal host, for tests that drive a manager interface directly.
+    """
+
+    def identifier(self):
+        return "org.openassetio.examples.manager.bal.test"
+
+    def displayName(self):
+        return "BAL Test Host"
+
+
+class Test_resolve_execution_mode_threads(FixtureAugmentedTestCase):
+    """
+    Tests that batches resolved in chunks across a thread pool are
+    reported against the correct indices.
+    """
+
+    def setUp(self):
+        self.__old_settings = self._manager.settings()
+        new_settings = self.__old_settings.copy()
+        new_settings["resolve_execution_mode"] = "threads"
+        new_settings["resolve_workers"] = 3
+        new_settings["resolve_chunk_size"] = 2
+        self._manager.initialize(new_settings)
+
+    def tearDown(self):
+        self._manager.initialize(self.__old_settings)
+
+    def test_when_batch_larger_than_chunk_size_then_results_have_original_indices(self):
+        ref_strs = ["bal:///anAsset⭐︎", "bal:///missing", "bal:///", "bal:///another 𝓐𝓼𝓼𝓼𝓮𝔱"] * 5
+        entity_references = [self._manager.createEntityReference(s) for s in ref_strs]
+        context = self.createTestContext(access=Context.Access.kRead)
+        results = [None] * len(entity_references)
+        errors = [None] * len(entity_references)
+
+        self._manager.resolve(
+            entity_references,
+            {"string"},
+            context,
+            lambda idx, data: operator.setitem(results, idx, data),
+            lambda idx, err: operator.setitem(errors, idx, err),
+        )
+
+        for idx, ref_str in enumerate(ref_strs):
+            if ref_str == "bal:///missing":
+                self.assertEqual(errors[idx].message, "Entity 'bal:///missing' not found")
+            elif ref_str == "bal:///":
+                self.assertEqual(errors[idx].message, "Missing entity name in path component")
+            else:
+                self.assertIsNone(errors[idx])
+                self.assertIn(
+                    ref_str[len("bal:///") :], results[idx].getTraitProperty("string", "value")
+                )
+
+    def test_when_batch_resolved_then_callbacks_in_order_without_lock_held(self):
+        entity_references = [self._manager.createEntityReference("bal:///anAsset⭐︎")] * 20
+        context = self.createTestContext(access=Context.Access.kRead)
+        write_context = self.createTestContext(access=Context.Access.kWrite)
+        indices = []
+
+        def on_success(idx, _data):
+            indices.append(idx)
+            if idx == 0:
+                # Would deadlock if the library were locked whilst
+                # callbacks are called.
+                self._manager.register(
+                    [self._manager.createEntityReference("bal:///registered mid-resolve")],
+                    [TraitsData({"string"})],
+                    write_context,
+                    lambda _idx, _ref: None,
+                    lambda _, err: self.fail(f"Register should not error: {err.message}"),
+                )
+
+        self._manager.resolve(
+            entity_references,
+            {"string"},
+            context,
+            on_success,
+            lambda _, err: self.fail(f"Resolve should not error: {err.message}"),
+        )
+
+        self.assertEqual(indices, list(range(len(entity_references))))
+
+
+class Test_async(FixtureAugmentedTestCase):
+    """
+    Tests the awaitable counterparts of resolve and register.
+    """
+
+    def setUp(self):
+        self.__tmp_dir = tempfile.mkdtemp()
+        self.__library_path = os.path.join(self.__tmp_dir, "library.json")
+        self.__settings = self._manager.settings()
+        shutil.copyfile(self.__settings["library_path"], self.__library_path)
+        self.__settings["library_path"] = self.__library_path
+        self.__settings["library_journal"] = True
+        self.__settings["resolve_chunk_size"] = 1
+        self.__host_session = HostSession(Host(_TestHost()), ConsoleLogger())
+        self.__interface = BasicAssetLibraryInterface()
+        self.__interface.initialize(self.__settings, self.__host_session)
+
+    def tearDown(self):
+        # Closes the journal.
+        self.__interface.initialize({"library_path": ""}, self.__host_session)
+        shutil.rmtree(self.__tmp_dir)
+
+    def test_when_resolved_async_then_results_match_resolve(self):
+        entity_references = [
+            self._manager.createEntityReference(ref_str)
+            for ref_str in ("bal:///anAsset⭐︎", "bal:///missing", "bal:///another 𝓐𝓼𝓼𝓼𝓮𝔱")
+        ]
+        context = self.createTestContext(access=Context.Access.kRead)
+        expected = self.__resolve(entity_references, context)
+
+        results = [None] * len(entity_references)
+        asyncio.run(
+            self.__interface.resolveAsync(
+                entity_references,
+                {"string"},
+                context,
+                self.__host_session,
+                lambda idx, data: operator.setitem(results, idx, data),
+                lambda idx, err: operator.setitem(results, idx, err.code),
+            )
+        )
+
+        self.assertEqual(results, expected)
+
+    def test_when_resolving_async_then_other_tasks_run_between_chunks(self):
+        entity_references = [
+            self._manager.createEntityReference(ref_str)
+            for ref_str in ("bal:///anAsset⭐︎", "bal:///another 𝓐𝓼𝓼𝓼𝓮𝔱") * 2
+        ]
+        context = self.createTestContext(access=Context.Access.kRead)
+        events = []
+
+        async def resolve():
+            await self.__interface.resolveAsync(
+                entity_references,
+                {"string"},
+                context,
+                self.__host_session,
+                lambda idx, _data: events.append(idx),
+                lambda _, err: self.fail(f"Resolve should not error: {err.code} {err.message}"),
+            )
+
+        async def tick():
+            for _ in range(len(entity_references)):
+                events.append("tick")
+                await asyncio.sleep(0)
+
+        async def run():
+            await asyncio.gather(resolve(), tick())
+
+        asyncio.run(run())
+
+        self.assertEqual(events, [0, "tick", 1, "tick", 2, "tick", 3, "tick"])
+
+    def test_when_registered_async_then_entity_journaled_and_resolvable(self):
+        entity_reference = self._manager.createEntityReference("bal:///an async 🔄")
+        data = TraitsData()
+        data.setTraitProperty("string", "value", "registered")
+        context = self.createTestContext(access=Context.Access.kWrite)
+        registered = []
+
+        asyncio.run(
+            self.__interface.registerAsync(
+                [entity_reference],
+                [data],
+                context,
+                self.__host_session,
+                lambda _idx, ref: registered.append(ref.toString()),
+                lambda _, err: self.fail(f"Register should not error: {err.code} {err.message}"),
+            )
+        )
+
+        self.assertEqual(registered, ["bal:///an async 🔄?v=1"])
+        self.assertTrue(os.path.exists(f"{self.__library_path}.journal"))
+        context.access = Context.Access.kRead
+        self.assertEqual(self.__resolve([entity_reference], context), [data])
+
+    def __resolve(self, entity_references, context):
+        results = [None] * len(entity_references)
+        self.__interface.resolve(
+            entity_references,
+            {"string"},
+            context,
+            self.__host_session,
+            lambda idx, data: operator.setitem(results, idx, data),
+            lambda idx, err: operator.setitem(results, idx, err.code),
+        )
+        return results
+
+
+class Test_concurrent_resolve_and_register(FixtureAugmentedTestCase):
+    """
+    Stress tests the manager with a mixed resolve and register load
+    from many threads at once.
+    """
+
+    __num_threads = 8
+    __num_iterations = 200
+    __num_entities = 4
+
+    def test_when_called_from_many_threads_then_all_calls_succeed(self):
+        entity_references = [
+            self._manager.createEntityReference(f"bal:///test_concurrent_{idx}")
+            for idx in range(self.__num_entities)
+        ]
+        errors = []
+        written_values = {ref.toString(): {"initial"} for ref in entity_references}
+
+        self.__register(entity_references, "initial", errors)
+
+        def run(thread_idx):
+            for iteration in range(self.__num_iterations):
+                if (thread_idx + iteration) % 4 == 0:
+                    value = f"{thread_idx}-{iteration}"
+                    ref = entity_references[iteration % self.__num_entities]
+                    written_values[ref.toString()].add(value)
+                    self.__register([ref], value, errors)
+                else:
+                    for ref, result in zip(
+                        entity_references, self.__resolve(entity_references, errors)
+                    ):
+                        if result is None:
+                            continue
+                        value = result.getTraitProperty("concurrency", "value")
+                        if value not in written_values[ref.toString()]:
+                            errors.append(f"Unexpected value '{value}' for {ref.toString()}")
+
+        with ThreadPoolExecutor(max_workers=self.__num_threads) as executor:
+            list(executor.map(run, range(self.__num_threads)))
+
+        self.assertListEqual(errors, [])
+
+    def __register(self, refs, value, errors):
+        context = self.createTestContext(access=Context.Access.kWrite)
+        data = TraitsData()
+        data.setTraitProperty("concurrency", "value", value)
+        self._manager.register(
+            refs,
+            [data] * len(refs),
+            context,
+            lambda _idx, _ref: None,
+            lambda _idx, err: errors.append(err.message),
+        )
+
+    def __resolve(self, refs, errors):
+        context = self.createTestContext(access=Context.Access.kRead)
+        results = [None] * len(refs)
+        self._manager.resolve(
+            refs,
+            {"concurrency"},
+            context,
+            lambda idx, data: operator.setitem(results, idx, data),
+            lambda _idx, err: errors.append(err.message),
+        )
+        return results
+
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "Requires Unix domain sockets")
+class _FailingRegisterServer(server.Server):
+    """
+    A server that fails to process any register request that includes
+    the "unregistrable" entity.
+    """
+
+    def dispatch(self, method: str, request: dict):
+        if method == "register" and "bal:///unregistrable" in request["refs"]:
+            raise RuntimeError("Unregistrable")
+        return super().dispatch(method, request)
+
+
+class Test_server(FixtureAugmentedTestCase):
+    """
+    Tests that managers using a BAL server behave as if they had loaded
+    its library themselves, and share its registrations.
+    """
+
+    def setUp(self):
+        self.__tmp_dir = tempfile.mkdtemp()
+        self.__socket_path = os.path.join(self.__tmp_dir, "bal.sock")
+        self.__host_session = HostSession(Host(_TestHost()), ConsoleLogger())
+        self.__server = server.Server(
+            self.__socket_path, self._manager.settings(), self.__host_session
+        )
+        self.__server.start()
+        # A chunk size of one means each element is a separate,
+        # pipelined, request.
+        client_settings = {"server_socket": self.__socket_path, "resolve_chunk_size": 1}
+        self.__clients = [BasicAssetLibraryInterface(), BasicAssetLibraryInterface()]
+        for client in self.__clients:
+            client.initialize(client_settings, self.__host_session)
+        self.__local = BasicAssetLibraryInterface()
+        self.__local.initialize(self._manager.settings(), self.__host_session)
+
+    def tearDown(self):
+        for client in self.__clients:
+            # Closes the client's connections.
+            client.initialize({"server_socket": "", "library_path": ""}, self.__host_session)
+        self.__server.shutdown()
+        shutil.rmtree(self.__tmp_dir)
+
+    def test_when_queried_then_results_match_library(self):
+        entity_references = [
+            self._manager.createEntityReference(ref_str)
+            for ref_str in ("bal:///anAsset⭐︎", "bal:///missing", "bal:///another 𝓐𝓼𝓼𝓼𝓮𝔱")
+        ]
+        context = self.createTestContext(access=Context.Access.kRead)
+        trait_sets = [{"string"}, {"string", "number"}]
+        results = []
+
+        for manager in (self.__clients[0], self.__local):
+            results.append(
+                (
+                    manager.entityExists(entity_references, context, self.__host_session),
+                    self.__resolve(manager, entity_references, context),
+                    manager.managementPolicy(trait_sets, context, self.__host_session),
+                )
+            )
+
+        self.assertEqual(results[0], results[1])
+
+    def test_when_malformed_reference_resolved_then_error_returned(self):
+        entity_reference = self._manager.createEntityReference("bal:///")
+        context = self.createTestContext(access=Context.Access.kRead)
+
+        self.assertEqual(
+            self.__resolve(self.__clients[0], [entity_reference], context),
+            [BatchElementError.ErrorCode.kMalformedEntityReference],
+        )
+
+    def test_when_entity_registered_then_resolvable_by_other_clients(self):
+        entity_references = [
+            self._manager.createEntityReference(ref_str)
+            for ref_str in ("bal:///a served 🍽", "bal:///another served 🍽")
+        ]
+        data = TraitsData()
+        data.setTraitProperty("string", "value", "registered")
+        context = self.createTestContext(access=Context.Access.kWrite)
+        registered = [None] * len(entity_references)
+
+        self.__clients[0].register(
+            entity_references,
+            [data] * len(entity_references),
+            context,
+            self.__host_session,
+            lambda idx, ref: operator.setitem(registered, idx, ref.toString()),
+            lambda _, err: self.fail(f"Register should not error: {err.code} {err.message}"),
+        )
+
+        self.assertEqual(registered, ["bal:///a served 🍽?v=1", "bal:///another served 🍽?v=1"])
+        context.access = Context.Access.kRead
+        self.assertEqual(
+            self.__resolve(self.__clients[1], entity_references, context), [data, data]
+        )
+
+    def test_when_entity_references_found_then_results_match_library(self):
+        self.assertEqual(
+            self.__clients[0].findEntityReferences("an*", self.__host_session),
+            self.__local.findEntityReferences("an*", self.__host_session),
+        )
+
+    def test_when_socket_already_served_then_second_server_raises(self):
+        with self.assertRaises(OSError) as raised:
+            server.Server(self.__socket_path, self._manager.settings(), self.__host_session)
+
+        self.assertEqual(raised.exception.errno, errno.EADDRINUSE)
+        # The running server is unaffected.
+        context = self.createTestContext(access=Context.Access.kRead)
+        entity_reference = self._manager.createEntityReference("bal:///anAsset⭐︎")
+        self.assertEqual(
+            self.__clients[0].entityExists([entity_reference], context, self.__host_session),
+            [True],
+        )
+
+    def test_when_register_request_fails_then_only_its_elements_errored(self):
+        socket_path = os.path.join(self.__tmp_dir, "failing.sock")
+        failing_server = _FailingRegisterServer(
+            socket_path, self._manager.settings(), self.__host_session
+        )
+        failing_server.start()
+        self.addCleanup(failing_server.shutdown)
+        client = BasicAssetLibraryInterface()
+        client.initialize(
+            {"server_socket": socket_path, "resolve_chunk_size": 1}, self.__host_session
+        )
+        self.addCleanup(
+            client.initialize, {"server_socket": "", "library_path": ""}, self.__host_session
+        )
+        entity_references = [
+            self._manager.createEntityReference(ref_str)
+            for ref_str in ("bal:///a served 🍽", "bal:///unregistrable", "bal:///another served 🍽")
+        ]
+        data = TraitsData()
+        data.setTraitProperty("string", "value", "registered")
+        results = [None] * len(entity_references)
+
+        client.register(
+            entity_references,
+            [data] * len(entity_references),
+            self.createTestContext(access=Context.Access.kWrite),
+            self.__host_session,
+            lambda idx, ref: operator.setitem(results, idx, ref.toString()),
+            lambda idx, err: operator.setitem(results, idx, err.code),
+        )
+
+        self.assertEqual(
+            results,
+            [
+                "bal:///a served 🍽?v=1",
+                BatchElementError.ErrorCode.kUnknown,
+                "bal:///another served 🍽?v=1",
+            ],
+        )
+
+    def __resolve(self, manager, entity_references, context):
+        results = [None] * len(entity_references)
+        manager.resolve(
+            entity_references,
+            {"string"},
+            context,
+            self.__host_session,
+            lambda idx, data: operator.setitem(results, idx, data),
+            lambda idx, err: operator.setitem(results, idx, err.code),
+        )
+        return results
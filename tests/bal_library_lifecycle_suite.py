@@ -0,0 +1,548 @@
+#
+#   Copyright 2013-2022 The Foundry Visionmongers Ltd
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+"""
+A manager test harness test case suite that validates the
+BasicAssetLibrary manager's handling of its library over time, ie.
+journaling, reloading, sharing, preloading and filtering it.
+"""
+
+# pylint: disable=invalid-name, missing-function-docstring, missing-class-docstring
+# The suites make the same harness calls, with the same callbacks.
+# pylint: disable=duplicate-code
+
+import errno
+import gc
+import json
+import operator
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest.mock
+
+from concurrent.futures import ThreadPoolExecutor
+
+from openassetio import BatchElementError, Context, TraitsData
+from openassetio.hostApi import HostInterface
+from openassetio.log import ConsoleLogger
+from openassetio.managerApi import Host, HostSession
+from openassetio.test.manager.harness import FixtureAugmentedTestCase
+
+from openassetio_manager_bal import bal, journal, registry, shards
+from openassetio_manager_bal.BasicAssetLibraryInterface import BasicAssetLibraryInterface
+
+__all__ = []
+
+
+class _TestHost(HostInterface):
+    """
+    A minimal host, for tests that drive a manager interface directly.
+    """
+
+    def identifier(self):
+        return "org.openassetio.examples.manager.bal.test"
+
+    def displayName(self):
+        return "BAL Test Host"
+
+
+class Test_library_journal(FixtureAugmentedTestCase):
+    """
+    Tests that registrations are journaled to disk, and restored when
+    the library is reloaded.
+    """
+
+    def setUp(self):
+        self.__old_settings = self._manager.settings()
+        self.__tmp_dir = tempfile.mkdtemp()
+        self.__library_path = os.path.join(self.__tmp_dir, "library.json")
+        shutil.copyfile(self.__old_settings["library_path"], self.__library_path)
+        self.__initialize()
+
+    def tearDown(self):
+        self._manager.initialize(self.__old_settings)
+        shutil.rmtree(self.__tmp_dir)
+
+    def test_when_entity_registered_then_entity_restored_on_initialize(self):
+        entity_reference = self._manager.createEntityReference("bal:///a journaled 📰")
+        data = self.__register(entity_reference, "first")
+
+        self.assertTrue(os.path.exists(f"{self.__library_path}.journal"))
+
+        self.__initialize()
+
+        self.assertEqual(self.__resolve(entity_reference), data)
+
+    def test_when_journal_compacted_then_library_file_updated(self):
+        entity_reference = self._manager.createEntityReference("bal:///anAsset⭐︎")
+        self.__register(entity_reference, "first")
+        data = self.__register(entity_reference, "second")
+
+        bal.compact_library(self.__library_path)
+
+        self.assertFalse(os.path.exists(f"{self.__library_path}.journal"))
+        with open(self.__library_path, "r", encoding="utf-8") as file:
+            library = json.load(file)
+        self.assertEqual(len(library["entities"]["anAsset⭐︎"]["versions"]), 3)
+
+        self.__initialize()
+
+        self.assertEqual(self.__resolve(entity_reference), data)
+
+    def test_when_journaling_fails_then_registration_not_restored(self):
+        entity_reference = self._manager.createEntityReference("bal:///anAsset⭐︎")
+        data = TraitsData()
+        data.setTraitProperty("string", "value", "unjournaled")
+        errors = []
+
+        with unittest.mock.patch("os.fsync", _FailingFirstCall(os.fsync)):
+            self._manager.register(
+                [entity_reference],
+                [data],
+                self.createTestContext(access=Context.Access.kWrite),
+                lambda _idx, _ref: self.fail("Register should fail"),
+                lambda idx, err: errors.append((idx, err.code)),
+            )
+        self.assertEqual(errors, [(0, BatchElementError.ErrorCode.kUnknown)])
+        data = self.__register(entity_reference, "journaled")
+
+        self.__initialize()
+
+        self.assertEqual(self.__resolve(entity_reference), data)
+        context = self.createTestContext(access=Context.Access.kRead)
+        self.assertEqual(
+            self._manager.entityExists(
+                [
+                    self._manager.createEntityReference(f"bal:///anAsset⭐︎?v={version}")
+                    for version in (2, 3)
+                ],
+                context,
+            ),
+            [True, False],
+        )
+
+    def test_when_journaling_to_a_shard_fails_then_no_shard_journaled(self):
+        library_path = os.path.join(self.__tmp_dir, "sharded")
+        shards.write_sharded_library({}, library_path, {"partition": "hash", "count": 2})
+        partition = shards.Partition({"partition": "hash", "count": 2})
+        names = ["a", "b", "c", "d"]
+        self.assertEqual({partition.shard_index(name) for name in names}, {0, 1})
+        sharded_journal = shards.ShardedJournal(library_path)
+        self.addCleanup(sharded_journal.close)
+        entries = [(name, {"string": {"value": name}}) for name in names]
+
+        # The first shard's journal is synced, the second's fails.
+        with unittest.mock.patch("os.fsync", _FailingFirstCall(os.fsync, skip=1)):
+            with self.assertRaises(OSError):
+                sharded_journal.append(entries)
+
+        self.assertEqual(self.__shard_journal_entries(library_path), [])
+
+        sharded_journal.append(entries[:1])
+
+        self.assertEqual(self.__shard_journal_entries(library_path), entries[:1])
+
+    @staticmethod
+    def __shard_journal_entries(library_path):
+        return [
+            entry
+            for index in range(2)
+            for entry in journal.read_entries(
+                journal.journal_path(shards.shard_path(library_path, index))
+            )
+        ]
+
+    def __initialize(self):
+        new_settings = self.__old_settings.copy()
+        new_settings["library_path"] = self.__library_path
+        new_settings["library_journal"] = True
+        self._manager.initialize(new_settings)
+
+    def __register(self, entity_reference, value):
+        context = self.createTestContext(access=Context.Access.kWrite)
+        data = TraitsData()
+        data.setTraitProperty("string", "value", value)
+        self._manager.register(
+            [entity_reference],
+            [data],
+            context,
+            lambda _idx, _ref: None,
+            lambda _, err: self.fail(f"Register should not error: {err.code} {err.message}"),
+        )
+        return data
+
+    def __resolve(self, entity_reference):
+        context = self.createTestContext(access=Context.Access.kRead)
+        results = [None]
+        self._manager.resolve(
+            [entity_reference],
+            {"string"},
+            context,
+            lambda idx, data: operator.setitem(results, idx, data),
+            lambda _, err: self.fail(f"Resolve should not error: {err.code} {err.message}"),
+        )
+        return results[0]
+
+
+class _FailingFirstCall:  # pylint: disable=too-few-public-methods
+    """
+    Wraps a function such that the first call after `skip` calls
+    raises an OSError, rather than calling it.
+    """
+
+    def __init__(self, func, skip=0):
+        self.__func = func
+        self.__skip = skip
+        self.__failed = False
+
+    def __call__(self, *args):
+        if self.__skip:
+            self.__skip -= 1
+        elif not self.__failed:
+            self.__failed = True
+            raise OSError(errno.EIO, "Injected failure")
+        return self.__func(*args)
+
+
+class Test_library_reload(FixtureAugmentedTestCase):
+    """
+    Tests that changes to the library file are picked up without
+    re-initializing the manager.
+    """
+
+    __timeout_s = 10
+
+    def setUp(self):
+        self.__old_settings = self._manager.settings()
+        self.__tmp_dir = tempfile.mkdtemp()
+        self.__library_path = os.path.join(self.__tmp_dir, "library.json")
+        with open(self.__old_settings["library_path"], "r", encoding="utf-8") as file:
+            self.__library = json.load(file)
+        self.__write_library()
+        new_settings = self.__old_settings.copy()
+        new_settings["library_path"] = self.__library_path
+        new_settings["library_reload_interval"] = 0.01
+        self._manager.initialize(new_settings)
+
+    def tearDown(self):
+        self._manager.initialize(self.__old_settings)
+        shutil.rmtree(self.__tmp_dir)
+
+    def test_when_library_file_changed_then_changes_resolved(self):
+        self.assertEqual(self.__resolve("anAsset⭐︎"), "resolved from 'anAsset⭐︎' using 📠")
+
+        self.__library["entities"]["anAsset⭐︎"]["versions"].append(
+            {"traits": {"string": {"value": "reloaded"}}}
+        )
+        del self.__library["entities"]["another 𝓐𝓼𝓼𝓼𝓮𝔱"]
+        self.__write_library()
+
+        self.__wait_for(lambda: self.__resolve("anAsset⭐︎") == "reloaded")
+        self.assertFalse(self.__exists("another 𝓐𝓼𝓼𝓼𝓮𝔱"))
+
+    def test_when_management_policy_changed_then_new_policy_returned(self):
+        context = self.createTestContext(access=Context.Access.kRead)
+        trait_sets = [{"string"}, {"an", "excepted", "trait", "set"}]
+        self.assertEqual(
+            self._manager.managementPolicy(trait_sets, context),
+            [TraitsData({"openassetio.Managed"}), TraitsData({"openassetio.Managed"})],
+        )
+
+        self.__library["managementPolicy"] = {
+            "read": {
+                "default": {},
+                "exceptions": [
+                    {"traitSet": sorted(trait_sets[1]), "policy": {"openassetio.Managed": {}}}
+                ],
+            }
+        }
+        self.__write_library()
+
+        self.__wait_for(
+            lambda: self._manager.managementPolicy(trait_sets, context)
+            == [TraitsData(), TraitsData({"openassetio.Managed"})]
+        )
+
+    def test_when_manager_deleted_then_reload_thread_stopped_and_library_released(self):
+        settings = self._manager.settings()
+        settings["library_sharing"] = True
+        num_shared_libraries = registry.num_shared_libraries()
+        other_threads = set(threading.enumerate())
+        manager = BasicAssetLibraryInterface()
+        manager.initialize(settings, HostSession(Host(_TestHost()), ConsoleLogger()))
+        (reload_thread,) = set(threading.enumerate()) - other_threads
+
+        del manager
+        gc.collect()
+
+        reload_thread.join(self.__timeout_s)
+        self.assertFalse(reload_thread.is_alive())
+        self.assertEqual(registry.num_shared_libraries(), num_shared_libraries)
+
+    def test_when_library_file_changed_then_registered_entities_retained(self):
+        context = self.createTestContext(access=Context.Access.kWrite)
+        data = TraitsData()
+        data.setTraitProperty("string", "value", "registered")
+        self._manager.register(
+            [self._manager.createEntityReference("bal:///anAsset⭐︎")],
+            [data],
+            context,
+            lambda _idx, _ref: None,
+            lambda _, err: self.fail(f"Register should not error: {err.code} {err.message}"),
+        )
+
+        self.__library["entities"]["a new entity"] = {
+            "versions": [{"traits": {"string": {"value": "new"}}}]
+        }
+        self.__write_library()
+
+        self.__wait_for(lambda: self.__exists("a new entity"))
+        self.assertEqual(self.__resolve("anAsset⭐︎"), "registered")
+
+    def test_when_lazy_library_file_rewritten_in_place_then_changes_resolved(self):
+        new_settings = self._manager.settings()
+        new_settings["library_load_mode"] = "lazy"
+        self._manager.initialize(new_settings)
+        self.assertEqual(self.__resolve("anAsset⭐︎"), "resolved from 'anAsset⭐︎' using 📠")
+
+        # The same length, such that the entity is at the same offset,
+        # so any view of the old content still backed by the file would
+        # be indistinguishable from the new content.
+        self.__library["entities"]["anAsset⭐︎"]["versions"][0]["traits"]["string"][
+            "value"
+        ] = "rewritten now 'anAsset⭐︎' using 📠"
+        with open(self.__library_path, "w", encoding="utf-8") as file:
+            json.dump(self.__library, file)
+        self.__wait_for(
+            lambda: self.__resolve("anAsset⭐︎") == "rewritten now 'anAsset⭐︎' using 📠"
+        )
+
+    def __write_library(self):
+        # Written alongside and moved into place, as an editor or
+        # publishing tool would, so a reload never sees a partial file.
+        tmp_path = f"{self.__library_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(self.__library, file)
+        os.replace(tmp_path, self.__library_path)
+
+    def __wait_for(self, predicate):
+        deadline = time.monotonic() + self.__timeout_s
+        while not predicate():
+            if time.monotonic() > deadline:
+                self.fail("Timed out waiting for the library to reload")
+            time.sleep(0.01)
+
+    def __exists(self, name):
+        context = self.createTestContext(access=Context.Access.kRead)
+        return self._manager.entityExists(
+            [self._manager.createEntityReference(f"bal:///{name}")], context
+        )[0]
+
+    def __resolve(self, name):
+        context = self.createTestContext(access=Context.Access.kRead)
+        results = [None]
+        self._manager.resolve(
+            [self._manager.createEntityReference(f"bal:///{name}")],
+            {"string"},
+            context,
+            lambda idx, data: operator.setitem(
+                results, idx, data.getTraitProperty("string", "value")
+            ),
+            lambda idx, err: operator.setitem(results, idx, err.message),
+        )
+        return results[0]
+
+
+class Test_library_sharing(FixtureAugmentedTestCase):
+    """
+    Tests that manager instances using the same library file share a
+    single loaded copy of it, without seeing each other's
+    registrations.
+    """
+
+    def setUp(self):
+        self.__old_settings = self._manager.settings()
+        self.__settings = self.__old_settings.copy()
+        self.__settings["library_sharing"] = True
+        self.__host_session = HostSession(Host(_TestHost()), ConsoleLogger())
+        self.__num_shared_libraries = registry.num_shared_libraries()
+        self._manager.initialize(self.__settings)
+
+    def tearDown(self):
+        self._manager.initialize(self.__old_settings)
+
+    def test_when_instances_use_same_library_then_library_shared(self):
+        other = BasicAssetLibraryInterface()
+        other.initialize(self.__settings, self.__host_session)
+
+        self.assertEqual(registry.num_shared_libraries(), self.__num_shared_libraries + 1)
+
+        del other
+        self._manager.initialize(self.__old_settings)
+
+        self.assertEqual(registry.num_shared_libraries(), self.__num_shared_libraries)
+
+    def test_when_library_loading_then_other_libraries_acquirable(self):
+        loading = threading.Event()
+        may_finish = threading.Event()
+        finished = threading.Event()
+
+        def load_slowly():
+            loading.set()
+            may_finish.wait(10)
+            finished.set()
+            return {}
+
+        library_path = self.__settings["library_path"]
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            slow = executor.submit(registry.acquire, library_path, ("slow",), load_slowly)
+            self.assertTrue(loading.wait(10))
+            try:
+                _, release = registry.acquire(library_path, ("fast",), dict)
+                release()
+                self.assertFalse(finished.is_set())
+            finally:
+                may_finish.set()
+            _, release = slow.result()
+            release()
+
+        self.assertEqual(registry.num_shared_libraries(), self.__num_shared_libraries + 1)
+
+    def test_when_entity_registered_then_not_visible_to_other_instances(self):
+        other = BasicAssetLibraryInterface()
+        other.initialize(self.__settings, self.__host_session)
+        entity_reference = self._manager.createEntityReference("bal:///a shared entity")
+        data = TraitsData()
+        data.setTraitProperty("string", "value", "registered")
+
+        self._manager.register(
+            [entity_reference],
+            [data],
+            self.createTestContext(access=Context.Access.kWrite),
+            lambda _idx, _ref: None,
+            lambda _, err: self.fail(f"Register should not error: {err.code} {err.message}"),
+        )
+
+        context = self.createTestContext(access=Context.Access.kRead)
+        self.assertTrue(self._manager.entityExists([entity_reference], context)[0])
+        self.assertFalse(other.entityExists([entity_reference], context, self.__host_session)[0])
+
+
+class Test_library_preload(FixtureAugmentedTestCase):
+    """
+    Tests that a library loaded in the background is used once ready,
+    and that any failure to load it is reported by the first query.
+    """
+
+    def setUp(self):
+        self.__old_settings = self._manager.settings()
+        self.__settings = self.__old_settings.copy()
+        self.__settings["library_preload"] = True
+
+    def tearDown(self):
+        self._manager.initialize(self.__old_settings)
+
+    def test_when_preloaded_then_entities_resolvable(self):
+        self._manager.initialize(self.__settings)
+        context = self.createTestContext(access=Context.Access.kRead)
+        entity_reference = self._manager.createEntityReference("bal:///anAsset⭐︎")
+        results = [None]
+
+        self._manager.resolve(
+            [entity_reference],
+            {"string"},
+            context,
+            lambda idx, data: operator.setitem(results, idx, data),
+            lambda _, err: self.fail(f"Resolve should not error: {err.code} {err.message}"),
+        )
+
+        self.assertEqual(
+            results[0].getTraitProperty("string", "value"), "resolved from 'anAsset⭐︎' using 📠"
+        )
+
+    def test_when_library_missing_then_first_query_raises(self):
+        self.__settings["library_path"] = os.path.join(tempfile.gettempdir(), "missing 📚.json")
+        self._manager.initialize(self.__settings)
+        context = self.createTestContext(access=Context.Access.kRead)
+        entity_reference = self._manager.createEntityReference("bal:///anAsset⭐︎")
+
+        with self.assertRaises(Exception):
+            self._manager.entityExists([entity_reference], context)
+
+
+class Test_name_filter(FixtureAugmentedTestCase):
+    """
+    Tests that enabling the name filter does not change which entities
+    exist, including those registered after the library is loaded, and
+    that the filter's size is reported.
+    """
+
+    def setUp(self):
+        self.__old_settings = self._manager.settings()
+        new_settings = self.__old_settings.copy()
+        new_settings["name_filter"] = True
+        new_settings["library_load_mode"] = "lazy"
+        new_settings["instrumentation"] = True
+        self._manager.initialize(new_settings)
+
+    def tearDown(self):
+        self._manager.initialize(self.__old_settings)
+
+    def test_when_entities_queried_then_existence_matches_library(self):
+        entity_references = [
+            self._manager.createEntityReference(ref_str)
+            for ref_str in ("bal:///anAsset⭐︎", "bal:///missing", "bal:///another 𝓐𝓼𝓼𝓼𝓮𝔱?v=1")
+        ]
+        context = self.createTestContext(access=Context.Access.kRead)
+        errors = []
+
+        self._manager.resolve(
+            entity_references,
+            {"string"},
+            context,
+            lambda _idx, _data: None,
+            lambda idx, err: errors.append((idx, err.code)),
+        )
+
+        self.assertEqual(
+            self._manager.entityExists(entity_references, context), [True, False, True]
+        )
+        self.assertEqual(errors, [(1, BatchElementError.ErrorCode.kEntityResolutionError)])
+
+    def test_when_entity_registered_then_exists(self):
+        entity_reference = self._manager.createEntityReference("bal:///a filtered entity 🔎")
+        context = self.createTestContext(access=Context.Access.kRead)
+        self.assertFalse(self._manager.entityExists([entity_reference], context)[0])
+        data = TraitsData()
+        data.setTraitProperty("string", "value", "registered")
+
+        self._manager.register(
+            [entity_reference],
+            [data],
+            self.createTestContext(access=Context.Access.kWrite),
+            lambda _idx, _ref: None,
+            lambda _, err: self.fail(f"Register should not error: {err.code} {err.message}"),
+        )
+
+        self.assertTrue(self._manager.entityExists([entity_reference], context)[0])
+
+    def test_when_instrumented_then_filter_size_reported(self):
+        metrics = json.loads(self._manager.info()["org.openassetio.examples.manager.bal.metrics"])
+
+        self.assertEqual(metrics["name_filter"]["names"], 2)
+        self.assertGreater(metrics["name_filter"]["bytes"], 0)
+        self.assertEqual(metrics["name_filter"]["false_positive_rate"], 0.01)
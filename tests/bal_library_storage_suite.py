@@ -0,0 +1,626 @@
+#
+#   Copyright 2013-2022 The Foundry Visionmongers Ltd
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+"""
+A manager test harness test case suite that validates that the
+BasicAssetLibrary manager behaves the same regardless of how its
+library is loaded and stored.
+"""
+
+# pylint: disable=invalid-name, missing-function-docstring, missing-class-docstring
+# The suites make the same harness calls, with the same callbacks.
+# pylint: disable=duplicate-code
+
+import json
+import operator
+import os
+import shutil
+import tempfile
+
+from openassetio import Context, TraitsData
+from openassetio.test.manager.harness import FixtureAugmentedTestCase
+
+from openassetio_manager_bal import bal, compact, journal, shards, validation
+
+__all__ = []
+
+
+class Test_library_load_mode_lazy(FixtureAugmentedTestCase):
+    """
+    Tests that a library loaded in "lazy" mode behaves the same as one
+    loaded eagerly.
+    """
+
+    def setUp(self):
+        self.__old_settings = self._manager.settings()
+        new_settings = self.__old_settings.copy()
+        new_settings["library_load_mode"] = "lazy"
+        new_settings["lazy_entity_cache_size"] = 1
+        self._manager.initialize(new_settings)
+        self.__tmp_dir = tempfile.mkdtemp()
+        self.__library_path = os.path.join(self.__tmp_dir, "library.json")
+
+    def tearDown(self):
+        self._manager.initialize(self.__old_settings)
+        shutil.rmtree(self.__tmp_dir)
+
+    def test_when_entities_queried_then_existence_matches_library(self):
+        context = self.createTestContext(access=Context.Access.kRead)
+        entity_references = [
+            self._manager.createEntityReference(ref_str)
+            for ref_str in ("bal:///anAsset⭐︎", "bal:///another 𝓐𝓼𝓼𝓼𝓮𝔱", "bal:///missing")
+        ]
+
+        actual = self._manager.entityExists(entity_references, context)
+
+        self.assertListEqual(actual, [True, True, False])
+
+    def test_when_entities_resolved_then_values_match_library(self):
+        context = self.createTestContext(access=Context.Access.kRead)
+        entity_references = [
+            self._manager.createEntityReference(ref_str)
+            for ref_str in ("bal:///anAsset⭐︎", "bal:///another 𝓐𝓼𝓼𝓼𝓮𝔱", "bal:///anAsset⭐︎")
+        ]
+        results = [None] * len(entity_references)
+
+        self._manager.resolve(
+            entity_references,
+            {"string"},
+            context,
+            lambda idx, data: operator.setitem(results, idx, data),
+            lambda _, err: self.fail(f"Resolve should not error: {err.code} {err.message}"),
+        )
+
+        self.assertEqual(
+            [result.getTraitProperty("string", "value") for result in results],
+            [
+                "resolved from 'anAsset⭐︎' using 📠",
+                "resolved from 'another 𝓐𝓼𝓼𝓼𝓮𝔱' with a 📟",
+                "resolved from 'anAsset⭐︎' using 📠",
+            ],
+        )
+
+    def test_when_entity_registered_then_update_is_resolved(self):
+        context = self.createTestContext(access=Context.Access.kWrite)
+        entity_reference = self._manager.createEntityReference("bal:///anAsset⭐︎")
+        data = TraitsData()
+        data.setTraitProperty("string", "value", "updated")
+
+        self._manager.register(
+            [entity_reference],
+            [data],
+            context,
+            lambda _idx, _ref: None,
+            lambda _, err: self.fail(f"Register should not error: {err.code} {err.message}"),
+        )
+
+        resolved_data = [None]
+        context.access = Context.Access.kRead
+        self._manager.resolve(
+            [entity_reference],
+            {"string"},
+            context,
+            lambda idx, data: operator.setitem(resolved_data, idx, data),
+            lambda _, err: self.fail(f"Resolve should not error: {err.code} {err.message}"),
+        )
+
+        self.assertEqual(resolved_data[0], data)
+
+    def test_when_file_rewritten_in_place_then_new_content_read(self):
+        self.__write_library(self.__library_path, {"a": "original", "b": "original"})
+        library = bal.load_library(self.__library_path, load_mode="lazy")
+        self.assertEqual(self.__value(library, "a"), "original")
+
+        # Shorter, such that reading the old offsets would fault.
+        self.__write_library(self.__library_path, {"a": "new"})
+
+        self.assertNotIn("b", library["entities"])
+        self.assertEqual(self.__value(library, "a"), "new")
+
+    def test_when_file_rewritten_in_place_then_every_entity_changed(self):
+        values = {"a": "original", "b": "original", "c": "unchanged"}
+        self.__write_library(self.__library_path, values)
+        old = bal.load_library(self.__library_path, load_mode="lazy")
+
+        # The same length, such that the old index finds the same bytes
+        # for "b" and "c" in the new content. Their content before the
+        # rewrite is unknown, so they are reported as changed.
+        self.__write_library(self.__library_path, {**values, "a": "replaced"})
+        # As the rewrite may be within the file system's timestamp
+        # resolution of the original.
+        stat = os.stat(self.__library_path)
+        os.utime(self.__library_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        new = bal.load_library(self.__library_path, load_mode="lazy")
+
+        self.assertEqual(bal.diff_libraries(old, new).entities, {"a", "b", "c"})
+
+    def test_when_file_replaced_then_original_content_read(self):
+        self.__write_library(self.__library_path, {"a": "original", "b": "unchanged"})
+        old = bal.load_library(self.__library_path, load_mode="lazy")
+
+        replacement_path = os.path.join(self.__tmp_dir, "replacement.json")
+        self.__write_library(replacement_path, {"a": "new", "b": "unchanged"})
+        os.replace(replacement_path, self.__library_path)
+        new = bal.load_library(self.__library_path, load_mode="lazy")
+
+        self.assertEqual(self.__value(old, "a"), "original")
+        self.assertEqual(bal.diff_libraries(old, new).entities, {"a"})
+
+    @staticmethod
+    def __write_library(path, values):
+        library = {
+            "entities": {
+                name: {"versions": [{"traits": {"string": {"value": value}}}]}
+                for name, value in values.items()
+            }
+        }
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(library, file)
+
+    @staticmethod
+    def __value(library, name):
+        return library["entities"][name]["versions"][0]["traits"]["string"]["value"]
+
+
+class Test_library_storage_compact(FixtureAugmentedTestCase):
+    """
+    Tests that a library held in "compact" storage behaves the same as
+    one held as dicts.
+    """
+
+    def setUp(self):
+        self.__old_settings = self._manager.settings()
+        new_settings = self.__old_settings.copy()
+        new_settings["library_storage"] = "compact"
+        self._manager.initialize(new_settings)
+
+    def tearDown(self):
+        self._manager.initialize(self.__old_settings)
+
+    def test_when_entities_resolved_then_values_match_library(self):
+        context = self.createTestContext(access=Context.Access.kRead)
+        entity_references = [
+            self._manager.createEntityReference(ref_str)
+            for ref_str in ("bal:///anAsset⭐︎", "bal:///another 𝓐𝓼𝓼𝓼𝓮𝔱")
+        ]
+        results = [None] * len(entity_references)
+
+        self._manager.resolve(
+            entity_references,
+            {"string", "number"},
+            context,
+            lambda idx, data: operator.setitem(results, idx, data),
+            lambda _, err: self.fail(f"Resolve should not error: {err.code} {err.message}"),
+        )
+
+        self.assertEqual(
+            results[0].getTraitProperty("string", "value"), "resolved from 'anAsset⭐︎' using 📠"
+        )
+        self.assertEqual(results[0].getTraitProperty("number", "value"), 42)
+        self.assertEqual(
+            results[1].getTraitProperty("string", "value"),
+            "resolved from 'another 𝓐𝓼𝓼𝓼𝓮𝔱' with a 📟",
+        )
+
+    def test_when_entity_registered_then_new_and_old_versions_resolvable(self):
+        context = self.createTestContext(access=Context.Access.kWrite)
+        entity_reference = self._manager.createEntityReference("bal:///anAsset⭐︎")
+        data = TraitsData()
+        data.setTraitProperty("string", "value", "updated")
+
+        self._manager.register(
+            [entity_reference],
+            [data],
+            context,
+            lambda _idx, _ref: None,
+            lambda _, err: self.fail(f"Register should not error: {err.code} {err.message}"),
+        )
+
+        results = [None, None]
+        context.access = Context.Access.kRead
+        self._manager.resolve(
+            [entity_reference, self._manager.createEntityReference("bal:///anAsset⭐︎?v=1")],
+            {"string"},
+            context,
+            lambda idx, data: operator.setitem(results, idx, data),
+            lambda _, err: self.fail(f"Resolve should not error: {err.code} {err.message}"),
+        )
+
+        self.assertEqual(results[0], data)
+        self.assertEqual(
+            results[1].getTraitProperty("string", "value"), "resolved from 'anAsset⭐︎' using 📠"
+        )
+
+
+class Test_trait_blocks(FixtureAugmentedTestCase):
+    """
+    Tests that identical trait properties are shared between versions
+    and entities, without conflating values of different types.
+    """
+
+    def setUp(self):
+        self.__old_settings = self._manager.settings()
+        self.__tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        self._manager.initialize(self.__old_settings)
+        shutil.rmtree(self.__tmp_dir)
+
+    def test_when_compacted_then_identical_properties_share_a_block(self):
+        entities = compact.compact_entities(
+            {
+                "a": {"versions": [{"traits": {"t": {"v": 1}}}, {"traits": {"t": {"v": 1}}}]},
+                "b": {"versions": [{"traits": {"t": {"v": 1}, "u": {}}}]},
+                "c": {"versions": [{"traits": {"t": {"v": True}}}]},
+            }
+        )
+
+        def block(name, index=0):
+            return entities[name]["versions"][index].project_blocks({"t"})[0]
+
+        self.assertIs(block("a", 0), block("a", 1))
+        self.assertIs(block("a", 0), block("b"))
+        self.assertIsNot(block("a", 0), block("c"))
+        self.assertIs(type(entities["c"]["versions"][0]["traits"]["t"]["v"]), bool)
+
+    def test_when_registered_then_unchanged_properties_shared_with_previous_version(self):
+        library = {"entities": {}}
+
+        bal.create_or_update_entities(
+            [bal.EntityInfo("a")] * 3,
+            [{"t": {"v": 1}, "u": {"v": 1}}, {"t": {"v": 1}, "u": {"v": 2}}, {"t": {"v": True}}],
+            library,
+        )
+
+        versions = library["entities"]["a"]["versions"]
+        self.assertIs(versions[0]["traits"]["t"], versions[1]["traits"]["t"])
+        self.assertEqual(versions[1]["traits"]["u"], {"v": 2})
+        self.assertIs(type(versions[2]["traits"]["t"]["v"]), bool)
+
+    def test_when_resolved_from_shared_blocks_then_values_keep_their_types(self):
+        library_path = os.path.join(self.__tmp_dir, "library.json")
+        with open(library_path, "w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    "entities": {
+                        name: {"versions": [{"traits": {"number": {"value": value}}}]}
+                        for name, value in (("int", 1), ("bool", True), ("another int", 1))
+                    }
+                },
+                file,
+            )
+        new_settings = self.__old_settings.copy()
+        new_settings["library_path"] = library_path
+        new_settings["library_storage"] = "compact"
+        self._manager.initialize(new_settings)
+
+        results = [None] * 3
+        self._manager.resolve(
+            [
+                self._manager.createEntityReference(f"bal:///{name}")
+                for name in ("int", "bool", "another int")
+            ],
+            {"number"},
+            self.createTestContext(access=Context.Access.kRead),
+            lambda idx, data: operator.setitem(results, idx, data),
+            lambda _, err: self.fail(f"Resolve should not error: {err.code} {err.message}"),
+        )
+
+        self.assertEqual(
+            [type(result.getTraitProperty("number", "value")) for result in results],
+            [int, bool, int],
+        )
+
+
+class Test_library_snapshot(FixtureAugmentedTestCase):
+    """
+    Tests that compiled library snapshots are created and used when
+    requested.
+    """
+
+    def setUp(self):
+        self.__old_settings = self._manager.settings()
+        self.__tmp_dir = tempfile.mkdtemp()
+        self.__library_path = os.path.join(self.__tmp_dir, "library.json")
+        shutil.copyfile(self.__old_settings["library_path"], self.__library_path)
+
+    def tearDown(self):
+        self._manager.initialize(self.__old_settings)
+        shutil.rmtree(self.__tmp_dir)
+
+    def test_when_snapshot_mode_is_use_and_no_snapshot_then_snapshot_not_created(self):
+        self.__initialize("use")
+
+        self.assertFalse(os.path.exists(f"{self.__library_path}.snapshot"))
+        self.assertEqual(
+            self.__resolve_string("bal:///anAsset⭐︎"), "resolved from 'anAsset⭐︎' using 📠"
+        )
+
+    def test_when_snapshot_mode_is_update_then_snapshot_created_and_used(self):
+        self.__initialize("update")
+
+        self.assertTrue(os.path.exists(f"{self.__library_path}.snapshot"))
+        self.assertEqual(
+            self.__resolve_string("bal:///anAsset⭐︎"), "resolved from 'anAsset⭐︎' using 📠"
+        )
+
+        # Replace the library with an older, empty one. As the snapshot
+        # is newer, it should still be used.
+        with open(self.__library_path, "w", encoding="utf-8") as file:
+            file.write("{}")
+        os.utime(self.__library_path, (0, 0))
+        self.__initialize("use")
+
+        self.assertEqual(
+            self.__resolve_string("bal:///anAsset⭐︎"), "resolved from 'anAsset⭐︎' using 📠"
+        )
+
+    def __initialize(self, snapshot_mode):
+        new_settings = self.__old_settings.copy()
+        new_settings["library_path"] = self.__library_path
+        new_settings["library_snapshot"] = snapshot_mode
+        self._manager.initialize(new_settings)
+
+    def __resolve_string(self, ref_str):
+        context = self.createTestContext(access=Context.Access.kRead)
+        results = [None]
+        self._manager.resolve(
+            [self._manager.createEntityReference(ref_str)],
+            {"string"},
+            context,
+            lambda idx, data: operator.setitem(results, idx, data),
+            lambda _, err: self.fail(f"Resolve should not error: {err.code} {err.message}"),
+        )
+        return results[0].getTraitProperty("string", "value")
+
+
+class Test_library_shards(FixtureAugmentedTestCase):
+    """
+    Tests that a library split across a directory of shards behaves as
+    the library it was split from, loading only the shards it needs,
+    and journaling registrations to the affected shard only.
+    """
+
+    def setUp(self):
+        self.__old_settings = self._manager.settings()
+        self.__tmp_dir = tempfile.mkdtemp()
+        self.__library_path = os.path.join(self.__tmp_dir, "library")
+        shards.write_sharded_library(
+            bal.load_library(self.__old_settings["library_path"]),
+            self.__library_path,
+            {"partition": "hash", "count": 4},
+        )
+
+    def tearDown(self):
+        self._manager.initialize(self.__old_settings)
+        shutil.rmtree(self.__tmp_dir)
+
+    def test_when_entity_accessed_lazily_then_only_its_shard_is_loaded(self):
+        library = bal.load_library(self.__library_path, load_mode="lazy")
+
+        self.assertIn("anAsset⭐︎", library["entities"])
+        self.assertEqual(library["entities"].num_loaded_shards, 1)
+
+    def test_when_resolved_then_results_match_unsharded_library(self):
+        entity_reference = self._manager.createEntityReference("bal:///anAsset⭐︎")
+        expected = self.__resolve(entity_reference)
+
+        for load_mode in bal.LIBRARY_LOAD_MODES:
+            with self.subTest(load_mode=load_mode):
+                self.__initialize(library_load_mode=load_mode)
+                self.assertEqual(self.__resolve(entity_reference), expected)
+
+    def test_when_entity_registered_then_only_its_shard_is_journaled(self):
+        self.__initialize(library_journal=True)
+        entity_reference = self._manager.createEntityReference("bal:///a sharded 📰")
+        data = TraitsData()
+        data.setTraitProperty("string", "value", "sharded")
+        self._manager.register(
+            [entity_reference],
+            [data],
+            self.createTestContext(access=Context.Access.kWrite),
+            lambda _idx, _ref: None,
+            lambda _, err: self.fail(f"Register should not error: {err.code} {err.message}"),
+        )
+
+        journals = [name for name in os.listdir(self.__library_path) if name.endswith(".journal")]
+        self.assertEqual(len(journals), 1)
+
+        self.__initialize(library_journal=True)
+        self.assertEqual(self.__resolve(entity_reference), data)
+
+        bal.compact_library(self.__library_path)
+        self.assertFalse(
+            any(name.endswith(".journal") for name in os.listdir(self.__library_path))
+        )
+        self.__initialize()
+        self.assertEqual(self.__resolve(entity_reference), data)
+
+    def test_when_written_then_manifest_has_no_entities(self):
+        manifest = shards.read_manifest(self.__library_path)
+
+        self.assertNotIn("entities", manifest)
+        self.assertEqual(manifest["shards"], {"partition": "hash", "count": 4})
+
+    def test_when_registration_journaled_then_library_signature_unchanged(self):
+        # Otherwise a reload would be triggered by every registration.
+        self.__initialize(library_load_mode="lazy", library_journal=True)
+        signature = bal.library_signature(self.__library_path)
+
+        self._manager.register(
+            [self._manager.createEntityReference("bal:///a journaled 📰")],
+            [TraitsData({"string"})],
+            self.createTestContext(access=Context.Access.kWrite),
+            lambda _idx, _ref: None,
+            lambda _, err: self.fail(f"Register should not error: {err.code} {err.message}"),
+        )
+
+        self.assertEqual(bal.library_signature(self.__library_path), signature)
+
+    def test_when_registered_to_unloaded_shard_then_single_version_added(self):
+        self.__initialize(library_load_mode="lazy", library_journal=True)
+        data = TraitsData()
+        data.setTraitProperty("string", "value", "sharded")
+        results = [None]
+
+        self._manager.register(
+            [self._manager.createEntityReference("bal:///anAsset⭐︎")],
+            [data],
+            self.createTestContext(access=Context.Access.kWrite),
+            lambda idx, ref: operator.setitem(results, idx, ref.toString()),
+            lambda _, err: self.fail(f"Register should not error: {err.code} {err.message}"),
+        )
+
+        self.assertEqual(results, ["bal:///anAsset⭐︎?v=2"])
+
+    def test_when_diffed_then_only_changed_loaded_shards_are_compared(self):
+        # A shard that is loaded and unchanged, one that is loaded and
+        # changed, one that is changed but never loaded, and one that
+        # is never touched.
+        names = ("a/asset", "b/asset", "c/asset", "other")
+        library_path = self.__write_prefix_sharded(names)
+        old = bal.load_library(library_path, load_mode="lazy")
+        self.assertIn("a/asset", old["entities"])
+        self.assertIn("b/asset", old["entities"])
+
+        self.__add_version(library_path, 1, "b/asset")
+        self.__add_version(library_path, 2, "c/asset")
+        new = bal.load_library(library_path, load_mode="lazy")
+
+        self.assertEqual(bal.diff_libraries(old, new).entities, {"b/asset"})
+        self.assertEqual(old["entities"].num_loaded_shards, 2)
+        self.assertEqual(new["entities"].num_loaded_shards, 1)
+
+    def test_when_shard_journaled_then_shard_compared(self):
+        library_path = self.__write_prefix_sharded(("a/asset", "b/asset"))
+        old = bal.load_library(library_path, load_mode="lazy")
+        self.assertIn("a/asset", old["entities"])
+
+        shard_journal = bal.open_journal(library_path)
+        shard_journal.append([("a/asset", {"string": {"value": "journaled"}})])
+        shard_journal.close()
+        new = bal.load_library(library_path, load_mode="lazy")
+
+        self.assertEqual(bal.diff_libraries(old, new).entities, {"a/asset"})
+
+    def test_when_partition_changed_then_loaded_shards_compared(self):
+        names = ("a/asset", "b/asset", "c/asset")
+        library_path = self.__write_prefix_sharded(names)
+        old = bal.load_library(library_path, load_mode="lazy")
+        self.assertIn("a/asset", old["entities"])
+
+        library = bal.load_library(library_path)
+        library["entities"]["a/asset"]["versions"].append({"traits": {}})
+        library["entities"]["c/asset"]["versions"].append({"traits": {}})
+        library["entities"]["a/new"] = {"versions": [{"traits": {}}]}
+        shutil.rmtree(library_path)
+        shards.write_sharded_library(library, library_path, {"partition": "hash", "count": 2})
+        new = bal.load_library(library_path, load_mode="lazy")
+
+        self.assertEqual(bal.diff_libraries(old, new).entities, {"a/asset", "a/new"})
+
+    def __write_prefix_sharded(self, names):
+        library_path = os.path.join(self.__tmp_dir, "prefixed")
+        shards.write_sharded_library(
+            {"entities": {name: {"versions": [{"traits": {}}]} for name in names}},
+            library_path,
+            {"partition": "prefix", "prefixes": ["a/", "b/", "c/"]},
+        )
+        return library_path
+
+    @staticmethod
+    def __add_version(library_path, index, name):
+        path = shards.shard_path(library_path, index)
+        library = bal.load_library(path)
+        library["entities"][name]["versions"].append({"traits": {}})
+        journal.write_library(library, path)
+
+    def __initialize(self, **settings):
+        new_settings = self.__old_settings.copy()
+        new_settings["library_path"] = self.__library_path
+        new_settings.update(settings)
+        self._manager.initialize(new_settings)
+
+    def __resolve(self, entity_reference):
+        results = [None]
+        self._manager.resolve(
+            [entity_reference],
+            {"string"},
+            self.createTestContext(access=Context.Access.kRead),
+            lambda idx, data: operator.setitem(results, idx, data),
+            lambda _, err: self.fail(f"Resolve should not error: {err.code} {err.message}"),
+        )
+        return results[0]
+
+
+class Test_library_validation(FixtureAugmentedTestCase):
+    """
+    Tests that libraries are validated against the library schema, if
+    enabled, and that unchanged valid libraries are not checked again.
+    """
+
+    def setUp(self):
+        self.__old_settings = self._manager.settings()
+        self.__tmp_dir = tempfile.mkdtemp()
+        self.__library_path = os.path.join(self.__tmp_dir, "library.json")
+        shutil.copyfile(self.__old_settings["library_path"], self.__library_path)
+
+    def tearDown(self):
+        self._manager.initialize(self.__old_settings)
+        shutil.rmtree(self.__tmp_dir)
+
+    def test_when_library_valid_then_validation_recorded(self):
+        self.__initialize()
+
+        self.assertTrue(os.path.exists(f"{self.__library_path}.validated"))
+
+    def test_when_library_invalid_then_all_errors_reported_with_paths(self):
+        with open(self.__library_path, "w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    "entities": {
+                        "an entity": {"versions": [{"traits": {"a_trait": {"a_property": [1]}}}]},
+                        "another": {"versions": []},
+                    }
+                },
+                file,
+            )
+
+        with self.assertRaises(validation.InvalidLibrary) as context:
+            self.__initialize()
+
+        self.assertEqual(
+            [json_path for json_path, _ in context.exception.errors],
+            [
+                "$.entities.another.versions",
+                '$.entities["an entity"].versions[0].traits.a_trait.a_property',
+            ],
+        )
+        self.assertFalse(os.path.exists(f"{self.__library_path}.validated"))
+
+    def test_when_validated_library_modified_then_validated_again(self):
+        self.__initialize()
+
+        with open(self.__library_path, "w", encoding="utf-8") as file:
+            json.dump({"managementPolicy": {}}, file)
+
+        with self.assertRaises(validation.InvalidLibrary):
+            self.__initialize()
+
+    def __initialize(self):
+        new_settings = self.__old_settings.copy()
+        new_settings["library_path"] = self.__library_path
+        new_settings["library_validation"] = True
+        self._manager.initialize(new_settings)
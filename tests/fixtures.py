@@ -70,7 +70,31 @@ fixtures = {
             "some_settings_with_new_values_and_invalid_keys": {"library_path": "", "cat": True}
         },
         "test_when_settings_expanded_then_manager_settings_updated": {
-            "some_settings_with_all_keys": {"library_path": ""}
+            "some_settings_with_all_keys": {
+                "library_path": "",
+                "library_load_mode": "lazy",
+                "lazy_entity_cache_size": 10,
+                "library_snapshot": "use",
+                "entity_ref_cache_size": 100,
+                "resolve_cache_size": 100,
+                "resolve_execution_mode": "threads",
+                "resolve_workers": 2,
+                "resolve_chunk_size": 1000,
+                "library_journal": True,
+                "max_entity_versions": 5,
+                "library_reload_interval": 0.5,
+                "library_sharing": True,
+                "library_preload": True,
+                "library_storage": "compact",
+                "library_validation": True,
+                "shard_load_workers": 2,
+                "name_filter": True,
+                "name_filter_false_positive_rate": 0.001,
+                "server_socket": "bal.sock",
+                "server_connections": 2,
+                "instrumentation": True,
+                "instrumentation_log_interval": 10.0,
+            }
         },
         "test_when_subset_of_settings_modified_then_other_settings_unchanged": {
             "some_settings_with_a_subset_of_keys": {}
@@ -40,6 +40,7 @@ import pytest
 from openassetio.test.manager import harness, apiComplianceSuite
 from openassetio.pluginSystem import PythonPluginSystemManagerPlugin
 
+from openassetio_manager_bal import bal
 
 #
 # Tests
@@ -62,6 +63,18 @@ class Test_BasicAssetLibrary:
         assert harness.executeSuite(bal_business_logic_suite, harness_fixtures)
 
 
+class Test_validate_settings:
+    @pytest.mark.parametrize("key", ["resolve_chunk_size", "resolve_workers"])
+    @pytest.mark.parametrize("value", [0, -1])
+    def test_when_count_not_positive_then_raises(self, key, value):
+        with pytest.raises(ValueError, match=f"{key} must be at least 1"):
+            bal.validate_settings({key: value})
+
+    @pytest.mark.parametrize("key", ["resolve_chunk_size", "resolve_workers"])
+    def test_when_count_positive_then_accepted(self, key):
+        bal.validate_settings({key: 1})
+
+
 class Test_BasicAssetLibrary_Plugin:
     def test_exposes_plugin_attribute_with_correct_type(self):
         import openassetio_manager_bal  # pylint: disable=import-outside-toplevel
@@ -69,7 +82,16 @@ class Test_BasicAssetLibrary_Plugin:
         assert issubclass(openassetio_manager_bal.plugin, PythonPluginSystemManagerPlugin)
 
 
-@pytest.fixture
-def bal_business_logic_suite(bal_base_dir):
-    module_path = os.path.join(bal_base_dir, "tests", "bal_business_logic_suite.py")
+# The business logic suite, and the suites for specific features that
+# extend it.
+@pytest.fixture(
+    params=[
+        "bal_business_logic_suite.py",
+        "bal_library_storage_suite.py",
+        "bal_library_lifecycle_suite.py",
+        "bal_concurrency_suite.py",
+    ]
+)
+def bal_business_logic_suite(request, bal_base_dir):
+    module_path = os.path.join(bal_base_dir, "tests", request.param)
     return harness.moduleFromFile(module_path)